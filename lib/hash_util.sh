@@ -398,6 +398,19 @@ if [[ -z "${LOADED_HASH_UTIL:-}" ]]; then
     djb2_with_salt_bytes "$1" 20
   }
 
+  # 全文DJB2a哈希（异或变体），字节长度作为salt：冲突key加宽时的第二个hash
+  djb2a_with_salt() {
+    local text="$1"
+
+    readarray -t hex_bytes < <(printf "%s" "$text" | od -An -tx1 -v | tr -d ' \n' | fold -w2)
+    local hash_value=5381
+    for hex in "${hex_bytes[@]}"; do
+      hash_value=$((((hash_value << 5) + hash_value ^ 16#$hex) & 0xFFFFFFFF))
+    done
+
+    echo $((((hash_value << 5) + hash_value ^ ${#hex_bytes[@]}) & 0xFFFFFFFF))
+  }
+
   # 返回MD5数值
   md5() {
     local text="$1"
@@ -8,6 +8,10 @@ if [[ -z "${LOADED_LANG_UTILS:-}" ]]; then
   : "${LIB_DIR:=$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)}" # lib direcotry
 
   declare -A LANGUAGE_MSGS # key=file:hash, value=translated message
+  declare -A LANGUAGE_COLL # key=file:hash | *:hash, hash collision index (widened keys)
+  LANGUAGE_WIDEN="MD5"     # widening of collided keys: DJB2 | MD5
+  declare -A LANGUAGE_LITERALS # key=file:original message, value=translated message (precompiled)
+  LANGUAGE_COMPILED=0          # 1=loaded from the precompiled file (python/i18n.py compile)
 
   # Test if terminal supports UTF-8 (0=supported, 1=unsupported)
   test_terminal_display() {
@@ -270,6 +274,15 @@ if [[ -z "${LOADED_LANG_UTILS:-}" ]]; then
 
     local prop_file=$(get_lang_prop)
 
+    # Precompiled messages: source the arrays instead of parsing the properties file (unless it is newer)
+    local lang_code="${prop_file##*/}"
+    local compiled_file="$LANG_DIR/locale/${lang_code%.properties}/messages.sh"
+    if [[ -f "$compiled_file" && ! "$prop_file" -nt "$compiled_file" ]]; then
+      # shellcheck disable=SC1090
+      source "$compiled_file"
+      return 0
+    fi
+
     local current_file=""
     while IFS= read -r line; do
 
@@ -312,6 +325,8 @@ if [[ -z "${LOADED_LANG_UTILS:-}" ]]; then
       fi
     done <"$prop_file"
 
+    load_coll_index # 加载hash冲突索引
+
     # message for debug
     if [[ "${DEBUG:-1}" == "0" ]]; then
       echo "[${MSG_INFO}] Loaded ${#LANGUAGE_MSGS[@]} sh messages from $prop_file" on "$(date '+%F %T')"
@@ -319,30 +334,66 @@ if [[ -z "${LOADED_LANG_UTILS:-}" ]]; then
     fi
   }
 
+  # Load the hash collision index saved with the catalogue (_lang.json: widen | coll)
+  load_coll_index() {
+    local meta_file="$LANG_DIR/_lang.json"
+    local in_coll=0
+    [[ -f "$meta_file" ]] || return 0
+
+    while IFS= read -r line; do
+      if [[ "$line" =~ ^\"widen\":[[:space:]]*\"([A-Z0-9]+)\" ]]; then
+        LANGUAGE_WIDEN="${BASH_REMATCH[1]}"
+      elif [[ "$line" == '"coll": {' ]]; then
+        in_coll=1
+      elif ((in_coll)); then
+        [[ "$line" == "}"* ]] && break # 冲突索引结束，不再读取 file 部分
+        # "file": ["key1", "key2"]
+        if [[ "$line" =~ ^\"([^\"]+)\":[[:space:]]*\[(.*)\] ]]; then
+          local file="${BASH_REMATCH[1]}"
+          local key
+          for key in ${BASH_REMATCH[2]//[\",]/ }; do
+            LANGUAGE_COLL["${file}:${key}"]=1
+          done
+        fi
+      fi
+    done <"$meta_file"
+  }
+
   # Translate message
   get_trans_msg() {
     # Retrieve the translated message for the given input
     msg="$1" # Original message
 
-    local current_hash=$(djb2_with_salt_20 "$msg")               # DJB2 hash algorithm
-    current_hash=$(padded_number_to_base64 "$current_hash"_6)    # 6-character base64 encoding
-    local source_file="${BASH_SOURCE[3]#$(dirname "$LIB_DIR")/}" # Remove root directory
-    local k="${source_file}:$current_hash"
+    local source_file="${BASH_SOURCE[3]#"${LIB_DIR%/*}"/}" # Remove root directory
     local result=""
 
-    # Check if the key exists
-    if [[ -n "${LANGUAGE_MSGS[$k]+x}" ]]; then
-      result="${LANGUAGE_MSGS[$k]}"
+    # Precompiled: a single lookup by the original message, no hashing
+    if [[ "$LANGUAGE_COMPILED" == 1 ]]; then
+      local k="${source_file}:$msg"
+      if [[ -n "${LANGUAGE_LITERALS[$k]+x}" ]]; then
+        result="${LANGUAGE_LITERALS[$k]}"
+      fi
+      echo "${result:-$msg}"
+      return 0
     fi
 
-    if [[ -z "$result" ]]; then
-      # If translation is not found, try again using MD5
-      current_hash=$(md5 "$msg")
-      k="${source_file}:$current_hash"
-      if [[ -n "${LANGUAGE_MSGS[$k]+x}" ]]; then
-        result="${LANGUAGE_MSGS[$k]}"
+    local hash=$(djb2_with_salt_20 "$msg")                  # DJB2 hash algorithm
+    local current_hash=$(padded_number_to_base64 "$hash"_6) # 6-character base64 encoding
+
+    # Collided keys are widened (collision index), so exactly one lookup is needed
+    if [[ -n "${LANGUAGE_COLL["${source_file}:$current_hash"]+x}" || -n "${LANGUAGE_COLL["*:$current_hash"]+x}" ]]; then
+      if [[ "$LANGUAGE_WIDEN" == "MD5" ]]; then
+        current_hash=$(md5 "$msg")
+      else
+        current_hash=$(padded_number_to_base64 "$hash"_6 "$(djb2a_with_salt "$msg")"_6)
       fi
     fi
+    local k="${source_file}:$current_hash"
+
+    # Check if the key exists
+    if [[ -n "${LANGUAGE_MSGS[$k]+x}" ]]; then
+      result="${LANGUAGE_MSGS[$k]}"
+    fi
 
     if [[ -z "$result" ]]; then
       # If still not found, use the original message
@@ -9,12 +9,14 @@ from pathlib import Path
 import time
 import subprocess
 import sys
-import concurrent.futures
+from functools import partial
 
 
 sys.path.append(str(Path(__file__).resolve().parent))  # add root sys.path
 
 from python.system import generate_temp_file
+from python.host_facts import get_host_facts
+from python.mirror.probe_limit import AimdLimiter, probe_budget, run_limited
 
 
 # Global pip mirrors
@@ -38,6 +40,7 @@ GLOBAL_MIRRORS = {
     # Australia
     "AARNET (Australia)": "https://pypi.aarnet.edu.au/simple/",
 }
+PIP_PROBE_BYTES = 256 * 1024  # estimated traffic of one probe (index page + metadata)
 
 
 def msg_parse_tmpl(template, *args):
@@ -92,18 +95,33 @@ def test_mirror_speed(mirror_name, mirror_url, timeout=10):
         return {"name": mirror_name, "url": mirror_url, "time": float("inf"), "status": "error", "error": str(e)}
 
 
-def test_pip_mirrors(max_workers=5):
-    """test speed for all mirrors concurrently"""
-    results = []
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_mirror = {
-            executor.submit(test_mirror_speed, name, url): (name, url) for name, url in GLOBAL_MIRRORS.items()
-        }
-
-        for future in concurrent.futures.as_completed(future_to_mirror):
-            result = future.result()
-            results.append(result)
+def probe_mirror(item, limiter, budget):
+    """one pip probe per limiter slot (failed | timeout probes count as congestion), skipped when over budget"""
+    name, url = item
+    granted = budget.grant(first=True)
+    budget.finish_target()
+    if not granted:
+        return {"name": name, "url": url, "time": float("inf"), "status": "skipped"}
+    with limiter.slot() as sample:
+        result = test_mirror_speed(name, url)
+        sample.ok = result["status"] == "success"
+    budget.settle(granted, granted)  # pip does not report its traffic: count the estimate
+    return result
+
+
+def test_pip_mirrors(max_workers=None):
+    """
+    test speed for all mirrors concurrently
+    max_workers: upper bound of in-flight probes (sized from host capacity by default),
+    the AIMD limiter raises | lowers the actual number from probe rate and latency
+    """
+    if max_workers is None:
+        max_workers = get_host_facts().workers(per_cpu=4, minimum=4, maximum=len(GLOBAL_MIRRORS))
+    limiter = AimdLimiter(initial=min(4, max_workers), minimum=2, maximum=max_workers)
+    budget = probe_budget(len(GLOBAL_MIRRORS), PIP_PROBE_BYTES, metered=bool(get_host_facts().cloud_vendor))
+    probe = partial(probe_mirror, budget=budget)
+    results = [result for _, result in run_limited(probe, GLOBAL_MIRRORS.items(), limiter)]
+    print(f"pip probes: {budget.summary()}, estimated", file=sys.stderr)  # stdout is the result file name
 
     # show result: Sort by speed
     successful_results = [r for r in results if r["status"] == "success"]
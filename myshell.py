@@ -11,6 +11,7 @@ from python.config_sshd import SshSetup
 from python.mirror.linux_speed_arch import ArchMirrorTester
 from python.mirror.linux_speed_cos import CentosMirrorTester
 from python.mirror.linux_speed_deb import DebianMirrorTester
+from python.mirror.mirror_proxy import PROXY_PORT, run_proxy
 from python.mirror.linux_speed_suse import OpenSUSEMirrorTester
 from python.mirror.linux_speed_ubt import UbuntuMirrorTester
 from python.network_util import NetworkSetup
@@ -19,6 +20,15 @@ from python.docker.docker_run import DockerRun
 from python.cache.lang_cache import LangCache
 
 
+MIRROR_TESTERS = {
+    "debian": DebianMirrorTester,
+    "ubuntu": UbuntuMirrorTester,
+    "centos": CentosMirrorTester,
+    "opensuse": OpenSUSEMirrorTester,
+    "arch": ArchMirrorTester,
+}
+
+
 def main():
     """Provides various python functions (integrated with shell scripts)"""
     # print("LANG:", os.environ.get("LANG"))
@@ -30,19 +40,27 @@ def main():
         case "sh_update_source":
             # Select mirror for package manager and perform initialization
             distro_ostype = sys.argv[2]
-            match distro_ostype:
-                case "debian":
-                    DebianMirrorTester().run()
-                case "ubuntu":
-                    UbuntuMirrorTester().run()
-                case "centos":
-                    CentosMirrorTester().run()
-                case "opensuse":
-                    OpenSUSEMirrorTester().run()
-                case "arch":
-                    ArchMirrorTester().run()
-                case _:
+            if distro_ostype not in MIRROR_TESTERS:
+                sys.exit(f"Error: Unknown distro '{distro_ostype}'")
+            MIRROR_TESTERS[distro_ostype]().run()
+
+        # Caching proxy for package mirrors: sh_mirror_proxy <distro> [port] [upstream_url ...]
+        # without upstream urls, the mirrors are ranked by the speed tester of the distro
+        # listens on 127.0.0.1, MIRROR_PROXY_BIND=0.0.0.0 serves the other hosts of the rack
+        case "sh_mirror_proxy":
+            distro_ostype = sys.argv[2]
+            port = int(sys.argv[3]) if len(sys.argv) > 3 else PROXY_PORT
+            upstreams = sys.argv[4:]
+            if not upstreams:
+                if distro_ostype not in MIRROR_TESTERS:
                     sys.exit(f"Error: Unknown distro '{distro_ostype}'")
+                tester = MIRROR_TESTERS[distro_ostype]()
+                tester.find_mirror_source()
+                tester.fetch_mirror_list()
+                upstreams = [result.url for result in tester.test_all_mirrors() or []]
+            if not upstreams:
+                sys.exit("Error: No available mirrors found")
+            sys.exit(run_proxy(upstreams, port))
 
         # Check if the server is using a static IP (user interactive)
         case "sh_configure_sshd":
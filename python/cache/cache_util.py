@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+"""
+Versioned diskcache layout shared by LangCache, OSInfoCache and the Arch mirror status (with a ttl)
+Each namespace is built in a temp directory and swapped in atomically, readers never see a half-filled cache.
+Base module, DO NOT depends on other modules
+
+Layout:
+    /tmp/sj_cache/<namespace>/
+        current -> v1752630000000000000   # 当前版本（符号链接，原子替换）
+        v1752630000000000000/             # 已完成构建的版本
+        .build-xxxx/                      # 正在构建的版本（临时目录）
+        .lock                             # 构建锁（只允许一个进程构建）
+"""
+
+import fcntl
+import os
+import shutil
+import tempfile
+import time
+from typing import Callable, Optional
+
+from diskcache import Cache
+
+
+CACHE_ROOT = "/tmp/sj_cache"
+CURRENT = "current"
+LOCK_FILE = ".lock"
+BUILD_PREFIX = ".build-"
+VERSION_PREFIX = "v"
+PRUNE_GRACE = 3600  # 旧版本至少保留的时间（秒），打开旧版本的读者仍在读取
+
+
+def cache_namespace(*names: str, root: str = CACHE_ROOT) -> str:
+    """Namespace directory of a cache type, e.g. /tmp/sj_cache/lang/en"""
+    return os.path.join(root, *names)
+
+
+def open_current(path: str, ttl: Optional[float] = None) -> Optional[Cache]:
+    """打开命名空间的当前版本（不存在 | 构建超过 ttl 秒则返回None）"""
+    try:
+        version = os.readlink(os.path.join(path, CURRENT))
+    except OSError:
+        return None
+    version_dir = os.path.join(path, version)
+    if not os.path.isdir(version_dir):
+        return None
+    if ttl is not None and time.time() - int(version[len(VERSION_PREFIX) :]) / 1e9 > ttl:
+        return None
+    return Cache(version_dir)  # 打开后固定在该版本，后续替换不影响当前读者
+
+
+def open_cache(path: str, build: Callable[[Cache], None], ttl: Optional[float] = None) -> Cache:
+    """
+    打开命名空间的当前版本；不存在（或已过期）则构建并原子替换
+
+    Args:
+        path: 命名空间目录
+        build: 填充缓存的函数（写入临时目录中的 Cache），抛出异常时不替换当前版本
+        ttl: 版本的有效时间（秒），None 为一直有效（直到 invalidate）
+    """
+    cache = open_current(path, ttl)
+    if cache is not None:
+        return cache
+
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, LOCK_FILE), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)  # 其它进程正在构建：等待完成后直接使用
+        cache = open_current(path, ttl)
+        if cache is None:
+            cache = _build_and_swap(path, build)
+    return cache
+
+
+def invalidate(path: str) -> None:
+    """
+    使当前版本失效：下次打开时重新构建
+    只删除 current 链接，正在读取旧版本的进程不受影响（旧版本在下次构建时清理）
+    """
+    try:
+        os.unlink(os.path.join(path, CURRENT))
+    except FileNotFoundError:
+        pass
+
+
+def _build_and_swap(path: str, build: Callable[[Cache], None]) -> Cache:
+    """在临时目录中构建，然后重命名为版本目录，并原子替换 current 链接（调用方持有构建锁）"""
+    build_dir = tempfile.mkdtemp(prefix=BUILD_PREFIX, dir=path)
+    os.chmod(build_dir, 0o755)  # 与 Cache() 创建的目录权限一致
+    cache = Cache(build_dir)
+    try:
+        build(cache)
+    finally:
+        cache.close()
+
+    version = f"{VERSION_PREFIX}{time.time_ns()}"
+    os.rename(build_dir, os.path.join(path, version))
+    link = os.path.join(path, f"{BUILD_PREFIX}{version}.link")
+    os.symlink(version, link)
+    os.replace(link, os.path.join(path, CURRENT))  # 原子替换
+
+    _prune(path, version)
+    return Cache(os.path.join(path, version))
+
+
+def _prune(path: str, keep: str) -> None:
+    """
+    清理旧版本和中断的构建目录（调用方持有构建锁）
+    上一个版本（替换前的 current）始终保留，更早的版本超过 PRUNE_GRACE 后才删除：
+    读者打开后固定在该版本，diskcache 延迟打开数据文件 | SQLite WAL，删除会使其失败
+    """
+    names = os.listdir(path)
+    versions = sorted(
+        (n for n in names if n.startswith(VERSION_PREFIX) and n[len(VERSION_PREFIX) :].isdigit() and n != keep),
+        key=lambda n: int(n[len(VERSION_PREFIX) :]),
+    )
+    kept = {keep, versions[-1]} if versions else {keep}
+    expired = time.time() - PRUNE_GRACE
+    for name in names:
+        if name in kept or not name.startswith((VERSION_PREFIX, BUILD_PREFIX)):
+            continue
+        full_path = os.path.join(path, name)
+        try:
+            if name.startswith(VERSION_PREFIX) and os.lstat(full_path).st_mtime > expired:
+                continue  # 仍在宽限期内
+        except OSError:
+            continue
+        if os.path.isdir(full_path) and not os.path.islink(full_path):
+            shutil.rmtree(full_path, ignore_errors=True)
+        else:
+            try:
+                os.unlink(full_path)
+            except OSError:
+                pass
@@ -6,18 +6,22 @@ Redis-like python cache for sharing language messages loaded from properties fil
 Base module, DO NOT depends on other modules
 """
 
+import json
 import os
 from pathlib import Path
-import re
 from datetime import datetime
+from functools import lru_cache
 import sys
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 from diskcache import Cache
 
 
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))  # add root sys.path
 
+from python.cache.cache_util import CACHE_ROOT, cache_namespace, invalidate, open_cache
 from python.debug_tool import print_array
+from python.lang.mo_util import is_fresh, load_mo, mo_path
+from python.lang.prop_reader import read_properties, read_section
 
 
 # 获取当前文件的绝对路径的父目录
@@ -25,95 +29,50 @@ PARENT_DIR = Path(__file__).resolve().parent.parent.parent
 PROP_PATH = PARENT_DIR / "config" / "lang"
 DEFAULT_LANG = "en"
 CODE_POSTFIX = ".py"
-CACHE_PATH = "/tmp/sj_cache"
-INIT_KEY = "__lang_cache_initialized__"
+CACHE_PATH = CACHE_ROOT
+CACHE_NAMESPACE = "lang"  # 按语言分开存储：/tmp/sj_cache/lang/<lang_code>
+YML_PATH = PROP_PATH / "_lang.yml"
+META_PATH = PROP_PATH / "_lang.json"  # 自动生成的元数据（file.stats 中的字节范围）
+INDEX_KEY = "__lang_cache_index__"  # 懒加载：文件分段索引
+COLL_KEY = f"{INDEX_KEY}#coll"  # hash冲突索引
 DEBUG = os.environ.get("DEBUG") == "0"  # 测试标志
+# 可用的语言代码（启动时扫描一次，回退链不再逐个检查文件是否存在）
+LANG_CODES = frozenset(p.stem for p in PROP_PATH.glob("*.properties") if not p.stem.startswith(("_", ".")))
 
 
-def read_lang_prop(fn):
-    """读取配置文件为数组"""
-    with open(fn, "r", encoding="utf-8") as fh:
-        lines = fh.readlines()
-    return [line.rstrip("\n") for line in lines]
+@lru_cache(maxsize=None)
+def lang_chain(locale: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Precomputed fallback chain of a locale (only languages with a properties file)
 
+    Examples:
+        zh_TW.UTF-8 => (zh_TW, zh, en) | (zh, en) if zh_TW.properties does not exist
+        zh_CN:zh    => (zh_CN, zh, en)  # $LANGUAGE format
+    """
+    candidates: List[str] = []
+    for name in (locale or os.environ.get("LANGUAGE") or DEFAULT_LANG).split(":"):
+        name = name.split(".")[0].split("@")[0].replace("-", "_")  # 去掉编码和修饰符：zh_TW.UTF-8 => zh_TW
+        candidates.extend((name, name.split("_")[0]))
+    candidates.append(DEFAULT_LANG)
 
-def get_lang_file(prefix: str = "") -> str:
+    return tuple(code for code in dict.fromkeys(candidates) if code in LANG_CODES) or (DEFAULT_LANG,)
+
+
+def get_lang_file(prefix: str = "", lang_code: Optional[str] = None) -> str:
     """Get the path to the message language file"""
-    lang_format = os.environ.get("LANGUAGE")  # e.g. zh_CN:zh
-    if ":" in lang_format:
-        primary_lang = lang_format.split(":")[0]  # zh_CN
-        fallback_lang = lang_format.split(":")[1]  # zh
-    else:
-        primary_lang = lang_format
-        fallback_lang = None
-
-    # First, look for the complete language file
-    primary_file = os.path.join(PROP_PATH, f"{prefix}{primary_lang}.properties")
-    if os.path.isfile(primary_file):
-        return primary_file
-
-    # Next, look for the simplified language file
-    if fallback_lang:
-        fallback_file = os.path.join(PROP_PATH, f"{prefix}{fallback_lang}.properties")
-        if os.path.isfile(fallback_file):
-            return fallback_file
-
-    # If neither is found, return default file
-    return os.path.join(PROP_PATH, f"{prefix}{DEFAULT_LANG}.properties")
-
-
-def multi_lang_properties() -> Dict[str, str]:
-    """Load message translations for .py files"""
-    lang_file = get_lang_file()
-    lines = read_lang_prop(lang_file)
+    return os.path.join(PROP_PATH, f"{prefix}{lang_code or lang_chain()[0]}.properties")
 
+
+def multi_lang_properties(lang_file: Optional[str] = None) -> Dict[str, str]:
+    """Load message translations for .py files"""
+    lang_file = lang_file or get_lang_file()
     language_msgs: Dict[str, str] = {}
-    current_file = ""
 
     try:
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-
-            # Check for file marker: #■=filename
-            file_match = re.match(r"^#\s*■=(.+)$", line)
-            if file_match:
-                filename = file_match.group(1).strip()
-                # Only process .py files
-                if filename.endswith(CODE_POSTFIX):
-                    current_file = filename
-                else:
-                    current_file = ""
-                i += 1
-                continue
-
-            # Skip if not processing .py file, empty lines, or comments
-            if not current_file or not line.strip() or line.lstrip().startswith("#"):
-                i += 1
-                continue
-
-            # Match key-value pairs KEY=VALUE
-            kv_match = re.match(r"^([A-Za-z0-9_-]+)=(.*)$", line)
-            if kv_match:
-                key = kv_match.group(1)
-                value_ln = kv_match.group(2)
-                value = value_ln
-
-                # Handle multi-line values ending with "\"
-                if value_ln.rstrip().endswith("\\"):
-                    while i < len(lines):
-                        i += 1
-                        value_ln = lines[i]
-                        value = value.rstrip()[:-1] + "\n" + value_ln  # Remove trailing backslash
-                        if not value_ln.rstrip().endswith("\\"):
-                            break  # Last line has no trailing backslash
-
-                # Store in dictionary with file prefix
-                full_key = f"{current_file}:{key}"
-                language_msgs[full_key] = value
-
-            i += 1
-
+        # Only process .py files; multi-line values are joined (trailing "\" removed)
+        for event in read_properties(lang_file, join=True):
+            if event.key and event.section.endswith(CODE_POSTFIX):
+                language_msgs[f"{event.section}:{event.key}"] = event.value  # Store with file prefix
     except Exception as e:
         print(f"[ERROR] Error loading properties file {lang_file}: {e}")
         return {}
@@ -127,15 +86,96 @@ def multi_lang_properties() -> Dict[str, str]:
     return language_msgs
 
 
+def lazy_lang_index(lang_file: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Load the section index for lazy loading (.py files only)
+
+    Returns:
+        {source_file: (offset, length)}; empty if lazy_load is disabled, (0, 0) if the offset is not recorded
+    """
+    from ruamel.yaml import YAML  # 只在初始化时读取一次
+
+    try:
+        with open(YML_PATH, "r", encoding="utf-8") as f:
+            data = YAML(typ="safe").load(f)
+        if not data["config"].get("lazy_load"):
+            return {}
+        if META_PATH.exists():
+            with open(META_PATH, "r", encoding="utf-8") as f:
+                data = json.load(f)
+    except Exception as e:
+        print(f"[ERROR] Error loading lang meta data {YML_PATH}: {e}")
+        return {}
+
+    lang_code = Path(lang_file).stem
+    index: Dict[str, Tuple[int, int]] = {}
+    for source_file, file_yml in (data.get("file") or {}).items():
+        if not source_file.endswith(CODE_POSTFIX):
+            continue
+        stats = (file_yml.get("stats") or {}).get(lang_code) or {}
+        if not stats.get("count"):
+            continue  # 没有消息
+        # 未记录字节范围（如: 已删除的源文件留下的记录）：(0, 0) 在首次加载时重新扫描分段
+        index[source_file] = (stats.get("offset", 0), stats.get("length", 0))
+
+    return index
+
+
+def lang_coll_index() -> Dict:
+    """
+    Load the hash collision index saved with the catalogue (_lang.json)
+
+    Returns:
+        {"widen": DJB2 | MD5, "keys": frozenset("file:key" | "*:key")}
+    """
+    coll: Dict = {}
+    try:
+        if META_PATH.exists():
+            with open(META_PATH, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            coll = {"widen": data.get("widen"), "keys": data.get("coll") or {}}
+    except Exception as e:
+        print(f"[ERROR] Error loading lang meta data {META_PATH}: {e}")
+
+    keys = frozenset(f"{file}:{key}" for file, file_keys in coll.get("keys", {}).items() for key in file_keys)
+    return {"widen": coll.get("widen") or "MD5", "keys": keys}
+
+
+def section_lang_properties(lang_file: str, source_file: str, offset: int, length: int) -> Dict[str, str]:
+    """Load message translations of one source file (lazy loading)"""
+    language_msgs: Dict[str, str] = {}
+    try:
+        for event in read_section(lang_file, offset, length, join=True, section=source_file):
+            if event.key and event.section == source_file:
+                language_msgs[f"{source_file}:{event.key}"] = event.value
+    except Exception as e:
+        print(f"[ERROR] Error loading section {source_file} from {lang_file}: {e}")
+
+    if DEBUG:
+        print(f"[INFO] Lazy loaded {len(language_msgs)} py messages of {source_file} from {lang_file}")
+
+    return language_msgs
+
+
 class LangCache:
+    """
+    Multi-locale message cache, keyed by (lang_code, file, hash)
+    Each language has its own namespace: /tmp/sj_cache/lang/<lang_code> => {file:hash: message}
+    A compiled .mo catalogue (python/i18n.py compile) is used instead, as long as it is not older than the properties file
+    """
+
     _instance = None  # 单例缓存实例
 
     def __new__(cls, cache_path: str = CACHE_PATH):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance.cache_path = cache_path
-            cls._instance.cache = None
+            cls._instance.caches = {}  # 已打开的语言：{lang_code: Cache}
+            cls._instance.chain = ()  # 默认语言的回退链（$LANGUAGE）
             cls._instance._closed = True
+            cls._instance._indexes = {}  # 懒加载：{lang_code: {lang_file, sections}}
+            cls._instance._loaded = set()  # 懒加载：本进程已确认加载的(lang_code, file)
+            cls._instance.coll = None  # hash冲突索引（所有语言相同，首次打开缓存时读取）
         return cls._instance
 
     @classmethod
@@ -146,57 +186,127 @@ class LangCache:
 
     def init_cache(self) -> None:
         """
-        一次性写入所有语言数据，每条记录独立存储
+        打开默认语言的缓存（其它语言在首次使用时打开）
         """
-        if self.cache is None or self._closed or not os.path.exists(self.cache_path):
-            self.cache = Cache(self.cache_path)
+        if self._closed:
+            self.chain = lang_chain()
             self._closed = False
+            self.open_lang(self.chain[0])
 
-        if self.cache.get(INIT_KEY):  # 缓存已经初始化过
+    def open_lang(self, lang_code: str) -> Cache:
+        """
+        打开指定语言的缓存；不存在则一次性写入该语言的数据（临时目录构建后原子替换）
+        已编译的 .mo 文件为最新时，直接读入进程（哈希表查找，不经过 diskcache）
+        """
+        cache = self.caches.get(lang_code)
+        if cache is None:
+            lang_file = get_lang_file(lang_code=lang_code)
+            mo_file = mo_path(lang_code)
+            if is_fresh(mo_file, lang_file):
+                cache = load_mo(mo_file)
+            else:
+                namespace = cache_namespace(CACHE_NAMESPACE, lang_code, root=self.cache_path)
+                cache = open_cache(namespace, lambda new_cache: self.build_cache(new_cache, lang_file))
+            self.caches[lang_code] = cache
+            self._indexes[lang_code] = cache.get(INDEX_KEY)
+            if self.coll is None:
+                self.coll = cache.get(COLL_KEY) or lang_coll_index()  # 旧版本缓存中没有冲突索引
+        return cache
+
+    @staticmethod
+    def build_cache(cache: Cache, lang_file: str) -> None:
+        """
+        填充新版本的缓存，每条记录独立存储
+        """
+        sections = lazy_lang_index(lang_file)
+        with cache.transact():
+            cache.set(COLL_KEY, lang_coll_index())
+            if sections:  # 懒加载：只写入索引，首次查找时再加载文件分段
+                cache.set(INDEX_KEY, {"lang_file": lang_file, "sections": sections})
+            else:
+                for k, v in multi_lang_properties(lang_file).items():
+                    cache.set(k, v)
+
+    def load_section(self, lang_code: str, key: str) -> None:
+        """
+        懒加载：首次查找 source_file 时，按字节范围只读取该文件的消息分段
+        """
+        source_file = key.rsplit(":", 1)[0]
+        index = self._indexes.get(lang_code)
+        if not index or (lang_code, source_file) in self._loaded:
             return
+        self._loaded.add((lang_code, source_file))
+
+        cache = self.caches[lang_code]
+        loaded_key = f"{INDEX_KEY}:{source_file}"
+        section = index["sections"].get(source_file)
+        if section is None or cache.get(loaded_key):
+            return  # 没有消息，或其它进程已加载
 
-        lang_dict: Dict[str, str] = multi_lang_properties()
-        with self.cache.transact():
+        lang_dict = section_lang_properties(index["lang_file"], source_file, *section)
+        with cache.transact():
             for k, v in lang_dict.items():
-                self.cache.set(k, v)
-        self.cache.set(INIT_KEY, True)
+                cache.set(k, v)
+            cache.set(loaded_key, True)
 
-    def get(self, keys: Optional[Union[str, List[str]]] = None) -> Optional[Union[str, Dict[str, Optional[str]]]]:
+    def lookup(self, key: str, lang: Optional[str] = None) -> Optional[str]:
+        """
+        按回退链查找单条消息：zh_TW => zh => en
+        """
+        for lang_code in lang_chain(lang) if lang else self.chain:
+            self.open_lang(lang_code)
+            self.load_section(lang_code, key)
+            value = self.caches[lang_code].get(key)
+            if value is not None:
+                return value
+        return None
+
+    def get(
+        self, keys: Optional[Union[str, List[str]]] = None, lang: Optional[str] = None
+    ) -> Optional[Union[str, Dict[str, Optional[str]]]]:
         """
-        按需读取：
+        按需读取（lang=None 使用 $LANGUAGE 的回退链）：
         - keys=None 返回全部数据（慎用，耗内存）
         - keys=单个字符串 返回单条
         - keys=字符串列表 返回多条，返回 dict
         """
-        if self.cache is None or self._closed:
+        if self._closed:
             raise RuntimeError("Cache not initialized")
 
         if keys is None:
-            # 读取全部所有key，注意几百条可以，更多数据不推荐
-            all_keys = list(self.cache.iterkeys())
-            return {k: self.cache.get(k) for k in all_keys}
+            # 读取全部所有key，注意几百条可以，更多数据不推荐（回退语言在前，被优先语言覆盖）
+            result: Dict[str, Optional[str]] = {}
+            for lang_code in reversed(lang_chain(lang) if lang else self.chain):
+                cache = self.open_lang(lang_code)
+                for source_file in (self._indexes[lang_code] or {}).get("sections", ()):
+                    self.load_section(lang_code, source_file)
+                result.update({k: cache.get(k) for k in cache.iterkeys() if not k.startswith(INDEX_KEY)})
+            return dict(sorted(result.items()))
         if isinstance(keys, str):
-            return self.cache.get(keys)
+            return self.lookup(keys, lang)
         if isinstance(keys, list):
-            return {k: self.cache.get(k) for k in keys}
+            return {k: self.lookup(k, lang) for k in keys}
 
     def close_cache(self):
         """
         Close the cache and release resources
         """
-        if self.cache and not self._closed:
-            self.cache.close()
-            self._closed = True
+        for cache in self.caches.values():
+            cache.close()
+        self.caches = {}
+        self._indexes = {}
+        self._loaded = set()
+        self.coll = None
+        self._closed = True
 
     def clear_cache(self):
         """
-        Clear the cache and delete the cache file
+        Invalidate the cache of all languages (rebuilt on next use, current readers are not affected)
         """
-        if self.cache and not self._closed:
-            self.cache.close()
-            self._closed = True
-        self.cache = Cache(self.cache_path)
-        self.cache.clear()
+        self.close_cache()
+        namespace = cache_namespace(CACHE_NAMESPACE, root=self.cache_path)
+        for lang_code in os.listdir(namespace) if os.path.isdir(namespace) else ():
+            invalidate(os.path.join(namespace, lang_code))
 
 
 # ==== 使用示例 ====
@@ -206,6 +316,7 @@ if __name__ == "__main__":
 
     print_array(lang_cache.get())  # all items
     print(lang_cache.get("python/i18n.py:A7XPUC"))  # single line
+    print(lang_cache.get("python/i18n.py:AI4IHR", lang="zh_TW"))  # explicit locale: zh_TW => zh => en
     print_array(
         lang_cache.get(
             [
@@ -4,15 +4,26 @@
 """
 
 import os
+from pathlib import Path
 import re
+import sys
 from dataclasses import dataclass
 from typing import Dict
 
 from diskcache import Cache
 
 
-CACHE_PATH = "/tmp/sj_cache"
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))  # add root sys.path
+
+from python.cache.cache_util import CACHE_ROOT, cache_namespace, invalidate, open_cache
+from python.host_facts import HostFacts, host_stamp, read_host_facts
+
+
+CACHE_PATH = CACHE_ROOT
+CACHE_NAMESPACE = "os_info"  # 独立存储：/tmp/sj_cache/os_info
 INIT_KEY = "__os_cache__"
+HOST_KEY = "__host_facts__"
+STAMP_KEY = "__stamp__"  # (FACTS_VERSION, boot id, /etc/os-release mtime)
 
 
 @dataclass
@@ -45,18 +56,28 @@ class OSInfoCache:
 
     def init_cache(self) -> None:
         """
-        一次性写入所有语言数据，每条记录独立存储
+        打开OS信息缓存；不存在则写入（临时目录构建后原子替换）
+        重启 | 系统升级（/etc/os-release 变化）| HostFacts 版本变化后重新构建
         """
-        if self.cache is None or self._closed or not os.path.exists(self.cache_path):
-            self.cache = Cache(self.cache_path)
+        if self.cache is None or self._closed:
+            path = cache_namespace(CACHE_NAMESPACE, root=self.cache_path)
+            self.cache = open_cache(path, self.build_cache)
+            if self.cache.get(STAMP_KEY) != host_stamp():
+                self.cache.close()
+                invalidate(path)
+                self.cache = open_cache(path, self.build_cache)
             self._closed = False
 
-        if self.cache.get(INIT_KEY):  # 缓存已经初始化过
-            return
-
+    @staticmethod
+    def build_cache(cache: Cache) -> None:
+        """
+        填充新版本的缓存
+        """
         os_info: OSInfo = init_os_info()
-        with self.cache.transact():
-            self.cache.set(INIT_KEY, os_info)
+        with cache.transact():
+            cache.set(INIT_KEY, os_info)
+            cache.set(HOST_KEY, read_host_facts())
+            cache.set(STAMP_KEY, host_stamp())
 
     def get(self) -> OSInfo:
         """
@@ -66,6 +87,14 @@ class OSInfoCache:
             raise RuntimeError("Cache not initialized")
         return self.cache.get(INIT_KEY)
 
+    def get_host(self) -> HostFacts:
+        """
+        - 返回主机容量信息（CPU | 内存 | 虚拟化 | 云厂商 | 网卡速率）
+        """
+        if self.cache is None or self._closed:
+            raise RuntimeError("Cache not initialized")
+        return self.cache.get(HOST_KEY)
+
     def close_cache(self):
         """
         Close the cache and release resources
@@ -76,13 +105,11 @@ class OSInfoCache:
 
     def clear_cache(self):
         """
-        Clear the cache and delete the cache file
+        Invalidate the cache (rebuilt on next use, current readers are not affected)
         """
-        if self.cache and not self._closed:
-            self.cache.close()
-            self._closed = True
-        self.cache = Cache(self.cache_path)
-        self.cache.clear()
+        self.close_cache()
+        invalidate(cache_namespace(CACHE_NAMESPACE, root=self.cache_path))
+        self.cache = None
 
 
 _os_info: OSInfo = None
@@ -1,17 +1,22 @@
 #!/usr/bin/env python3
 import re
+import selectors
 import subprocess
 import time
 import os
 import sys
+import tempfile
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 from pathlib import Path
-from typing import Any, List, Tuple, Union
+from typing import Any, Iterator, List, Tuple, Union
 
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))  # add root sys.path
 
 from python.msg_handler import MSG_ERROR, _mf, info, string
+from python.cmd_trace import TracedPopen, record, trace_step
+from python.unit_state import note_command
 from python.cache.os_info import OSInfo, OSInfoCache
 
 # Global configuration
@@ -57,7 +62,7 @@ def cmd_exec(cmd, **kwargs) -> Tuple[bool, Any]:
             "timeout": 300,
         } | kwargs  # Allow user to override defaults
 
-        result = subprocess.run(cmd, **run_args)
+        result = run_traced(cmd, **run_args)
         if result.returncode != 0:
             return False, result.stderr
         return True, result  # Original object
@@ -73,6 +78,34 @@ def cmd_exec(cmd, **kwargs) -> Tuple[bool, Any]:
         return False, str(e)
 
 
+def run_traced(cmd, input=None, timeout=None, check=False, capture_output=False, **kwargs):
+    """
+    subprocess.run with profiling: the child is reaped by os.wait4 (CPU time) and recorded by cmd_trace
+
+    Returns:
+        subprocess.CompletedProcess (same arguments and exceptions as subprocess.run)
+    """
+    if capture_output:
+        kwargs["stdout"] = kwargs["stderr"] = subprocess.PIPE
+
+    with TracedPopen(cmd, **kwargs) as process:
+        stdout = stderr = None
+        try:
+            stdout, stderr = process.communicate(input, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            note_command(cmd)  # systemctl start | restart ...: 服务状态快照失效
+            output_bytes = sum(len(out.encode() if isinstance(out, str) else out) for out in (stdout, stderr) if out)
+            record(cmd, process, output_bytes)
+
+    if check and process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, process.args, stdout, stderr)
+    return subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
+
+
 def cmd_ex_str(cmd, **kwargs):
     """
     Execute a system command and return the result by string
@@ -138,6 +171,16 @@ def cmd_ex_be(*commands):
     return monitor_progress(combined_cmd, LOG_FILE)
 
 
+def _drain_output(process, log_file):
+    """子进程已退出：把管道中剩余的输出写入日志，然后关闭管道"""
+    fd = process.stdout.fileno()
+    with open(log_file, "ab", buffering=0) as log_f, selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        while selector.select(0) and (chunk := os.read(fd, 65536)):
+            log_f.write(chunk)
+    process.stdout.close()
+
+
 def monitor_progress(cmd, log_file=None):
     """
     Monitor command progress and display updates in single line
@@ -156,9 +199,8 @@ def monitor_progress(cmd, log_file=None):
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Start command process
-        with open(log_file, "a", encoding="utf-8") as log_f:
-            process = subprocess.Popen(cmd, shell=True, stdout=log_f, stderr=subprocess.STDOUT, text=True)
+        # Start command process: stdout | stderr 通过管道读取（同时写入日志），不再反复读取整个日志文件
+        process = TracedPopen(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
 
         # Check if PID is valid
         if process.pid is None:
@@ -168,6 +210,7 @@ def monitor_progress(cmd, log_file=None):
         # DEBUG mode skips process detection
         if not DEBUG and process.poll() is not None:
             print(f"Error: Invalid PID {process.pid}")
+            _drain_output(process, log_file)
             return process.returncode or 1
 
         if DEBUG:
@@ -182,38 +225,47 @@ def monitor_progress(cmd, log_file=None):
         # Monitoring variables
         spinner = "|/-\\"
         spin_index = 0
-        last_size = 0
         latest = ""
-
-        # Monitoring loop
-        while process.poll() is None:
-            time.sleep(0.2)
-
-            # Check log file updates
-            if os.path.exists(log_file):
-                try:
-                    current_size = os.path.getsize(log_file)
-                    if current_size != last_size:
-                        # Extract last valid line, clean control characters
-                        with open(log_file, "r", encoding="utf-8", errors="ignore") as f:
-                            lines = f.readlines()
-                            if lines:
-                                # Clean control characters and truncate to max width
-                                latest = "".join(
-                                    char for char in lines[-1].strip() if ord(char) >= 32 or char in "\t\n"
-                                )
-                                latest = latest[:max_width]
-                        last_size = current_size
-                except (OSError, IOError):
-                    pass
-
-            # Always refresh spinner + latest
-            spin_index = (spin_index + 1) % 4
-            display_text = latest if latest else "Waiting..."
-            print(f"\r\033[K[{spinner[spin_index]}] {display_text}", end="", flush=True)
+        tail = b""  # 最后一行（可能不完整）
+        output_bytes = 0
+        next_refresh = 0.0
+
+        # Monitoring loop: 每 0.2 秒刷新一次，期间有输出则立即读取
+        fd = process.stdout.fileno()
+        with open(log_file, "ab", buffering=0) as log_f, selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while True:
+                exited = process.poll() is not None
+                if selector.select(0 if exited else 0.2):
+                    chunk = os.read(fd, 65536)
+                    if not chunk:
+                        break  # EOF
+                    log_f.write(chunk)
+                    output_bytes += len(chunk)
+
+                    # Extract last valid line, clean control characters ("\r" 为进度条刷新，视为换行)
+                    lines = (tail + chunk).replace(b"\r", b"\n").split(b"\n")
+                    tail = lines[-1][-4096:]
+                    line = next((ln for ln in reversed(lines) if ln.strip()), b"")
+                    if line:
+                        text = line.decode("utf-8", errors="ignore").strip()
+                        latest = "".join(char for char in text if ord(char) >= 32 or char == "\t")[:max_width]
+                elif exited:
+                    break  # 子进程已退出且没有剩余输出（后台的孙进程可能仍持有管道）
+
+                # Always refresh spinner + latest（输出很快时也最多每 0.2 秒刷新一次）
+                if time.monotonic() < next_refresh:
+                    continue
+                next_refresh = time.monotonic() + 0.2
+                spin_index = (spin_index + 1) % 4
+                display_text = latest if latest else "Waiting..."
+                print(f"\r\033[K[{spinner[spin_index]}] {display_text}", end="", flush=True)
 
         # Wait for process to end and get return code
         return_code = process.wait()
+        process.stdout.close()
+        record(cmd, process, output_bytes)
+        note_command(cmd)
 
         # Display final status
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -256,7 +308,8 @@ def pm_refresh():
     }
     string("Refreshing cache...")
     if commands := pm_commands.get(_os_info.package_mgr):
-        result = cmd_ex_be(*commands)
+        with trace_step("pm_refresh"):
+            result = cmd_ex_be(*commands)
         if result == 0:
             info("Cache refresh completed")
         return result
@@ -274,31 +327,102 @@ def pm_upgrade():
     }
     string("Updating system...")
     if commands := pm_commands.get(_os_info.package_mgr):
-        result = cmd_ex_be(*commands)
+        with trace_step("pm_upgrade"):
+            result = cmd_ex_be(*commands)
         if result == 0:
             info("System update completed")
         return result
 
 
+PARALLEL_DOWNLOADS = 8  # 本次安装的并行下载数（不修改系统配置）
+PACMAN_CONF = "/etc/pacman.conf"
+
+
+@contextmanager
+def _pacman_conf(parallel: int) -> Iterator[str]:
+    """
+    pacman 的 ParallelDownloads 只能在配置文件中设置：生成本次运行使用的临时配置，结束后删除（失败则用系统配置）
+    mkstemp: 随机文件名、0600、O_EXCL 创建，其它用户无法预先创建 | 链接到该文件（以 root 运行，配置可包含 XferCommand）
+    """
+    try:
+        with open(PACMAN_CONF, "r", encoding="utf-8") as f:
+            lines = [line for line in f if not re.match(r"^\s*#?\s*ParallelDownloads\b", line)]
+        options = next(i for i, line in enumerate(lines) if line.strip() == "[options]")
+        lines.insert(options + 1, f"ParallelDownloads = {parallel}\n")
+        fd, conf_file = tempfile.mkstemp(prefix="sj_pacman.", suffix=".conf")
+    except (OSError, StopIteration):
+        yield PACMAN_CONF
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        yield conf_file
+    finally:
+        os.unlink(conf_file)
+
+
+def plan_install(
+    packages: List[str], package_mgr: str, parallel: int = PARALLEL_DOWNLOADS, pacman_conf: str = PACMAN_CONF
+) -> List[Tuple[str, str]]:
+    """
+    Install planner: all packages in one transaction (one dependency resolution and lock),
+    split into a parallel download phase and an install phase from the package cache
+    Args:
+        packages - package names, space separated items allowed (deduplicated, order kept)
+        package_mgr - apt | yum | dnf | zypper | pacman
+        parallel - parallel downloads for this run only
+        pacman_conf - pacman config with ParallelDownloads set (see _pacman_conf)
+    Returns: [(phase, command)], empty for unknown package manager
+    """
+    pkgs = " ".join(dict.fromkeys(pkg for item in packages for pkg in item.split()))
+    if package_mgr == "apt":
+        opts = "-o Acquire::Queue-Mode=host"  # 每个主机一个下载队列：不同主机（镜像）之间并行，apt 没有并行数设置
+        return [
+            ("download", f"apt-get install -y -d {opts} {pkgs}"),
+            ("install", f"apt-get install -y --no-download {pkgs}"),
+        ]
+    if package_mgr == "dnf":
+        return [
+            ("download", f"dnf install -y --downloadonly --setopt=max_parallel_downloads={parallel} {pkgs}"),
+            ("install", f"dnf install -y -C {pkgs}"),
+        ]
+    if package_mgr == "yum":  # yum 不支持并行下载
+        return [("download", f"yum install -y --downloadonly {pkgs}"), ("install", f"yum install -y -C {pkgs}")]
+    if package_mgr == "zypper":
+        return [
+            ("download", f"zypper --non-interactive install --download-only {pkgs}"),
+            ("install", f"zypper --non-interactive install --download-in-advance {pkgs}"),
+        ]
+    if package_mgr == "pacman":
+        return [
+            ("download", f"pacman -Syw --noconfirm --needed --config {pacman_conf} {pkgs}"),
+            ("install", f"pacman -S --noconfirm --needed --config {pacman_conf} {pkgs}"),
+        ]
+    return []
+
+
 def pm_install(lnx_cmds: Union[str, List[str]]):
-    """package manager install"""
-    # Define install commands for each package manager
-    pm_commands = {
-        "apt": "apt-get install -y",  # Debian, Ubuntu
-        "yum": "yum install -y",  # CentOS, RHEL (旧版本)
-        "dnf": "dnf install -y",  # Fedora, CentOS 8+, RHEL 8+
-        "zypper": "zypper install -y",  # openSUSE
-        "pacman": "pacman -Sy --noconfirm",  # Arch Linux, Manjaro
-    }
+    """package manager install (all packages in one transaction, see plan_install)"""
     if isinstance(lnx_cmds, str):
         lnx_cmds = [lnx_cmds]
 
     string(r"Installing {}...", " ".join(lnx_cmds))
-    if cmd := pm_commands.get(_os_info.package_mgr):
-        result = cmd_ex_be(*[f"{cmd} {lnx_cmd}" for lnx_cmd in lnx_cmds])
-        if result == 0:
-            info(r"Installation of {} completed", " ".join(lnx_cmds))
-        return result
+    package_mgr = _os_info.package_mgr
+    with _pacman_conf(PARALLEL_DOWNLOADS) if package_mgr == "pacman" else nullcontext(PACMAN_CONF) as conf:
+        if phases := plan_install(lnx_cmds, package_mgr, pacman_conf=conf):
+            timings = []
+            result = 0
+            for phase, cmd in phases:
+                start = time.perf_counter()
+                with trace_step(f"pm_install:{phase}"):
+                    result = cmd_ex_be(cmd)
+                timings.append(f"{phase} {time.perf_counter() - start:.1f}s")
+                if result != 0:
+                    break
+            string(r"Install phases: {}", ", ".join(timings))  # 各阶段耗时
+            if result == 0:
+                info(r"Installation of {} completed", " ".join(lnx_cmds))
+            return result
 
 
 # ==============================================================================
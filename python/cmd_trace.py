@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+"""
+Structured profiling of system commands (cmd_exec | cmd_ex_be)
+Every command records wall time, CPU time (os.wait4 rusage), exit code and output bytes:
+    - JSON lines trace: $CMD_TRACE_FILE (default /var/log/sj_cmd_trace.jsonl), one record per command
+    - summary table at the end of the run (stderr), grouped by step (pm_refresh | pm_upgrade | pm_install ...)
+Enabled by CMD_TRACE=0 (same convention as DEBUG=0)
+Base module, DO NOT depends on other modules
+"""
+
+import atexit
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Union
+
+
+TRACE = os.environ.get("CMD_TRACE") == "0"  # 测试标志
+TRACE_FILE = os.environ.get("CMD_TRACE_FILE", "/var/log/sj_cmd_trace.jsonl")
+
+_step: ContextVar[str] = ContextVar("cmd_trace_step", default="")  # 当前步骤（线程 | 协程独立）
+_records: List[Dict] = []  # 本次运行的记录（结束时汇总）
+
+
+class TracedPopen(subprocess.Popen):
+    """
+    Popen 子类：用 os.wait4 回收子进程，保存 rusage（子进程及其已回收的后代进程）
+    wait() | communicate() 经过 _try_wait，poll() 自行实现（不依赖各版本不同的 _internal_poll）
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.rusage = None
+        self.started = time.perf_counter()
+        super().__init__(*args, **kwargs)
+
+    def _wait4(self, pid, flags):
+        """os.waitpid 的替代：返回 (pid, status)，同时保存 rusage"""
+        wait_pid, status, rusage = os.wait4(pid, flags)
+        if wait_pid == pid:
+            self.rusage = rusage
+        return wait_pid, status
+
+    def _try_wait(self, wait_flags):
+        try:
+            return self._wait4(self.pid, wait_flags)
+        except ChildProcessError:
+            return self.pid, 0  # SIGCLD 被忽略：无法获取状态（与 Popen 一致）
+
+    def poll(self):
+        """非阻塞检查子进程是否结束：结束时设置 returncode 并保存 rusage，仍在运行返回 None"""
+        if self.returncode is not None:
+            return self.returncode
+        try:
+            pid, status = self._wait4(self.pid, os.WNOHANG)
+        except ChildProcessError:
+            if self.returncode is None:  # 没有被其它线程的 wait() 回收：SIGCLD 被忽略（与 _try_wait 一致）
+                self.returncode = 0
+            return self.returncode
+        if pid == self.pid:
+            self.returncode = os.waitstatus_to_exitcode(status)
+        return self.returncode
+
+
+def current_step() -> str:
+    """当前步骤（未标记为 ""）"""
+    return _step.get()
+
+
+@contextmanager
+def trace_step(name: str):
+    """标记步骤：块内执行的命令都归入该步骤（汇总表按步骤统计）"""
+    token = _step.set(name)
+    try:
+        yield
+    finally:
+        _step.reset(token)
+
+
+def record(cmd: Union[str, List[str]], process: TracedPopen, output_bytes: int) -> Optional[Dict]:
+    """记录一条命令（CMD_TRACE=0 时），追加写入 JSON lines 文件"""
+    if not TRACE:
+        return None
+
+    rusage = process.rusage
+    rec = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "host": os.uname().nodename,
+        "step": _step.get(),
+        "cmd": cmd if isinstance(cmd, str) else " ".join(cmd),
+        "rc": process.returncode,
+        "wall": round(time.perf_counter() - process.started, 3),
+        "utime": round(rusage.ru_utime, 3) if rusage else None,
+        "stime": round(rusage.ru_stime, 3) if rusage else None,
+        "maxrss_kb": rusage.ru_maxrss if rusage else None,
+        "bytes": output_bytes,
+    }
+    if not _records:
+        atexit.register(print_summary)
+    _records.append(rec)
+
+    try:
+        with open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")  # 一次写入一行（O_APPEND）
+    except OSError:
+        pass  # 没有写权限：只保留汇总表
+
+    return rec
+
+
+def print_summary(records: Optional[List[Dict]] = None, file=sys.stderr) -> None:
+    """汇总表：按步骤（未标记步骤的命令按程序名）统计，耗时最多的在前"""
+    records = _records if records is None else records
+    if not records:
+        return
+
+    groups: Dict[str, Dict] = {}
+    for rec in records:
+        name = rec["step"] or rec["cmd"].strip("( ").split(" ", 1)[0]
+        group = groups.setdefault(name, {"cmds": 0, "fails": 0, "wall": 0.0, "cpu": 0.0, "bytes": 0, "slowest": rec})
+        group["cmds"] += 1
+        group["fails"] += rec["rc"] != 0
+        group["wall"] += rec["wall"]
+        group["cpu"] += (rec["utime"] or 0) + (rec["stime"] or 0)
+        group["bytes"] += rec["bytes"] or 0
+        if rec["wall"] > group["slowest"]["wall"]:
+            group["slowest"] = rec
+
+    total_wall = sum(g["wall"] for g in groups.values()) or 1
+    print(
+        f"\n{'Step':<20} {'Cmds':>5} {'Fail':>5} {'Wall(s)':>9} {'%':>6} {'CPU(s)':>8} {'Bytes':>10}  Slowest",
+        file=file,
+    )
+    for name, g in sorted(groups.items(), key=lambda item: -item[1]["wall"]):
+        pct = g["wall"] / total_wall * 100
+        slowest = g["slowest"]["cmd"][:40]
+        print(
+            f"{name[:20]:<20} {g['cmds']:>5} {g['fails']:>5} {g['wall']:>9.2f} {pct:>6.1f} {g['cpu']:>8.2f} "
+            f"{g['bytes']:>10}  {slowest}",
+            file=file,
+        )
+
+
+# =============================================================================
+# Debug test function
+# CMD_TRACE=0 CMD_TRACE_FILE=/tmp/trace.jsonl ./python/cmd_trace.py
+# =============================================================================
+def main():
+    with trace_step("demo"):
+        for cmd in (["sleep", "0.2"], ["sh", "-c", "i=0; while [ $i -lt 200000 ]; do i=$((i+1)); done"]):
+            with TracedPopen(cmd, stdout=subprocess.PIPE) as process:
+                stdout, _ = process.communicate()
+            print(record(cmd, process, len(stdout)))
+    with TracedPopen(["ls", "-la"], stdout=subprocess.PIPE) as process:
+        while process.poll() is None:
+            process.stdout.read()
+    print(record(["ls", "-la"], process, 0))
+
+
+# =============================================================================
+# Command-line entry point
+# =============================================================================
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,7 @@ from typing import Dict, List, Tuple
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))  # add root sys.path
 
-from python.cmd_handler import cmd_ex_str
+from python.unit_state import is_active
 from python.file_util import read_file, write_source_file
 from python.msg_handler import MSG_ERROR, MSG_SUCCESS, _mf, error, string
 from python.cache.os_info import OSInfo, OSInfoCache
@@ -61,7 +61,7 @@ class SshSetup:
 
     def is_service_active(self, service_name):
         """检查服务是否激活"""
-        return cmd_ex_str(f"systemctl is-active {service_name}")
+        return is_active(service_name)
 
     def get_config_port(self):
         """Read the uncommented SSH port number"""
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+
+"""
+DNS resolver latency benchmark (orders DNS_SERVERS in config/network/.env)
+Every candidate resolver is queried over UDP for a set of mirror hostnames, resolvers run concurrently:
+    - cold: first query of each name (may miss the resolver cache)
+    - warm: repeated trials of the same names (answered from the cache)
+Resolvers are ranked by median and tail (p90) latency, lost queries count as a timeout.
+A resolver that times out CONSECUTIVE_LOSS times in a row is given up (a dead server costs ~3 s, not minutes).
+Base module, DO NOT depends on other modules
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import random
+import socket
+import statistics
+import struct
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+
+
+# 镜像 | 包管理常用的主机名
+BENCH_HOSTS = [
+    "deb.debian.org",
+    "archive.ubuntu.com",
+    "mirrors.kernel.org",
+    "mirrors.aliyun.com",
+    "mirrors.tuna.tsinghua.edu.cn",
+    "pypi.org",
+    "files.pythonhosted.org",
+    "download.docker.com",
+]
+TRIALS = 3  # 第1轮为 cold，其余为 warm
+TIMEOUT = 1.0  # 每次查询的超时 (seconds)
+CONSECUTIVE_LOSS = 3  # 连续超时次数，达到后放弃该服务器
+TAIL_WEIGHT = 0.5  # 排序分数 = median + TAIL_WEIGHT * p90
+
+DNS_HEADER = struct.Struct(">HHHHHH")  # id, flags, qdcount, ancount, nscount, arcount
+QTYPE_A, QCLASS_IN = 1, 1
+RCODE_NOERROR, RCODE_NXDOMAIN = 0, 3
+
+
+@dataclass
+class DnsBenchResult:
+    """一个 DNS 服务器的测试结果，延迟单位为 seconds"""
+
+    server: str
+    cold: List[float] = field(default_factory=list)
+    warm: List[float] = field(default_factory=list)
+    lost: int = 0  # 超时 | 错误应答 (SERVFAIL ...)
+    error: Optional[str] = None  # 无法测试（地址无效 ...）
+
+    @property
+    def samples(self) -> List[float]:
+        """全部样本，丢失的查询按 TIMEOUT 计入"""
+        return self.cold + self.warm + [TIMEOUT] * self.lost
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.cold or self.warm)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples) if self.samples else float("inf")
+
+    @property
+    def p90(self) -> float:
+        samples = sorted(self.samples)
+        return samples[min(len(samples) - 1, int(len(samples) * 0.9))] if samples else float("inf")
+
+    @property
+    def score(self) -> float:
+        return self.median + TAIL_WEIGHT * self.p90 if self.ok else float("inf")
+
+
+def build_query(name: str, qid: int) -> bytes:
+    """A 记录查询 (RD=1)"""
+    qname = b"".join(bytes([len(label)]) + label for label in name.rstrip(".").encode("idna").split(b".")) + b"\0"
+    return DNS_HEADER.pack(qid, 0x0100, 1, 0, 0, 0) + qname + struct.pack(">HH", QTYPE_A, QCLASS_IN)
+
+
+def parse_rcode(data: bytes, qid: int) -> Optional[int]:
+    """应答的 RCODE，不是对应 qid 的应答返回 None"""
+    if len(data) < DNS_HEADER.size:
+        return None
+    rid, flags = DNS_HEADER.unpack_from(data)[:2]
+    if rid != qid or not flags & 0x8000:  # QR=1: 应答
+        return None
+    return flags & 0x000F
+
+
+def parse_server(server: str, port: int = 53) -> Tuple[str, int]:
+    """ "1.1.1.1" | "127.0.0.1:5353" | "2606:4700::1111" => (address, port)"""
+    if server.count(":") == 1:
+        host, _, port_str = server.partition(":")
+        return host, int(port_str)
+    return server, port
+
+
+def query_once(sock: socket.socket, name: str, timeout: float) -> Optional[float]:
+    """查询一次，返回延迟；超时 | 错误应答返回 None"""
+    qid = random.getrandbits(16)
+    deadline = time.perf_counter() + timeout
+    start = time.perf_counter()
+    sock.send(build_query(name, qid))
+    while (remaining := deadline - time.perf_counter()) > 0:
+        sock.settimeout(remaining)
+        try:
+            data = sock.recv(4096)
+        except socket.timeout:
+            return None
+        except OSError:  # ICMP port unreachable => ConnectionRefusedError
+            return None
+        rcode = parse_rcode(data, qid)
+        if rcode is None:
+            continue  # 之前超时的查询的迟到应答
+        return time.perf_counter() - start if rcode in (RCODE_NOERROR, RCODE_NXDOMAIN) else None
+    return None
+
+
+def bench_server(server: str, hosts: List[str], trials: int = TRIALS, timeout: float = TIMEOUT) -> DnsBenchResult:
+    """同一服务器的查询按顺序执行（避免查询之间互相干扰）"""
+    result = DnsBenchResult(server)
+    try:
+        host, port = parse_server(server)
+        family, _, _, _, sockaddr = socket.getaddrinfo(host, port, type=socket.SOCK_DGRAM)[0]
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        sock.connect(sockaddr)
+    except (OSError, ValueError) as e:
+        result.error = str(e)
+        return result
+
+    with sock:
+        loss_streak = 0
+        for trial in range(trials):
+            for name in hosts:
+                latency = query_once(sock, name, timeout)
+                if latency is None:
+                    result.lost += 1
+                    loss_streak += 1
+                    if loss_streak >= CONSECUTIVE_LOSS:
+                        result.error = f"{loss_streak} queries lost in a row"
+                        return result
+                    continue
+                loss_streak = 0
+                (result.cold if trial == 0 else result.warm).append(latency)
+    return result
+
+
+def rank_servers(
+    servers: List[str], hosts: Optional[List[str]] = None, trials: int = TRIALS, timeout: float = TIMEOUT
+) -> List[DnsBenchResult]:
+    """并发测试所有服务器，按分数排序（无应答的服务器在最后，保持原顺序）"""
+    servers = list(dict.fromkeys(servers))
+    if not servers:
+        return []
+    hosts = hosts or BENCH_HOSTS
+    with ThreadPoolExecutor(max_workers=len(servers)) as executor:
+        results = list(executor.map(lambda server: bench_server(server, hosts, trials, timeout), servers))
+    return sorted(results, key=lambda r: (not r.ok, r.score if r.ok else 0))
+
+
+def best_order(servers: List[str], hosts: Optional[List[str]] = None) -> List[str]:
+    """DNS_SERVERS 的顺序：延迟最低的在前；全部无应答时（离线）保持原顺序"""
+    results = rank_servers(servers, hosts)
+    if not any(r.ok for r in results):
+        return list(dict.fromkeys(servers))
+    return [r.server for r in results]
+
+
+# =============================================================================
+# Debug test function (no argument: two local stub DNS servers, fast and slow | a dead port)
+# ./python/dns_bench.py [server ...]
+# =============================================================================
+def stub_dns_server(delay: float, cold_delay: float = 0.0) -> Tuple[socket.socket, str]:
+    """本地 DNS 桩服务器：每个查询回复 NXDOMAIN（第一次查询的名称额外延迟 cold_delay）"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    seen = set()
+
+    def serve():
+        while True:
+            try:
+                data, addr = sock.recvfrom(4096)
+            except OSError:
+                return
+            qname = data[DNS_HEADER.size :]
+            time.sleep(delay + (0 if qname in seen else cold_delay))
+            seen.add(qname)
+            reply = DNS_HEADER.pack(DNS_HEADER.unpack_from(data)[0], 0x8183, 1, 0, 0, 0) + qname
+            sock.sendto(reply, addr)
+
+    threading.Thread(target=serve, daemon=True).start()
+    return sock, f"127.0.0.1:{sock.getsockname()[1]}"
+
+
+def main():
+    servers = sys.argv[1:]
+    stubs = []
+    if not servers:
+        fast, fast_addr = stub_dns_server(0.002, cold_delay=0.03)
+        slow, slow_addr = stub_dns_server(0.02)
+        dead = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        dead.bind(("127.0.0.1", 0))  # 绑定但不应答
+        stubs = [fast, slow, dead]
+        servers = [slow_addr, f"127.0.0.1:{dead.getsockname()[1]}", fast_addr]
+
+    start = time.perf_counter()
+    results = rank_servers(servers)
+    print(f"{'Server':<22} {'Cold(ms)':>9} {'Warm(ms)':>9} {'Median':>8} {'P90':>8} {'Lost':>5}")
+    for r in results:
+        cold = statistics.median(r.cold) * 1000 if r.cold else float("nan")
+        warm = statistics.median(r.warm) * 1000 if r.warm else float("nan")
+        print(
+            f"{r.server:<22} {cold:>9.1f} {warm:>9.1f} {r.median * 1000:>8.1f} {r.p90 * 1000:>8.1f} {r.lost:>5} "
+            f"{r.error or ''}"
+        )
+    print(f"DNS_SERVERS={' '.join(r.server for r in results)}")
+    print(f"{time.perf_counter() - start:.2f}s")
+    for sock in stubs:
+        sock.close()
+
+
+# =============================================================================
+# Command-line entry point
+# =============================================================================
+if __name__ == "__main__":
+    main()
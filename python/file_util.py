@@ -10,6 +10,7 @@ import sys
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))  # add root sys.path
 
+from python.lang.prop_reader import read_properties
 from python.msg_handler import MSG_ERROR, MSG_WARNING, _mf, exiterr, string, warning
 
 # 获取当前文件的绝对路径的父目录
@@ -206,18 +207,36 @@ def write_source_file(path, lines):
 
 
 def read_lang_prop(lang_code):
-    """Read configuration file as array"""
-    fn = PROP_PATH / f"{lang_code}.properties"
-    with open(fn, "r", encoding="utf-8") as fh:
-        lines = fh.readlines()
-    return [line.rstrip("\n") for line in lines]
+    """Read configuration file as a stream of PropEvent (commented messages included)"""
+    return read_properties(PROP_PATH / f"{lang_code}.properties", commented=True)
 
 
 def write_lang_prop(lang_code, content_list):
-    """Write configuration file content"""
+    """Write configuration file content (temp file + atomic rename)"""
     fn = PROP_PATH / f"{lang_code}.properties"
-    with open(fn, "w", encoding="utf-8") as fh:
+    tmp_fn = fn.with_name(f".{fn.name}.tmp")
+    with open(tmp_fn, "w", encoding="utf-8") as fh:
         fh.writelines(f"{line}\n" for line in content_list)
+    os.replace(tmp_fn, fn)
+
+
+def splice_lang_prop(lang_code, patches):
+    """
+    Splice byte ranges of configuration file (temp file + atomic rename)
+
+    patches: [(start, end, content_bytes), ...] sorted by start, replace old bytes [start, end) with content_bytes
+    """
+    fn = PROP_PATH / f"{lang_code}.properties"
+    tmp_fn = fn.with_name(f".{fn.name}.tmp")
+    with open(fn, "rb") as src, open(tmp_fn, "wb") as dst:
+        pos = 0
+        for start, end, content in patches:
+            dst.write(src.read(start - pos))  # 未改变的部分：原样复制
+            dst.write(content)
+            src.seek(end)
+            pos = end
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp_fn, fn)
 
 
 def get_filename(file_args):
@@ -239,6 +258,7 @@ def get_code_files(dir_args, file_ext, file_args=None):
         list: List of valid shell file paths
     """
     ret_files = []
+    other_type = False  # 指定的文件中有其它类型的文件
 
     # 处理指定的文件
     if file_args:
@@ -247,7 +267,10 @@ def get_code_files(dir_args, file_ext, file_args=None):
             # 使用Path对象处理路径，保持一致性
             path = PARENT_DIR / file
             if path.is_file():
-                ret_files.append(str(path))
+                if path.suffix == f".{file_ext}":
+                    ret_files.append(str(path))
+                else:
+                    other_type = True  # 其它类型的文件由对应的解析器处理
             else:
                 print(f"{_mf(r'[{}]: Code file does not exist', MSG_WARNING)}: {file}", file=sys.stderr)
 
@@ -259,7 +282,7 @@ def get_code_files(dir_args, file_ext, file_args=None):
             if dir_path.exists():
                 ret_files.extend(str(path.resolve()) for path in dir_path.glob(pattern) if path.is_file())
 
-    if not ret_files:
+    if not ret_files and not other_type:
         print(_mf(r"[{}]: No code files found", MSG_ERROR), file=sys.stderr)
         sys.exit(1)
 
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import hashlib
+import json
 import math
 from pathlib import Path
 import sys
@@ -14,10 +15,18 @@ from python.debug_tool import test_assertion
 DUPL_HASH = "Z-HASH"  # hash池（一个文件中不允许有重复的hash）
 BASE64_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"  # url安全
 PROP_FILE = {}  # key=path/program; value = 待翻译消息列表
+COLL_FILE = "FILE"  # hash冲突范围：文件内
+COLL_GLOBAL = "GLOBAL"  # hash冲突范围：所有文件（key全局唯一）
+COLL_ALL = "*"  # 冲突索引中的全局范围
+WIDEN_DJB2 = "DJB2"  # 冲突key加宽：12位（采样djb2 + 全文djb2a）
+WIDEN_MD5 = "MD5"  # 冲突key加宽：32位MD5（旧版本）
+COLL_CONFIG = {"scope": COLL_FILE, "widen": WIDEN_MD5}  # 冲突处理配置（_lang.yml: djb2_coll | djb2_widen）
+COLL_KEYS = {}  # 冲突索引：{file | "*": set(6位key)}，与语言文件一起保存在 _lang.json
 
 # 获取当前文件的绝对路径的父目录
 PARENT_DIR = Path(__file__).resolve().parent.parent
 YML_PATH = PARENT_DIR / "config" / "lang" / "_lang.yml"
+META_PATH = PARENT_DIR / "config" / "lang" / "_lang.json"  # 自动生成的元数据（file | stats）
 
 
 # ==============================================================================
@@ -26,6 +35,8 @@ YML_PATH = PARENT_DIR / "config" / "lang" / "_lang.yml"
 # _padded_number_to_base64  数值_位数 => 64进制
 # _base64_to_number         64进制 => 数值
 # set_func_msgs             待翻译内容列表(单文件) => 64进制hash code
+# set_global_msgs           GLOBAL：跨文件的hash冲突处理
+# msg_key                   运行时：消息 => key（查询冲突索引，只需一次查找）
 # ==============================================================================
 
 
@@ -121,9 +132,13 @@ def _base64_to_number(s):
 
 
 def init_meta_props():
-    # 读yaml
-    with open(YML_PATH, "r") as f:
-        data = YAML().load(f)
+    # 读元数据：_lang.json（C parser）；旧版本只有 _lang.yml
+    if META_PATH.exists():
+        with open(META_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    else:
+        with open(YML_PATH, "r") as f:
+            data = YAML(typ="safe").load(f)
     file_yml = data["file"] = data["file"] if isinstance(data.get("file"), dict) else {}
     # 重置全局变量
     for key in file_yml.keys():
@@ -203,11 +218,50 @@ def _djb2_with_salt_20(text: str) -> int:
     return _djb2_with_salt_bytes(text, 20)
 
 
+def _djb2a_with_salt(text: str, encoding: str = "utf-8") -> int:
+    """全文DJB2a哈希（异或变体），字节长度作为salt：冲突key加宽时的第二个hash"""
+    byte_data = text.encode(encoding)
+    hash_value = 5381
+    for byte_value in byte_data:
+        hash_value = (((hash_value << 5) + hash_value) ^ byte_value) & 0xFFFFFFFF
+    return (((hash_value << 5) + hash_value) ^ len(byte_data)) & 0xFFFFFFFF
+
+
 def md5(text: str) -> str:
     """返回MD5数值"""
     return hashlib.md5(text.encode("utf-8")).hexdigest()
 
 
+def init_coll_config(scope=None, widen=None, coll=None):
+    """设置冲突处理配置，载入已保存的冲突索引"""
+    COLL_CONFIG["scope"] = scope or COLL_FILE
+    COLL_CONFIG["widen"] = widen or WIDEN_MD5
+    COLL_KEYS.clear()
+    COLL_KEYS.update({k: set(v) for k, v in (coll or {}).items()})
+
+
+def widen_hash(msg: str, widen: str = None) -> str:
+    """冲突key加宽：DJB2 => 12位64进制；MD5 => 32位16进制"""
+    if (widen or COLL_CONFIG["widen"]) == WIDEN_MD5:
+        return md5(msg)
+    return _padded_number_to_base64(f"{_djb2_with_salt_20(msg)}_6", f"{_djb2a_with_salt(msg)}_6")
+
+
+def msg_key(msg: str, source_file: str, coll_keys=frozenset(), widen: str = None) -> str:
+    """
+    运行时：消息 => file:key
+    冲突索引中的key直接加宽（不再先查DJB2、再用MD5重试）
+
+    Args:
+        coll_keys: 冲突索引 {"file:key" | "*:key"}
+    """
+    h = _padded_number_to_base64(f"{_djb2_with_salt_20(msg)}_6")
+    key = f"{source_file}:{h}"
+    if key in coll_keys or f"{COLL_ALL}:{h}" in coll_keys:
+        key = f"{source_file}:{widen_hash(msg, widen)}"
+    return key
+
+
 def set_func_msgs(file_rec, func_name, content):
     """为每个函数中的对应文本获取hash"""
     d_hash = file_rec[DUPL_HASH]
@@ -220,7 +274,7 @@ def set_func_msgs(file_rec, func_name, content):
             if file_rec[h]["msg"] == msg:
                 continue  # 忽略重复
             d_hash[h] = True  # 记录之前的 DJB2 冲突键
-            h = md5(msg)  # 出现冲突，使用 MD5
+            h = widen_hash(msg)  # 出现冲突，key加宽
 
         file_rec[h] = {
             "msg": msg,  # 消息体
@@ -234,14 +288,15 @@ def set_file_msgs(results, sh_file):
     result = {}
     file_rec = results[sh_file]
     d_hash = file_rec.pop(DUPL_HASH)  #  获取重复hash记录（同时删除临时记录）
+    COLL_KEYS[sh_file] = {_padded_number_to_base64(f"{key}_6") for key in d_hash}  # 冲突索引（重新解析的文件）
     for key, value in file_rec.items():
         func_name = value.pop("func")  # 函数名(临时变量)
         if func_name not in result:
             result[func_name] = {}
 
         if key in d_hash:
-            key = md5(value["msg"])  # key改为MD5格式
-        elif type(key) == int:  # 已有MD5格式key不变
+            key = widen_hash(value["msg"])  # key加宽
+        elif type(key) == int:  # 已加宽的key不变
             key = _padded_number_to_base64(f"{key}_6")  # key 改为6位 64 进制
 
         result[func_name][key] = value  # 消息体和备注
@@ -249,6 +304,26 @@ def set_file_msgs(results, sh_file):
     results[sh_file] = result  # 维持顺序：按func_name排序
 
 
+def set_global_msgs(results, full=True):
+    """
+    GLOBAL：同一个key在不同文件中对应不同消息时，所有文件中的该key都加宽
+    只解析部分文件时，保留已记录的全局冲突（未解析文件中的冲突，在下次完整处理时发现）
+    """
+    coll = set() if full else set(COLL_KEYS.get(COLL_ALL, ()))
+    seen = {}  # key => msg
+    for funcs in results.values():
+        for msgs in funcs.values():
+            for key, value in msgs.items():
+                if len(key) == 6 and seen.setdefault(key, value["msg"]) != value["msg"]:
+                    coll.add(key)
+
+    for funcs in results.values():
+        for func_name, msgs in funcs.items():
+            if not coll.isdisjoint(msgs):
+                funcs[func_name] = {(widen_hash(v["msg"]) if k in coll else k): v for k, v in msgs.items()}
+    COLL_KEYS[COLL_ALL] = coll
+
+
 # =============================================================================
 # 调试测试函数（base64转换）
 # =============================================================================
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+
+"""
+Host capacity facts, read from /proc and /sys (no subprocess)
+CPU count | cgroup CPU and memory limits | total RAM | root filesystem | virtualisation | cloud vendor | NIC speed
+Cached by OSInfoCache (invalidated by boot id | /etc/os-release mtime | FACTS_VERSION),
+subsystems size their concurrency from it (HostFacts.workers).
+Base module, only depends on net_facts
+"""
+
+from dataclasses import asdict, dataclass
+import math
+import os
+from pathlib import Path
+import sys
+from typing import Optional, Tuple
+
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # add root sys.path
+
+from python.net_facts import read_default_route
+
+
+FACTS_VERSION = 1  # HostFacts 字段变化时加1（旧缓存自动失效）
+OS_RELEASE = "/etc/os-release"
+BOOT_ID = "/proc/sys/kernel/random/boot_id"
+DMI_DIR = "/sys/class/dmi/id"
+CGROUP_ROOT = "/sys/fs/cgroup"
+UNLIMITED_MEM = 1 << 60  # cgroup v1 "无限制" 为接近 2^63 的值
+
+# DMI 信息中的关键字 => 云厂商（sys_vendor | product_name | bios_vendor | chassis_asset_tag）
+CLOUD_VENDORS = [
+    ("amazon", "Amazon EC2"),
+    ("google", "Google"),
+    ("7783-7084-3265-9085-8269-3286-77", "Microsoft Azure"),  # Azure 的 chassis_asset_tag
+    ("alibaba cloud", "Alibaba Cloud"),
+    ("tencent cloud", "Tencent Cloud"),
+    ("huawei", "Huawei"),
+    ("oraclecloud", "Oracle Cloud"),
+    ("ibm cloud", "IBM Cloud"),
+    ("digitalocean", "DigitalOcean"),
+    ("linode", "Linode"),
+    ("akamai", "Linode"),
+    ("hetzner", "Hetzner"),
+    ("vultr", "Vultr"),
+]
+
+# DMI 信息中的关键字 => 虚拟化类型（与 systemd-detect-virt 的名称一致）
+VIRT_VENDORS = [
+    ("kvm", "kvm"),
+    ("qemu", "qemu"),
+    ("amazon ec2", "amazon"),
+    ("google compute engine", "kvm"),
+    ("vmware", "vmware"),
+    ("virtualbox", "oracle"),
+    ("xen", "xen"),
+    ("microsoft corporation", "microsoft"),
+    ("parallels", "parallels"),
+    ("bochs", "bochs"),
+]
+
+
+@dataclass
+class HostFacts:
+    """主机容量信息"""
+
+    cpu_count: int = 1  # 可用的 CPU 数 (sched_getaffinity)
+    cgroup_cpus: float = 0.0  # cgroup CPU 限额 (如: 1.5)，0 为不限制
+    mem_total: int = 0  # 物理内存 (bytes, /proc/meminfo MemTotal)
+    cgroup_mem: int = 0  # cgroup 内存限额 (bytes)，0 为不限制
+    root_fs: str = ""  # 根文件系统类型 (如: ext4, xfs, overlay)
+    virt: str = "none"  # 虚拟化类型 (如: kvm, vmware, docker, wsl, none)
+    cloud_vendor: str = ""  # 云厂商 (如: Amazon EC2)，非云主机为 ""
+    nic: str = ""  # 默认路由的网卡
+    nic_speed: int = 0  # 网卡速率 (Mbit/s)，未知为 0
+
+    @property
+    def cpus(self) -> float:
+        """实际可用的 CPU（cgroup 限额与 CPU 数的较小值）"""
+        return min(self.cpu_count, self.cgroup_cpus) if self.cgroup_cpus else float(self.cpu_count)
+
+    @property
+    def mem_bytes(self) -> int:
+        """实际可用的内存（cgroup 限额与物理内存的较小值）"""
+        limits = [m for m in (self.mem_total, self.cgroup_mem) if m]
+        return min(limits) if limits else 0
+
+    def workers(self, per_cpu: float, minimum: int = 1, maximum: int = 64, mem_per_worker: int = 16 << 20) -> int:
+        """
+        按主机容量计算并发数
+
+        Args:
+            per_cpu: 每个 CPU 的并发数（网络 I/O 为主的任务可以远大于1）
+            minimum | maximum: 上下限
+            mem_per_worker: 每个并发任务占用的内存（按可用内存的一半限制并发数）
+        """
+        count = math.ceil(self.cpus * per_cpu)
+        if self.mem_bytes:
+            count = min(count, self.mem_bytes // 2 // mem_per_worker)
+        return max(minimum, min(maximum, count))
+
+
+def _read(path: str) -> str:
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def host_stamp() -> Tuple[int, str, int]:
+    """缓存的有效性标记：(FACTS_VERSION, boot id, /etc/os-release mtime)"""
+    try:
+        mtime = os.stat(OS_RELEASE).st_mtime_ns
+    except OSError:
+        mtime = 0
+    return FACTS_VERSION, _read(BOOT_ID), mtime
+
+
+def read_cgroup_limits() -> Tuple[float, int]:
+    """
+    当前进程的 cgroup 限额（v2: cpu.max | memory.max，v1: cpu.cfs_quota_us | memory.limit_in_bytes）
+
+    Returns:
+        (CPU 限额，0 为不限制, 内存限额 bytes，0 为不限制)
+    """
+    cpus, mem = 0.0, 0
+    cgroup_paths = {}  # 控制器 => 当前进程的 cgroup 路径（v2 为 ""）
+    for line in _read("/proc/self/cgroup").splitlines():
+        if line.count(":") < 2:
+            continue
+        _, controllers, path = line.split(":", 2)
+        for controller in controllers.split(","):
+            cgroup_paths[controller] = path.lstrip("/")
+    cgroup_path = cgroup_paths.get("", "")
+
+    # cgroup v2：从当前 cgroup 向上查找，取最小的限额
+    if os.path.exists(os.path.join(CGROUP_ROOT, "cgroup.controllers")):
+        path = Path(CGROUP_ROOT, cgroup_path)
+        while True:
+            quota, _, period = _read(str(path / "cpu.max")).partition(" ")
+            if quota and quota != "max" and period:
+                value = int(quota) / int(period)
+                cpus = min(cpus, value) if cpus else value
+            limit = _read(str(path / "memory.max"))
+            if limit.isdigit():
+                mem = min(mem, int(limit)) if mem else int(limit)
+            if path == Path(CGROUP_ROOT):
+                break
+            path = path.parent
+        return cpus, mem
+
+    # cgroup v1：控制器目录下的进程 cgroup（容器内通常挂载为根目录）
+    def read_v1(controller: str, name: str) -> str:
+        return _read(os.path.join(CGROUP_ROOT, controller, cgroup_paths.get(controller, ""), name)) or _read(
+            os.path.join(CGROUP_ROOT, controller, name)
+        )
+
+    quota, period = read_v1("cpu", "cpu.cfs_quota_us"), read_v1("cpu", "cpu.cfs_period_us")
+    if quota.lstrip("-").isdigit() and int(quota) > 0 and period.isdigit():
+        cpus = int(quota) / int(period)
+    limit = read_v1("memory", "memory.limit_in_bytes")
+    if limit.isdigit() and int(limit) < UNLIMITED_MEM:
+        mem = int(limit)
+    return cpus, mem
+
+
+def read_mem_total() -> int:
+    for line in _read("/proc/meminfo").splitlines():
+        if line.startswith("MemTotal:"):
+            return int(line.split()[1]) * 1024
+    return 0
+
+
+def read_root_fs() -> str:
+    """根文件系统类型（/proc/self/mounts 中最后挂载到 / 的条目）"""
+    root_fs = ""
+    for line in _read("/proc/self/mounts").splitlines():
+        fields = line.split()
+        if len(fields) > 2 and fields[1] == "/":
+            root_fs = fields[2]
+    return root_fs
+
+
+def read_dmi() -> str:
+    """DMI 信息（小写，用于匹配云厂商 | 虚拟化类型）"""
+    names = ("sys_vendor", "product_name", "bios_vendor", "board_vendor", "chassis_asset_tag")
+    return " | ".join(_read(os.path.join(DMI_DIR, name)) for name in names).lower()
+
+
+def detect_virt(dmi: str) -> str:
+    """容器优先（容器内的 DMI 是宿主机的信息），然后是虚拟机"""
+    if os.path.exists("/.dockerenv"):
+        return "docker"
+    if os.path.exists("/run/.containerenv"):
+        return "podman"
+    if "container=" in _read("/proc/1/environ").replace("\0", " "):
+        return "container"
+    if "microsoft" in _read("/proc/sys/kernel/osrelease").lower():
+        return "wsl"
+    for keyword, virt in VIRT_VENDORS:
+        if keyword in dmi:
+            return virt
+    if "hypervisor" in _read("/proc/cpuinfo"):
+        return "vm"  # 有 hypervisor 标志，但无法识别类型
+    return "none"
+
+
+def detect_cloud(dmi: str) -> str:
+    return next((vendor for keyword, vendor in CLOUD_VENDORS if keyword in dmi), "")
+
+
+def read_nic_speed(iface: str) -> int:
+    """网卡速率（虚拟网卡读取失败 | -1 时为 0）"""
+    speed = _read(f"/sys/class/net/{iface}/speed") if iface else ""
+    return int(speed) if speed.isdigit() else 0
+
+
+def read_host_facts() -> HostFacts:
+    """读取主机容量信息（只读取 /proc | /sys，约 1 ms）"""
+    try:
+        cpu_count = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpu_count = os.cpu_count() or 1
+    cgroup_cpus, cgroup_mem = read_cgroup_limits()
+    dmi = read_dmi()
+    nic = read_default_route()[0]
+    return HostFacts(
+        cpu_count=cpu_count,
+        cgroup_cpus=cgroup_cpus,
+        mem_total=read_mem_total(),
+        cgroup_mem=cgroup_mem,
+        root_fs=read_root_fs(),
+        virt=detect_virt(dmi),
+        cloud_vendor=detect_cloud(dmi),
+        nic=nic,
+        nic_speed=read_nic_speed(nic),
+    )
+
+
+_host_facts: Optional[HostFacts] = None
+
+
+def get_host_facts() -> HostFacts:
+    """进程内缓存（不依赖 diskcache，用于 mypip 等安装前运行的脚本）"""
+    global _host_facts
+    if _host_facts is None:
+        _host_facts = read_host_facts()
+    return _host_facts
+
+
+# =============================================================================
+# Debug test function
+# ./python/host_facts.py
+# =============================================================================
+def main():
+    facts = read_host_facts()
+    for key, value in asdict(facts).items():
+        print(f"{key:<14} {value}")
+    print(f"{'cpus':<14} {facts.cpus}")
+    print(f"{'mem_bytes':<14} {facts.mem_bytes}")
+    print(f"{'stamp':<14} {host_stamp()}")
+    print(f"{'workers':<14} mirrors={facts.workers(8, 4, 32)} pip={facts.workers(2, 2, 8)}")
+
+
+# =============================================================================
+# Command-line entry point
+# =============================================================================
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ import typer
 sys.path.append(str(Path(__file__).resolve().parent.parent))  # add root sys.path
 
 from python.lang.lang_util import debug_assertion, update_lang_files
+from python.lang.mo_util import compile_mo, compile_sh
 from python.msg_handler import _mf, string, info, warning, error, exiterr
 from python.debug_tool import create_app, default_cmd, print_array
 from python.file_util import write_array
@@ -231,6 +232,20 @@ def upd_lang_files(langs: List[str], files: List[str], test_run: bool) -> None:
     data = update_lang_files(lang_codes, files, test_run)
     if test_run:
         debug_assertion(data, lang_codes)
+    else:
+        compile_lang_files(lang_codes)
+
+
+def compile_lang_files(langs: List[str]) -> None:
+    """编译语言文件：.mo 文件（python 运行时用 gettext 读取）| bash 关联数组文件（lib/lang_utils.sh 直接 source）
+
+    Args:
+        langs: 语言代码（如 zh_CN）
+    """
+    for lang_code in langs:
+        if os.path.isfile(os.path.join(LANG_DIR, f"{lang_code}.properties")):
+            compile_mo(lang_code)
+            compile_sh(lang_code)
 
 
 def main():
@@ -274,8 +289,16 @@ def main():
         files = parse_multi_val(file) if file else []
         upd_lang_files(langs, files, test_run)
 
+    @app.command("compile")
+    def compile_command(
+        lang: Optional[List[str]] = typer.Option(None, "-l", "--lang", help="指定语言包"),
+    ):
+        """编译语言文件（.mo | bash）"""
+        langs = parse_multi_val(lang) if lang else resolve_lang_codes()
+        compile_lang_files(langs)
+
     # 如果没有子命令，默认运行update
-    commands = ["add", "del", "update"]
+    commands = ["add", "del", "update", "compile"]
     default_cmd("update", commands)
 
     app()
@@ -71,7 +71,7 @@ class PythonASTParser(ASTParser):
             return 9  # 函数结束条件：未缩进
 
         # 正则捕获组是函数名称
-        func_match = re.match(r"^def\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(", line_content)
+        func_match = re.match(r"^(?:async\s+)?def\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*\(", line_content)
         if func_match:
             func_name = func_match.group(1)  # 函数名
 
@@ -260,6 +260,7 @@ class PythonASTParser(ASTParser):
             content_match = re.match(r"^(.*?)(?<!\\)" + f"{pattern}", line)  # 采用单引号 / 双引号结束（读取代码文件）
             if content_match:  # 最后一行
                 content += content_match.group(1)
+                self.line_number += 1  # 跳过结束行，避免结束引号被误判为新的多行文本
                 return content
             else:  # 中间行
                 content += line
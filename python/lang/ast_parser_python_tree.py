@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+import ast
+from bisect import bisect_left
+from pathlib import Path
+import re
+import sys
+import time
+from typing import List
+
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))  # add root sys.path
+
+from python.debug_tool import test_assertion
+from python.hash_util import set_file_msgs, set_func_msgs
+from python.file_util import get_code_files
+from python.lang.ast_parser import ASTParser, DUPL_HASH, PARENT_DIR
+from python.lang.ast_parser_python import PythonASTParser
+
+
+# ==============================================================================
+# 基于标准库 ast 的 Python 消息提取器（PythonASTParser 的替代实现）
+# 1) 每个文件只做一次 ast.parse + 一次遍历（线性）
+# 2) 查找 ASTParser.PATTERNS 中的函数调用，取第一个字符串参数的源码文本
+# 3) 消息归属于最内层的 FunctionDef，输出与 PythonASTParser 完全一致
+#
+# visit                     剪枝：跳过不含消息函数名的语法树分支
+# extract_literal           从源码中截取字符串字面量（不做转义求值）
+# visit_Call                解析函数调用，提取第一个字符串参数
+# visit_FunctionDef         进入函数：压栈，遍历函数体，出栈时提交消息
+# parse_code_files          主解析函数：解析代码文件
+# ==============================================================================
+
+FUNC_NAMES = frozenset(ASTParser.PATTERNS.split("|"))
+FUNC_WORDS = re.compile(rf"\b(?:{ASTParser.PATTERNS})\b")  # 候选行：只遍历包含消息函数名的语法树分支
+VAR_ONLY = re.compile(r"^\{([a-zA-Z][a-zA-Z0-9_]*|\d+)?\}$")  # 纯变量引用（如{abc}; {abc123}; {1}）
+STR_PREFIX = re.compile(r"^[rRfFbBuU]{0,2}")
+END_QUOTE = {q: re.compile(r"^(.*?)(?<!\\)" + q, re.S if len(q) == 3 else 0) for q in ('"""', "'''", '"', "'")}
+
+
+class PythonTreeParser(ast.NodeVisitor):
+    """
+    AST parser class (stdlib ast)
+    """
+
+    # Class variables
+    DIRS = PythonASTParser.DIRS
+    EXTS = PythonASTParser.EXTS
+
+    def __init__(self, trim_space=False):
+        """
+        Initialize the parser
+        """
+        self.trim_space: bool = trim_space
+
+        self.results: dict = {}
+        self.code_file: str
+        self.lines: List[str]
+        self.scopes: List[List]  # enclosing functions: [name, [(line_no, col, record), ...]]
+        self.call_lines: List[int]  # candidate line numbers (sorted)
+
+    def visit(self, node):
+        """剪枝：节点行范围内没有候选行，则跳过整个分支"""
+        end_lineno = getattr(node, "end_lineno", None)
+        if end_lineno is not None:
+            i = bisect_left(self.call_lines, node.lineno)
+            if i == len(self.call_lines) or self.call_lines[i] > end_lineno:
+                return None
+        return super().visit(node)
+
+    def extract_literal(self, node):
+        """
+        截取字符串参数的源码文本（与 PythonASTParser 一致：保留转义字符，不求值）
+
+        Returns:
+        - 提取的内容，如果不满足条件则返回None
+        """
+        if isinstance(node, ast.Constant):
+            if not isinstance(node.value, str):
+                return None
+        elif not isinstance(node, ast.JoinedStr):
+            return None  # 非字符串（变量、表达式等）
+        elif any(self.is_msg_call(n) for n in ast.walk(node)):
+            return None  # f-string 内嵌消息调用：只提取内层消息
+
+        # col_offset 为 UTF-8 字节偏移
+        first = self.lines[node.lineno - 1].encode("utf-8")[node.col_offset :].decode("utf-8")
+        if node.end_lineno == node.lineno:
+            text = first
+        else:
+            text = "\n".join([first, *self.lines[node.lineno : node.end_lineno]])
+
+        text = text[STR_PREFIX.match(text).end() :]  # 去掉字符串前缀：r, f, b, u 及其组合
+        quote = text[:3] if text[:3] in ('"""', "'''") else text[:1]
+        match = END_QUOTE[quote].match(text[len(quote) :])  # 截断未转义的结束引号（隐式拼接只取第一段）
+        if not match:
+            return None
+
+        content = match.group(1)
+        if len(quote) == 3:
+            content = content.replace("\n", "\\\n")  # "\" + 换行：读取消息时的多行标记
+        elif VAR_ONLY.match(content):
+            return None  # 拒绝纯变量引用
+
+        if not content:
+            return None
+
+        return content.rstrip() if self.trim_space else content
+
+    @staticmethod
+    def is_msg_call(node):
+        """是否消息函数调用：exiterr | error | success | warning | info | string | _mf"""
+        return isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNC_NAMES
+
+    def visit_Call(self, node):
+        """解析函数调用，提取第一个字符串参数"""
+        func = node.func
+        if self.scopes and node.args and self.is_msg_call(node):
+            ignored = any(kw.arg == "ignore" and getattr(kw.value, "value", None) is True for kw in node.keywords)
+            content = None if ignored else self.extract_literal(node.args[0])
+            if content:
+                self.scopes[-1][1].append((node.lineno, node.col_offset, f"{func.id} {node.lineno} {content}"))
+
+        self.generic_visit(node)
+
+    def visit_FunctionDef(self, node):
+        """进入函数：装饰器、参数默认值在外层作用域求值，函数体属于当前函数"""
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        self.visit(node.args)
+
+        self.scopes.append([node.name, []])
+        for child in node.body:
+            self.visit(child)
+        func_name, records = self.scopes.pop()
+
+        # 函数结束：按源码位置排序后提交（与行扫描器顺序一致）
+        if records:
+            records.sort(key=lambda r: (r[0], r[1]))
+            set_func_msgs(self.results[self.code_file], func_name, [r[2] for r in records])
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def parse_code_files(self, target):
+        """
+        Main parsing function: Parse code files
+
+        Parameters:
+        - target: Path of code files to parse
+        """
+        code_files = get_code_files(self.DIRS, self.EXTS, target)  # File list
+        self.results = {}  # File => Function | Messages
+
+        for code_file in code_files:
+            source = Path(code_file).read_text(encoding="utf-8")
+            code_file = str(Path(code_file).relative_to(PARENT_DIR))  # Relative path to project root
+            self.code_file = code_file
+            self.lines = source.splitlines()
+            self.scopes = []
+            self.call_lines = []
+            line_no, pos = 1, 0
+            for match in FUNC_WORDS.finditer(source):
+                line_no += source.count("\n", pos, match.start())
+                pos = match.start()
+                self.call_lines.append(line_no)
+            self.results[code_file] = {DUPL_HASH: {}}
+
+            self.visit(ast.parse(source, filename=code_file))
+
+            set_file_msgs(self.results, code_file)
+
+        return self.results
+
+
+# =============================================================================
+# Debug test function (benchmark + parity test against PythonASTParser)
+# ./python/lang/ast_parser_python_tree.py [python/i18n.py python/docker_util.py]
+# =============================================================================
+def main():
+    files = sys.argv[1:]
+    rounds = 20
+
+    timings = {}
+    results = {}
+    for parser_cls in (PythonASTParser, PythonTreeParser):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            results[parser_cls.__name__] = parser_cls().parse_code_files(files)
+        timings[parser_cls.__name__] = (time.perf_counter() - start) / rounds * 1000
+
+    for name, ms in timings.items():
+        print(f"{name:<18} {ms:8.2f} ms/run")
+
+    old = results["PythonASTParser"]
+    new = results["PythonTreeParser"]
+    for code_file in sorted(old.keys() | new.keys()):
+        test_assertion(lambda: old.get(code_file) == new.get(code_file), f"parity: {code_file}")
+    test_assertion(lambda: repr(old) == repr(new), f"parity (ordered): {len(new)} files")
+
+
+# =============================================================================
+# Command-line entry point
+# =============================================================================
+if __name__ == "__main__":
+    main()
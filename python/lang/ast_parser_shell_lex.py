@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+
+from bisect import bisect_right
+from pathlib import Path
+import re
+import sys
+import time
+from typing import List, Optional
+
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))  # add root sys.path
+
+from python.debug_tool import test_assertion
+from python.hash_util import set_file_msgs, set_func_msgs
+from python.file_util import get_code_files
+from python.lang.ast_parser import ASTParser, DUPL_HASH, PARENT_DIR
+from python.lang.ast_parser_shell import ShellASTParser
+
+
+# ==============================================================================
+# 单遍扫描的 bash 词法状态机（ShellASTParser 的替代实现）
+# 1) 每个文件只扫描一次：预编译字符集在 C 层跳过无关字符，只在关键字符处分派
+# 2) 同一个状态机跟踪：引号、heredoc、大括号、续行、${...}、$(...)、$((...))、函数作用域
+# 3) 消息调用、函数定义作为候选位置预先查找，与扫描位置合并（落在字符串/注释/heredoc 中的丢弃）
+# 4) 消息归属于最内层的函数，输出与 ShellASTParser 相同的 results 结构
+#
+# scan_dquote               扫描双引号字符串，返回结束位置
+# scan_param                扫描 ${...}（可嵌套），返回结束位置
+# scan_arith                扫描 $((...))，返回结束位置
+# scan_backtick             扫描反引号，返回结束位置
+# scan_dollar               分派 $'...' | ${...} | $((...)) | $(...)
+# extract_content           处理消息内容（多行、纯变量、去空格）
+# take_candidates           合并候选位置：消息调用 | 函数定义
+# add_message               记录消息调用的第一个双引号参数
+# lex                       主状态机：扫描代码（nested=True 时扫描到匹配的右括号）
+# lex_file                  扫描单个文件
+# parse_code_files          主解析函数：解析代码文件
+# ==============================================================================
+
+# 代码上下文的关键字符（heredoc 登记后，换行也是关键字符）
+CODE_CHARS = re.compile(r"[\\'\"`$()<#{}]")
+CODE_CHARS_NL = re.compile(r"[\\'\"`$()<#{}\n]")
+# 双引号 | ${...} | $((...)) 上下文的关键字符
+DQUOTE_CHARS = re.compile(r'[\\"`$]')
+PARAM_CHARS = re.compile(r'[\\"$}{]')
+ARITH_CHARS = re.compile(r"[()]")
+BACKTICK_END = re.compile(r"(?:[^`\\]|\\.)*`", re.S)
+ANSI_END = re.compile(r"(?:[^'\\]|\\.)*'", re.S)
+HEREDOC = re.compile(r"<<(-?)[ \t]*(['\"]?)(\w+)\2")
+
+# 候选位置：消息函数调用 | 函数定义 name() | function name
+CMD_CAND = re.compile(rf"(?:{ASTParser.PATTERNS})(?=\s)")
+FUNC_CAND = re.compile(r"\(\)|\bfunction[ \t]+([A-Za-z_][\w-]*)")
+FUNC_NAME = re.compile(r"([A-Za-z_]\w*)[ \t]*$")
+CMD_END = re.compile(r"[;&|]|(?<!\\)\n|(?<!\S)-[A-Za-z]*i[A-Za-z]*(?=[\s;)])")  # 命令结束 | -i（不翻译）
+VAR_ONLY = re.compile(r"^\$([a-zA-Z][a-zA-Z0-9_]*|\d+)$")  # 纯变量引用（如$abc; $abc123; $123）
+WORD_LEFT = frozenset(" \t\n;&|(")  # 保留字（{ } 函数名）左侧允许的字符
+RB_RIGHT = frozenset(("", " ", "\t", "\n", ";", "&", "|", ")"))  # 右大括号（保留字）右侧允许的字符
+CMD_LEFT = frozenset(" \t\n\r\f\v;{([&|")  # 消息函数左侧允许的字符
+
+
+class ShellLexParser:
+    """
+    Shell lexer parser class (single pass state machine)
+    """
+
+    # Class variables
+    DIRS = ShellASTParser.DIRS
+    EXTS = ShellASTParser.EXTS
+
+    def __init__(self, trim_space=False):
+        """
+        Initialize the parser
+        """
+        self.trim_space: bool = trim_space
+
+        self.results: dict = {}
+        self.code_file: str
+        self.text: str
+        self.line_starts: List[int]  # offset of each line start (line number lookup)
+        self.cands: List[tuple]  # candidates sorted by offset: (pos, end, kind, name)
+        self.cand_idx: int  # next candidate to process
+        self.scopes: List[List]  # function scopes: [name, brace_depth, results]
+        self.depth: int  # brace depth ({ } reserved words)
+        self.pending_func: Optional[str]  # function defined, waiting for "{"
+        self.cmd: Optional[List]  # message call waiting for its first double-quoted argument
+
+    def scan_dquote(self, pos):
+        """扫描双引号字符串（pos 为左引号之后），返回右引号之后的位置"""
+        text = self.text
+        while True:
+            m = DQUOTE_CHARS.search(text, pos)
+            if not m:
+                return len(text)  # 异常处理：未闭合
+            pos = m.end()
+            match m.group():
+                case '"':
+                    return pos
+                case "\\":
+                    pos += 1
+                case "`":
+                    pos = self.scan_backtick(pos)
+                case "$":
+                    pos = self.scan_dollar(pos)
+
+    def scan_param(self, pos):
+        """扫描 ${...}（pos 为 "${" 之后），返回右大括号之后的位置"""
+        text = self.text
+        while True:
+            m = PARAM_CHARS.search(text, pos)
+            if not m:
+                return len(text)
+            pos = m.end()
+            match m.group():
+                case "}":
+                    return pos
+                case "{":
+                    pass
+                case "\\":
+                    pos += 1
+                case '"':
+                    pos = self.scan_dquote(pos)
+                case "$":
+                    pos = self.scan_dollar(pos)
+
+    def scan_arith(self, pos):
+        """扫描 $((...))（pos 为 "((" 之后），返回结束位置（<< 为移位运算，不是 heredoc）"""
+        text = self.text
+        depth = 2
+        while depth:
+            m = ARITH_CHARS.search(text, pos)
+            if not m:
+                return len(text)
+            depth += 1 if m.group() == "(" else -1
+            pos = m.end()
+        return pos
+
+    def scan_backtick(self, pos):
+        """扫描反引号（pos 为左反引号之后），返回右反引号之后的位置"""
+        m = BACKTICK_END.match(self.text, pos)
+        return m.end() if m else len(self.text)
+
+    def scan_dollar(self, pos):
+        """分派 $'...' | ${...} | $((...)) | $(...)（pos 为 "$" 之后）"""
+        text = self.text
+        match text[pos : pos + 2]:
+            case "((":
+                return self.scan_arith(pos + 2)
+            case s if s[:1] == "(":
+                return self.lex(pos + 1, nested=True)
+            case s if s[:1] == "{":
+                return self.scan_param(pos + 1)
+            case s if s[:1] == "'":
+                m = ANSI_END.match(text, pos + 1)
+                return m.end() if m else len(text)
+        return pos  # $var | $1 | $# ...
+
+    def extract_content(self, raw):
+        """
+        处理双引号内的原始文本（与 ShellASTParser 一致）
+
+        Returns:
+        - 提取的内容，如果不满足条件则返回None
+        """
+        first, newline, rest = raw.partition("\n")
+        first = first.rstrip()
+        if newline:
+            # 多行文本：首行以 "\" 结尾才继续读取，否则只取首行
+            content = first + newline + rest if first.endswith("\\") else first
+        else:
+            content = raw
+
+        # 空内容 | 纯变量引用（如$abc; $abc123; $123）
+        if not content or VAR_ONLY.match(content):
+            return None
+
+        return content.rstrip() if self.trim_space else content
+
+    def take_candidates(self, start, end):
+        """处理代码区间 [start, end) 中的候选位置，跳过落在字符串、注释等区间中的候选"""
+        cands = self.cands
+        i = self.cand_idx
+        while i < len(cands) and cands[i][0] < end:
+            pos, cand_end, kind, name = cands[i]
+            i += 1
+            if pos < start:
+                continue  # 候选在被跳过的区间内
+            if kind == "cmd":
+                self.cmd = [name, pos, cand_end]
+            else:
+                self.pending_func = name
+        self.cand_idx = i
+
+    def add_message(self, start, end):
+        """双引号参数 [start, end)：如果是消息调用的第一个双引号参数，记录消息"""
+        name, pos, cand_end = self.cmd
+        self.cmd = None
+        if not self.scopes or CMD_END.search(self.text, cand_end, start - 1):
+            return  # 不在函数内 | 命令已结束 | -i（不翻译）
+
+        content = self.extract_content(self.text[start : end - 1])
+        if content:
+            line_no = bisect_right(self.line_starts, pos)  # 1-based
+            self.scopes[-1][2].append(f"{name} {line_no} {content}")
+
+    def lex(self, pos, nested=False):
+        """
+        主状态机：从 pos 开始扫描代码，nested=True 时扫描到匹配的右括号为止
+        返回结束位置
+        """
+        text = self.text
+        chars = CODE_CHARS
+        heredocs = []  # 当前行登记的 heredoc 结束标记，遇到换行后跳过正文
+
+        while True:
+            m = chars.search(text, pos)
+            if not m:
+                self.take_candidates(pos, len(text))
+                return len(text)
+            ch, start = m.group(), m.start()
+            self.take_candidates(pos, start)
+            pos = m.end()
+
+            match ch:
+                case "\\":
+                    pos += 1  # 转义字符 | 续行
+                case "'":
+                    end = text.find("'", pos)
+                    pos = end + 1 if end >= 0 else len(text)
+                case '"':
+                    pos = self.scan_dquote(pos)
+                    if self.cmd:
+                        self.add_message(start + 1, pos)
+                case "`":
+                    pos = self.scan_backtick(pos)
+                case "$":
+                    pos = self.scan_dollar(pos)
+                case "(":
+                    pos = self.scan_arith(pos + 1) if text.startswith("(", pos) else self.lex(pos, nested=True)
+                case ")":
+                    if nested:
+                        return pos
+                case "#":
+                    if start == 0 or text[start - 1].isspace():
+                        end = text.find("\n", pos)  # 注释：跳到行尾
+                        pos = end if end >= 0 else len(text)
+                case "<":
+                    if text.startswith("<<", pos):
+                        pos += 2  # here-string
+                    elif hd := HEREDOC.match(text, start):
+                        heredocs.append((hd.group(1), hd.group(3)))
+                        chars = CODE_CHARS_NL
+                        pos = hd.end()
+                case "\n":
+                    for strip, word in heredocs:  # heredoc 正文：跳到结束标记行之后
+                        tabs = "\t*" if strip else ""
+                        end = re.compile(rf"^{tabs}{re.escape(word)}[ \t]*$", re.M).search(text, pos)
+                        pos = end.end() if end else len(text)
+                    heredocs = []
+                    chars = CODE_CHARS
+                case "{":
+                    if (start == 0 or text[start - 1] in WORD_LEFT) and text[pos : pos + 1].isspace():
+                        self.depth += 1
+                        if self.pending_func:
+                            self.scopes.append([self.pending_func, self.depth, []])
+                            self.pending_func = None
+                        self.cmd = None
+                case "}":
+                    if (start == 0 or text[start - 1] in WORD_LEFT) and text[pos : pos + 1] in RB_RIGHT:
+                        self.depth -= 1
+                        if self.scopes and self.depth < self.scopes[-1][1]:
+                            self.close_scope()
+                        self.cmd = None
+
+    def close_scope(self):
+        """函数结束：提交消息"""
+        func_name, _, records = self.scopes.pop()
+        if records:
+            set_func_msgs(self.results[self.code_file], func_name, records)
+
+    def lex_file(self, text):
+        """扫描单个文件"""
+        self.text = text
+        self.scopes = []
+        self.depth = 0
+        self.pending_func = None
+        self.cmd = None
+        self.line_starts = [0, *(m.end() for m in re.finditer("\n", text))]
+
+        # 候选位置（按位置排序）：消息函数调用 | 函数定义
+        cands = [
+            (m.start(), m.end(), "cmd", m.group())
+            for m in CMD_CAND.finditer(text)
+            if m.start() == 0 or text[m.start() - 1] in CMD_LEFT
+        ]
+        for m in FUNC_CAND.finditer(text):
+            if m.group(1):
+                cands.append((m.start(), m.end(), "func", m.group(1)))  # function name
+                continue
+            line_start = text.rfind("\n", 0, m.start()) + 1
+            name = FUNC_NAME.search(text, line_start, m.start())
+            if name and (name.start() == 0 or text[name.start() - 1] in WORD_LEFT):
+                cands.append((name.start(), m.end(), "func", name.group(1)))  # name()
+        cands.sort()
+        self.cands = cands
+        self.cand_idx = 0
+
+        pos = 0
+        while pos < len(text):
+            pos = self.lex(pos)  # 顶层多余的右括号（如 case 分支）：继续扫描
+
+        while self.scopes:
+            self.close_scope()  # 文件结束：未闭合的函数
+
+    def parse_code_files(self, target):
+        """
+        Main parsing function: Parse code files
+
+        Parameters:
+        - target: Path of code files to parse
+        """
+        code_files = get_code_files(self.DIRS, self.EXTS, target)  # File list
+        self.results = {}  # File => Function | Messages
+
+        for code_file in code_files:
+            text = Path(code_file).read_text(encoding="utf-8")
+            code_file = str(Path(code_file).relative_to(PARENT_DIR))  # Relative path to project root
+            self.code_file = code_file
+            self.results[code_file] = {DUPL_HASH: {}}
+
+            self.lex_file(text)
+
+            set_file_msgs(self.results, code_file)
+
+        return self.results
+
+
+# =============================================================================
+# Debug test function (benchmark + parity test against ShellASTParser)
+# ./python/lang/ast_parser_shell_lex.py [bin/i18n.sh lib/msg_handler.sh]
+# =============================================================================
+def main():
+    files = sys.argv[1:]
+    rounds = 20
+
+    timings = {}
+    results = {}
+    for parser_cls in (ShellASTParser, ShellLexParser):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            results[parser_cls.__name__] = parser_cls().parse_code_files(files)
+        timings[parser_cls.__name__] = (time.perf_counter() - start) / rounds * 1000
+
+    for name, ms in timings.items():
+        print(f"{name:<18} {ms:8.2f} ms/run")
+
+    old = results["ShellASTParser"]
+    new = results["ShellLexParser"]
+    for code_file in sorted(old.keys() | new.keys()):
+        test_assertion(lambda: old.get(code_file) == new.get(code_file), f"parity: {code_file}")
+    test_assertion(lambda: repr(old) == repr(new), f"parity (ordered): {len(new)} files")
+
+
+# =============================================================================
+# Command-line entry point
+# =============================================================================
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+import json
 from pathlib import Path
 import sys
 import os
-from ruamel.yaml.comments import CommentedMap
 import typer
 import re
 from typing import List, Optional
@@ -13,10 +14,12 @@ from ruamel.yaml import YAML
 
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))  # add root sys.path
 
-from python.lang.ast_parser_shell import ShellASTParser
+from python.lang.ast_parser_shell_lex import ShellLexParser
 from python.lang.ast_parser_python import PythonASTParser
+from python.lang.prop_reader import SECTION_MATCH, read_section, scan_sections
 from python.cache.lang_cache import LangCache
-from python.file_util import read_lang_prop, write_lang_prop, write_array
+from python.hash_util import COLL_ALL, COLL_CONFIG, COLL_GLOBAL, COLL_KEYS, init_coll_config, set_global_msgs
+from python.file_util import PROP_PATH, read_lang_prop, splice_lang_prop, write_lang_prop, write_array
 from python.debug_tool import test_assertion, print_array
 
 # 全局变量
@@ -24,6 +27,7 @@ from python.debug_tool import test_assertion, print_array
 # 获取当前文件的绝对路径的父目录
 PARENT_DIR = Path(__file__).resolve().parent.parent.parent
 YML_PATH = PARENT_DIR / "config" / "lang" / "_lang.yml"
+META_PATH = PARENT_DIR / "config" / "lang" / "_lang.json"  # 自动生成的元数据（file | stats | changed）
 
 # 多语言支持
 FILE_MODE = "c|cpp|java|js|py|sh|ts"
@@ -44,7 +48,13 @@ MSG_STATS = "Z-STAT"  # 文件统计信息
 COUNT = "count"
 START = "start"
 END = "end"
+OFFSET = "offset"
+LENGTH = "length"
 YML_STAT = "stats"
+YML_FILE = "file"
+YML_COLL = "coll"  # hash冲突索引：{file | "*": [6位key]}（保存在 _lang.json）
+YML_WIDEN = "widen"  # 冲突索引对应的加宽方式（保存在 _lang.json）
+META_KEYS = ("changed", YML_STAT)  # config 中自动生成的部分（保存在 _lang.json）
 BASE_LANG = "_lang"
 
 # 文件匹配模式
@@ -53,8 +63,6 @@ FILE_MATCH_G = rf"^#\s+■=([^\s]+\.(?:{FILE_MODE}))$"  # 含捕获组
 # 函数匹配模式
 FUNC_MATCH = r"^#\s+◆=[^\s]+"  # 不含捕获组
 FUNC_MATCH_G = r"^#\s+◆=([^\s]+)"  # 含捕获组
-# 注释匹配模式
-CALL_MATCH_G = r"=([^\s]+)\s*$"  # 含捕获组
 # 消息匹配模式
 MSG_MATCH_CHK = r"^\s*[A-Za-z0-9_-]+\s*=\s*.+?(\s*#.*)?\s*$"  # 不含捕获组（检查是否有效消息）
 # MSG_MATCH_G2 = r"^#?\s*([A-Za-z0-9_-]+)\s*=\s*(.+?)\s*$"  # 两个捕获组
@@ -104,11 +112,14 @@ def _file_type(fn):
     return FILE_TYPE.get(match.group(0)) if match else None
 
 
+def _byte_size(lines):
+    """写入文件后的字节数（每行以换行符结束）"""
+    return sum(len(line.encode("utf-8")) + 1 for line in lines)
+
+
 def _set_flow_style(parentObj, key, data):
-    """语言统计采用紧凑模式：写入到一行"""
-    zh_data = CommentedMap(data)
-    zh_data.fa.set_flow_style()  # 设置为流式样式 (内联格式)
-    parentObj[key] = zh_data
+    """语言统计采用紧凑模式：普通dict（写入 _lang.json 时每个文件一行）"""
+    parentObj[key] = dict(data)
 
 
 def file_lang_inline_format(stats, lang_code, file_stats):
@@ -116,10 +127,9 @@ def file_lang_inline_format(stats, lang_code, file_stats):
 
     数据:
         count=有效消息数量；staart=起始位置；end=结束位置
+        offset=分段起始字节（# ■=file 标记行）；length=分段字节数（懒加载）
     例子:
-        stats:
-            zh: {count: 17, start: 8, end: 34}
-            en: {count: 17, start: 13, end: 39}
+        "stats": {"zh": {"count": 17, "start": 8, "end": 34, "offset": 262, "length": 1184}, "en": {...}}
     """
     _set_flow_style(stats, lang_code, file_stats)
     return stats
@@ -129,9 +139,7 @@ def config_lang_inline_format(stats):
     """语言统计采用紧凑模式：写入到一行
 
     例子:
-        stats:
-            zh: {count: 44}
-            en: {count: 44}
+        "stats": {"file_nos": 57, "zh": {"count": 44}, "en": {"count": 44}}
     """
     for lc in stats.keys():
         if lc != "file_nos":
@@ -170,87 +178,6 @@ def stat_config_yml(data):
     data["config"][YML_STAT] = stats
 
 
-def parse_lang_head(lines, line_number, prop_data):
-    """获取文件头部注释"""
-    file_lines = prop_data.setdefault(FILE_HEAD, {}).setdefault(FILE_LINE, [])
-    while line_number[0] < len(lines):
-        line = lines[line_number[0]]
-        match line.strip():
-            case "":
-                line_number[0] += 1  # 空行，跳过
-            case l if re.match(FILE_MATCH, l):
-                return  # 文件标记行，停止处理
-            case _:
-                file_lines.append(line)  # 普通行，添加
-                line_number[0] += 1
-
-
-def extract_multi_lines(content, lines, line_number):
-    """
-    如果为当红，直接返回；如果为多行，添加多行数据并返回
-    如果TRIM_SPACE = True，则去掉字符串右侧的空格！！
-
-    参数:
-    - content: 输入字符串段落
-    - lines: 待处理多行数据
-    - line_number：如为多行，动态修改此变量
-
-    返回:
-    - content：如为多行，直接修改content内容（用\n拼接）
-    """
-    # 检查是否多行文本
-    if content.endswith("\\"):
-        while line_number[0] < len(lines) - 1:
-            line_number[0] += 1
-            content += "\n"  # 增加换行
-            line = lines[line_number[0]]
-            content_match = re.match(r"^(.*?(?<!\\)\\)\s*$", line)  # 采用孤立的 \ 结束（捕获组去掉尾部的空格）
-            if content_match:
-                content += content_match.group(1).rstrip()
-            else:
-                content += line
-                return content.rstrip() if TRIM_SPACE else content
-
-    return content.rstrip() if TRIM_SPACE else content
-
-
-def parse_comment(line):
-    """获取消息备注"""
-    match = re.match(CALL_MATCH_G, line)
-    return match.group(1) if match else ""
-
-
-def parse_lang_file(lines, line_number, prop_data, file_name):
-    """获取文件分段信息"""
-    file_lines = []  # 文件内容
-    file_msgs = {}  # 消息的key和value
-
-    while line_number[0] < len(lines):
-        line = lines[line_number[0]].strip()
-        if re.match(FILE_MATCH, line):
-            break  # 匹配到下一个文件，退出
-
-        if not line:
-            line_number[0] += 1
-            continue  # 去掉多余空行
-
-        file_lines.append(lines[line_number[0]])  # 照抄原lines数据
-        match = re.match(MSG_MATCH_G3, line)
-        if match:
-            pre_line = lines[line_number[0] - 1]  # 上一行，默认存放消息备注
-            file_msgs[match.group(1)] = {
-                "msg": extract_multi_lines(match.group(2), lines, line_number),  # 获取消息值
-                "cmt": parse_comment(pre_line),  # 获取消息备注
-            }
-
-        line_number[0] += 1
-    prop_data[file_name] = {
-        FILE_LINE: file_lines,
-        FILE_MESSAGE: file_msgs,
-        MSG_STATS: {"count": len(file_msgs)},  # 语言消息条数
-    }
-
-
 def set_global_data(data):
     """根据config参数，重置全局变量和全局配置"""
     global DEL_MODE
@@ -265,10 +192,34 @@ def set_global_data(data):
     DEL_MODE = config_yml.get("del_mode", 2)  # 0=保留；1=注释；2=删除
     TRIM_SPACE = config_yml.get("trim_space", False)  # 默认不处理空格
     DJB2_LEN = config_yml.get("djb2_len", 20)  # 默认20个字符参与hash计算
+    # hash冲突：范围(FILE | GLOBAL)、加宽方式(DJB2 | MD5)，载入已保存的冲突索引
+    init_coll_config(config_yml.get("djb2_coll"), config_yml.get("djb2_widen"), data.get(YML_COLL))
 
     return data["file"]
 
 
+def parse_lang_events(events, prop_data):
+    """解析 PropEvent 流（整个文件或单个分段），按文件分段写入 prop_data"""
+    file_data = prop_data.get(FILE_HEAD)  # 头部注释：第一个文件标记之前的行
+
+    # hash表：文件-函数（流式读取，多行消息已合并为一个事件）
+    for event in events:
+        if event.key is None and SECTION_MATCH.match(event.value):
+            # 文件标记行：开始新的文件分段
+            file_data = prop_data[event.section] = {FILE_LINE: [], FILE_MESSAGE: {}, MSG_STATS: {COUNT: 0}}
+            continue
+
+        file_data[FILE_LINE].extend(event.raw)  # 照抄原行数据（含多行消息的后续行）
+        if event.key and event.section:
+            file_data[FILE_MESSAGE][event.key] = {
+                "msg": event.value.rstrip() if TRIM_SPACE else event.value,  # 获取消息值
+                "cmt": event.comment,  # 获取消息备注（上一行 # ●=...）
+            }
+            file_data[MSG_STATS][COUNT] += 1  # 语言消息条数
+
+    return prop_data
+
+
 def parse_lang_prop(lang_code):
     """
     主函数：处理语言文件(指定语言)
@@ -276,22 +227,7 @@ def parse_lang_prop(lang_code):
     2) 合并重新计算的lang_data数据
     3) 写入文件并返回合并后的结果
     """
-    prop_data = {}
-
-    # hash表：文件-函数
-    lines = read_lang_prop(lang_code)
-    line_number = [0]  # 使用列表包装，以便函数可以修改
-    total_lines = len(lines)
-
-    # 子程序1：处理头部注释
-    parse_lang_head(lines, line_number, prop_data)
-    while line_number[0] < total_lines:
-        # 子程序2：处理文件消息
-        file_name = re.match(FILE_MATCH_G, lines[line_number[0]]).group(1)
-        line_number[0] += 1
-        parse_lang_file(lines, line_number, prop_data, file_name)
-
-    return prop_data
+    return parse_lang_events(read_lang_prop(lang_code), {FILE_HEAD: {FILE_LINE: []}})
 
 
 def append_msg(file_lines, k, v):
@@ -375,6 +311,7 @@ def clean_lang_data(lang_data):
 def handle_prop_data(prop_data):
     """主函数：生成new_lines"""
     new_lines = prop_data[FILE_HEAD][FILE_LINE]  # 头部注释
+    size = _byte_size(new_lines)  # 已生成的字节数
     # 跳过processed_files
     for file_name, file_data in sorted(prop_data.items()):  # 排序：按文件名
         if file_name == FILE_HEAD:
@@ -385,6 +322,11 @@ def handle_prop_data(prop_data):
             # 统计MSG_STATS
             file_data[MSG_STATS][START] = len(new_lines) + 1 - len(file_data[FILE_LINE])  # 文件起始行
             file_data[MSG_STATS][END] = len(new_lines) + 1  # 文件结束行
+            # 懒加载：文件分段的字节范围（从文件标题行开始，跳过前面的空行）
+            length = _byte_size(new_lines[-len(file_data[FILE_LINE]) - 1 :])
+            file_data[MSG_STATS][OFFSET] = size + 1
+            file_data[MSG_STATS][LENGTH] = length
+            size += 1 + length
 
     return new_lines
 
@@ -437,10 +379,95 @@ def handle_yml_data(lang_code, prop_data, file_yml):
         file_lang_inline_format(file_yml[file_name][YML_STAT], lang_code, file_data[MSG_STATS])
 
 
+def patch_lang_properties(lang_code, msg_detail, file_yml):
+    """
+    主函数：按分段改写语言文件（只处理 msg_detail 中的文件，其它分段原样保留）
+    1) 扫描文件分段标记，得到各分段的字节和行范围
+    2) 只解析、合并变化的分段
+    3) 拼接：替换 | 删除 | 插入（按文件名排序）分段，临时文件 + 原子重命名
+    4) 普通语言文件：平移未变化分段在 file_yml 中的位置
+
+    返回:
+    - prop_data：变化的分段；patches：拼接数据
+    """
+    fn = PROP_PATH / f"{lang_code}.properties"
+    sections, size, total_lines = scan_sections(fn)
+    names = sorted(sections, key=lambda name: sections[name].offset)  # 文件中的分段顺序
+    prop_data = {}
+    patches = []  # [(start, end, content, file_name, 删除的行数), ...]
+
+    for file_name in sorted(msg_detail):
+        old = sections.get(file_name)
+        if old is None:
+            prop_data[file_name] = parse_lang_data(msg_detail[file_name])  # 补充：新添加的文件
+        else:
+            parse_lang_events(read_section(fn, old.offset, old.length, commented=True), prop_data)
+            merge_lang_data(prop_data[file_name], msg_detail[file_name], lang_code != BASE_LANG)  # 合并：已有的文件
+
+        file_data = prop_data[file_name]
+        content = "".join(f"{line}\n" for line in [f"# ■={file_name}", *file_data[FILE_LINE]]).encode("utf-8")
+        if old is None:
+            if not file_data[FILE_LINE]:
+                continue
+            # 插入到排序位置之后的第一个分段前（其前面的空行之前），或者文件末尾
+            next_name = next((name for name in names if name > file_name), None)
+            pos, line_no = (
+                (sections[next_name].offset - 1, sections[next_name].start - 2)
+                if next_name
+                else (size, total_lines + 1)
+            )
+            patches.append((pos, pos, b"\n" + content, file_name, line_no, 0))
+        elif file_data[FILE_LINE]:
+            patches.append(
+                (old.offset, old.offset + old.length, content, file_name, old.start - 1, old.end - old.start + 1)
+            )
+        else:
+            # 删除分段（含前面的空行）
+            patches.append(
+                (old.offset - 1, old.offset + old.length, b"", file_name, old.start - 2, old.end - old.start + 2)
+            )
+
+    patches.sort(key=lambda p: (p[0], p[1]))
+    moved = {}  # 分段的新位置：{file_name: (offset, start, end)}
+    byte_delta = line_delta = 0
+    for start, end, content, file_name, line_no, old_lines in patches:
+        # 之前的补丁造成的偏移，作用于本补丁之前（且未变化）的分段
+        for name in names:
+            sec = sections[name]
+            if name not in moved and name not in prop_data and sec.offset < start:
+                moved[name] = (sec.offset + byte_delta, sec.start + line_delta, sec.end + line_delta)
+        new_lines = content.count(b"\n")
+        if content:
+            blank = 1 if content.startswith(b"\n") else 0  # 插入的分段前面有空行
+            new_start = line_no + line_delta + blank + 1
+            file_stats = prop_data[file_name][MSG_STATS]
+            file_stats[START] = new_start
+            file_stats[END] = new_start + len(prop_data[file_name][FILE_LINE])
+            file_stats[OFFSET] = start + byte_delta + blank
+            file_stats[LENGTH] = len(content) - blank
+        byte_delta += len(content) - (end - start)
+        line_delta += new_lines - old_lines
+    for name in names:
+        if name not in moved and name not in prop_data:
+            sec = sections[name]
+            moved[name] = (sec.offset + byte_delta, sec.start + line_delta, sec.end + line_delta)
+
+    # 普通语言文件：平移未变化分段的位置（yml中未定义的文件自动跳过）
+    if lang_code != BASE_LANG:
+        for name, (offset, start, end) in moved.items():
+            stat = file_yml.get(name, {}).get(YML_STAT, {}).get(lang_code)
+            if stat and (offset, start, end) != (stat.get(OFFSET), stat.get(START), stat.get(END)):
+                file_stats = {k: v for k, v in stat.items()}
+                file_stats.update({START: start, END: end, OFFSET: offset, LENGTH: sections[name].length})
+                file_lang_inline_format(file_yml[name][YML_STAT], lang_code, file_stats)
+
+    return prop_data, [p[:3] for p in patches]
+
+
 def update_lang_properties(lang_code, msg_detail, file_yml, test_run):
     """
     主函数：处理语言文件(指定语言)
-    1) 读取原有properties数据
+    1) 读取原有properties数据（指定文件时，只读取并改写对应分段）
     2) 合并重新计算的msg_detail数据
     3) _lang.properties的特殊处理：
          - merge时候，始终采用新数据
@@ -449,24 +476,28 @@ def update_lang_properties(lang_code, msg_detail, file_yml, test_run):
          - merge时候，始终采用旧数据
          - 执行完毕，改写file_yml
     """
-    # 从语言文件中读取原始数据
-    prop_data = parse_lang_prop(lang_code)
-    # 如果 FULL_OPERATE 为 True，从 prop_data 中移除 msg_detail 中没有的记录
-    if FULL_OPERATE:
+    if not FULL_OPERATE:
+        # 只处理指定文件：按分段改写，开销与语言文件大小无关
+        prop_data, patches = patch_lang_properties(lang_code, msg_detail, file_yml)
+        if not test_run and patches:
+            splice_lang_prop(lang_code, patches)
+    else:
+        # 从语言文件中读取原始数据，从 prop_data 中移除 msg_detail 中没有的记录
+        prop_data = parse_lang_prop(lang_code)
         prop_data = {k: v for k, v in prop_data.items() if k in msg_detail or k == FILE_HEAD}
 
-    for file_name, file_data in msg_detail.items():
-        if not (file_name in prop_data):
-            prop_data[file_name] = parse_lang_data(file_data)  # 补充：新添加的文件
-        else:
-            merge_lang_data(prop_data[file_name], file_data, lang_code != BASE_LANG)  # 合并：已有的文件
+        for file_name, file_data in msg_detail.items():
+            if not (file_name in prop_data):
+                prop_data[file_name] = parse_lang_data(file_data)  # 补充：新添加的文件
+            else:
+                merge_lang_data(prop_data[file_name], file_data, lang_code != BASE_LANG)  # 合并：已有的文件
 
-    # 生成new_lines
-    new_lines = handle_prop_data(prop_data)
+        # 生成new_lines
+        new_lines = handle_prop_data(prop_data)
 
-    # 写文件
-    if not test_run:
-        write_lang_prop(lang_code, new_lines)
+        # 写文件
+        if not test_run:
+            write_lang_prop(lang_code, new_lines)
 
     if lang_code == BASE_LANG:
         clean_lang_data(msg_detail)  # 清除：备注字段（只在_lang文件中使用一次！）
@@ -475,42 +506,102 @@ def update_lang_properties(lang_code, msg_detail, file_yml, test_run):
 
 
 def read_lang_yml():
-    """读取yml语言文件为字典"""
-    yaml = YAML()  # 处理yaml文件
-    with open(YML_PATH, "r") as f:
-        data = yaml.load(f)  # 读yaml
+    """
+    读取语言元数据为字典
+    1) config：人工维护，来自 _lang.yml（C loader）
+    2) file | coll | config.stats | config.changed：自动生成，来自 _lang.json（旧版本的 _lang.yml 中也可能包含）
+
+    返回:
+    - data：合并后的数据；yml_data：_lang.yml 的原始内容（写入时判断是否需要改写 yml）
+    """
+    with open(YML_PATH, "r", encoding="utf-8") as f:
+        yml_data = YAML(typ="safe").load(f)
+    data = {"config": dict(yml_data["config"]), YML_FILE: yml_data.get(YML_FILE)}
+
+    if META_PATH.exists():
+        with open(META_PATH, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        data["config"].update(meta["config"])
+        data[YML_FILE] = meta[YML_FILE]
+        data[YML_COLL] = meta.get(YML_COLL)
+
+    return data, yml_data
+
+
+def write_lang_meta(meta):
+    """写入 _lang.json：每个文件一行（便于对比差异），临时文件 + 原子重命名"""
+    lines = ["{", f'"config": {json.dumps(meta["config"], ensure_ascii=False)},']
+    lines.extend([f'"{YML_WIDEN}": {json.dumps(meta[YML_WIDEN])},', f'"{YML_COLL}": {{'])  # shell 逐行读取冲突索引
+    lines.append(",\n".join(f"{json.dumps(k)}: {json.dumps(v)}" for k, v in meta[YML_COLL].items()))
+    lines.extend(["},", f'"{YML_FILE}": {{'])
+    lines.append(",\n".join(f"{json.dumps(k)}: {json.dumps(v, ensure_ascii=False)}" for k, v in meta[YML_FILE].items()))
+    lines.extend(["}", "}"])
 
-    return data, yaml
+    tmp_path = META_PATH.with_name(f".{META_PATH.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, META_PATH)
 
 
-def write_lang_yml(data, yaml):
-    """读取yml语言文件为字典"""
-    with open(YML_PATH, "w") as f:
-        yaml.dump(data, f)
+def write_lang_yml(data, yml_data):
+    """
+    写入语言元数据
+    1) 自动生成的部分：每次写入 _lang.json
+    2) config：只在内容变化（或移除旧版本的自动生成部分）时，才改写 _lang.yml（保留注释）
+    """
+    config_yml = {k: v for k, v in data["config"].items() if k not in META_KEYS}
+    write_lang_meta(
+        {
+            "config": {k: data["config"][k] for k in META_KEYS if k in data["config"]},
+            YML_WIDEN: COLL_CONFIG["widen"],
+            YML_COLL: data.get(YML_COLL) or {},
+            YML_FILE: data[YML_FILE],
+        }
+    )
+
+    if yml_data == {"config": config_yml}:
+        return  # config 没有变化
+
+    yaml = YAML()  # 处理yaml文件（round-trip，保留注释）
+    with open(YML_PATH, "r", encoding="utf-8") as f:
+        rt_data = yaml.load(f)
+    rt_data.pop(YML_FILE, None)
+    for key in list(rt_data["config"]):
+        if key not in config_yml:
+            del rt_data["config"][key]
+    for key, value in config_yml.items():
+        if rt_data["config"].get(key) != value:
+            rt_data["config"][key] = value
+    with open(YML_PATH, "w", encoding="utf-8") as f:
+        yaml.dump(rt_data, f)
 
 
 # 拦截器装饰器
 def yaml_file_interceptor():
     """
     拦截器装饰器，处理YAML文件的读取和写入
-    1) 前置处理：读取_lang.yml
-    2) 主程序：写入properties文件，并重构YAML文件内容
-    3）后置处理：写入_lang.yml
+    1) 前置处理：读取_lang.yml + _lang.json
+    2) 主程序：写入properties文件，合并各语言的 file_yml 变化
+    3）后置处理：写入_lang.json（config 变化时写入_lang.yml）
     """
 
     def decorator(main_func):
         def wrapper(lang_files, lang_data, test_run=False):
             # 前置处理：读取YAML文件
-            data, yaml = read_lang_yml()
+            data, yml_data = read_lang_yml()
             file_yml = set_global_data(data)  # 设置全局变量
 
-            # 执行主函数 update_lang_files
-            main_func(lang_files, lang_data, test_run, file_yml)
+            # 执行主函数 update_lang_files，合并各语言(worker)返回的 file_yml 变化
+            for lang_code, delta in main_func(lang_files, lang_data, test_run, file_yml):
+                merge_yml_delta(file_yml, lang_code, delta)
 
             # 后置处理：只在数据变化且非测试运行时写入文件
             stat_config_yml(data)  # 设置统计信息
+            data[YML_COLL] = {  # 冲突索引：只保留有冲突、且仍有消息的文件
+                k: sorted(v) for k, v in sorted(COLL_KEYS.items()) if v and (k == COLL_ALL or k in data[YML_FILE])
+            }
             if not test_run:
-                write_lang_yml(data, yaml)
+                write_lang_yml(data, yml_data)
                 LangCache.get_instance().clear_cache()
 
             return data
@@ -520,26 +611,83 @@ def yaml_file_interceptor():
     return decorator
 
 
+def yml_delta(lang_code, old_yml, new_yml):
+    """file_yml 中指定语言的变化：{file_name: 文件参数 + 该语言的stats}"""
+    delta = {}
+    for file_name, file_info in new_yml.items():
+        stat = (file_info.get(YML_STAT) or {}).get(lang_code)
+        if stat is None or file_info == old_yml.get(file_name):
+            continue
+        delta[file_name] = {**{k: v for k, v in file_info.items() if k != YML_STAT}, YML_STAT: {lang_code: stat}}
+    return delta
+
+
+def merge_yml_delta(file_yml, lang_code, delta):
+    """合并 worker 返回的 file_yml 变化（每个 worker 只改写自己语言的stats）"""
+    for file_name, file_info in delta.items():
+        if file_name not in file_yml:  # 新增文件
+            file_yml[file_name] = {k: v for k, v in file_info.items() if k != YML_STAT}
+        else:
+            file_yml[file_name]["changed"] = file_info["changed"]
+        if file_yml[file_name].get(YML_STAT) is None:
+            file_yml[file_name][YML_STAT] = {}
+        file_yml[file_name][YML_STAT][lang_code] = file_info[YML_STAT][lang_code]
+
+
+def update_lang_worker(lang_code, msg_detail, file_yml, test_run, settings):
+    """
+    Worker：处理一个普通语言文件（独立进程）
+    返回 (lang_code, file_yml变化)，由拦截器合并
+    """
+    global DEL_MODE, TRIM_SPACE, DJB2_LEN, FULL_OPERATE
+    DEL_MODE, TRIM_SPACE, DJB2_LEN, FULL_OPERATE, coll_config, coll_keys = settings  # 子进程中重新设置全局变量
+    init_coll_config(coll_config["scope"], coll_config["widen"], coll_keys)  # spawn | forkserver 不继承冲突索引
+
+    new_yml = json.loads(json.dumps(file_yml))  # 深拷贝（file_yml 只包含 dict | list | str | int）
+    update_lang_properties(lang_code, msg_detail, new_yml, test_run)
+    return lang_code, yml_delta(lang_code, file_yml, new_yml)
+
+
 # 主函数
 @yaml_file_interceptor()
 def update_lang_files(lang_codes, files, test_run=False, file_yml=None):
     """
     处理语言文件(元数据)
+    1) _lang 先处理（清除备注字段）
+    2) 普通语言文件相互独立：多进程并发处理，返回各自的 file_yml 变化
+
     :param lang_codes: 语言
     :param files: 语言文件列表
     :param test_run: 是否测试运行
     :param file_yml: 由拦截器注入的YAML数据
+    :return: [(lang_code, file_yml变化), ...]
     """
     global FULL_OPERATE  # 是否完整操作(处理所有文件)
     FULL_OPERATE = not files
 
     # 解析语言消息
-    msg_detail_sh = ShellASTParser(TRIM_SPACE).parse_code_files(files)  # 语言消息 - shell
+    msg_detail_sh = ShellLexParser(TRIM_SPACE).parse_code_files(files)  # 语言消息 - shell
     msg_detail_py = PythonASTParser(TRIM_SPACE).parse_code_files(files)  # 语言消息 - python
     msg_detail = {**msg_detail_sh, **msg_detail_py}
+    if COLL_CONFIG["scope"] == COLL_GLOBAL:
+        set_global_msgs(msg_detail, FULL_OPERATE)  # 跨文件的hash冲突
+    else:
+        COLL_KEYS.pop(COLL_ALL, None)
     # 写入yml和properties配置
-    for lang_code in (BASE_LANG, *lang_codes):
-        update_lang_properties(lang_code, msg_detail, file_yml, test_run)
+    update_lang_properties(BASE_LANG, msg_detail, file_yml, test_run)
+
+    coll_keys = {k: set(v) for k, v in COLL_KEYS.items()}  # 快照：单进程时 init_coll_config 会先清空 COLL_KEYS
+    settings = (DEL_MODE, TRIM_SPACE, DJB2_LEN, FULL_OPERATE, dict(COLL_CONFIG), coll_keys)
+    max_workers = min(len(lang_codes), os.cpu_count() or 1)
+    if max_workers <= 1:  # 单语言或单核：直接处理，省去进程池开销
+        return [update_lang_worker(lang_code, msg_detail, file_yml, test_run, settings) for lang_code in lang_codes]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(update_lang_worker, lang_code, msg_detail, file_yml, test_run, settings)
+            for lang_code in lang_codes
+        ]
+        return [future.result() for future in futures]  # 按语言顺序合并
 
 
 # =============================================================================
@@ -548,7 +696,7 @@ def update_lang_files(lang_codes, files, test_run=False, file_yml=None):
 # shell调用方法：通过环境变量传参
 # =============================================================================
 def run_exec(opts):
-    lang_codes = ["zh", "en"]  # 语言消息
+    lang_codes = opts["lang"] or ["zh", "en"]  # 语言消息
     # 修改语言文件(yml和properties)
     update_lang_files(lang_codes, opts["file"])
 
@@ -573,7 +721,7 @@ def run_test(opts):
 # =============================================================================
 def debug_assertion(data, lang_codes):
     # 读yaml
-    (old_data, yaml) = read_lang_yml()
+    (old_data, _) = read_lang_yml()
 
     old_stat = old_data["config"][YML_STAT]
     new_stat = data["config"][YML_STAT]
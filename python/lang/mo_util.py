@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+"""
+Compile language properties files into runtime catalogues, one per language
+1) gettext .mo: msgid = "file:hash", msgstr = localized message (python runtime, gettext | TEXTDOMAINDIR)
+2) bash source file: precomputed "file:hash" and "file:literal" maps (lib/lang_utils.sh, no hashing in bash)
+Layout: config/lang/locale/<lang_code>/LC_MESSAGES/messages.mo | config/lang/locale/<lang_code>/messages.sh
+Base module, DO NOT depends on other modules
+"""
+
+import gettext
+import os
+from pathlib import Path
+import struct
+import sys
+import time
+from typing import Dict, Iterator, Optional
+
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))  # add root sys.path
+
+from python.lang.prop_reader import read_properties
+
+
+# 获取当前文件的绝对路径的父目录
+PARENT_DIR = Path(__file__).resolve().parent.parent.parent
+PROP_PATH = PARENT_DIR / "config" / "lang"
+LOCALE_PATH = PROP_PATH / "locale"
+MO_DOMAIN = "messages"
+MO_MAGIC = 0x950412DE
+MO_HEADER = "Content-Type: text/plain; charset=UTF-8\n"  # "" 条目：GNUTranslations 按 UTF-8 解码
+BASE_LANG = "_lang"  # 源文本（代码中提取的原文）
+SH_POSTFIX = ".sh"
+
+
+def mo_path(lang_code: str, root: Path = LOCALE_PATH) -> Path:
+    """Path of the compiled catalogue of a language"""
+    return root / lang_code / "LC_MESSAGES" / f"{MO_DOMAIN}.mo"
+
+
+def sh_path(lang_code: str, root: Path = LOCALE_PATH) -> Path:
+    """Path of the compiled bash messages of a language"""
+    return root / lang_code / f"{MO_DOMAIN}.sh"
+
+
+def is_fresh(mo_file: Path, prop_file: Path) -> bool:
+    """.mo 是否为最新（不早于 properties 文件）"""
+    try:
+        return os.stat(mo_file).st_mtime_ns >= os.stat(prop_file).st_mtime_ns
+    except OSError:
+        return False
+
+
+def _hash_string(text: bytes) -> int:
+    """GNU gettext 的 hashpjw（与 libintl 查找 .mo 哈希表时一致）"""
+    hval = 0
+    for byte_value in text:
+        hval = ((hval << 4) + byte_value) & 0xFFFFFFFF
+        g = hval & 0xF0000000
+        if g:
+            hval ^= g >> 24
+            hval ^= g
+    return hval
+
+
+def _next_prime(n: int) -> int:
+    """不小于 n 的最小奇质数（哈希表大小）"""
+    n |= 1
+    while any(n % d == 0 for d in range(3, int(n**0.5) + 1, 2)):
+        n += 2
+    return n
+
+
+def write_mo(mo_file: Path, messages: Dict[str, str]) -> None:
+    """
+    写入 .mo 文件（little endian，按 msgid 排序 + 哈希表），临时文件 + 原子重命名
+
+    Args:
+        messages: {msgid: msgstr}
+    """
+    entries = sorted((k.encode("utf-8"), v.encode("utf-8")) for k, v in {"": MO_HEADER, **messages}.items())
+    count = len(entries)
+    hash_size = max(3, _next_prime(count * 4 // 3))
+    orig_offset = 7 * 4
+    trans_offset = orig_offset + count * 8
+    hash_offset = trans_offset + count * 8
+    str_offset = hash_offset + hash_size * 4
+
+    # 字符串表：原文在前，译文在后（以 NUL 结尾）
+    orig_table, trans_table, strings = [], [], []
+    for msgid, _ in entries:
+        orig_table.append((len(msgid), str_offset))
+        strings.append(msgid + b"\0")
+        str_offset += len(msgid) + 1
+    for _, msgstr in entries:
+        trans_table.append((len(msgstr), str_offset))
+        strings.append(msgstr + b"\0")
+        str_offset += len(msgstr) + 1
+
+    # 哈希表：开放寻址（双重哈希），存放 1 起始的条目序号
+    hash_table = [0] * hash_size
+    for i, (msgid, _) in enumerate(entries):
+        hval = _hash_string(msgid)
+        idx = hval % hash_size
+        incr = 1 + hval % (hash_size - 2)
+        while hash_table[idx]:
+            idx = idx + incr - hash_size if idx + incr >= hash_size else idx + incr
+        hash_table[idx] = i + 1
+
+    data = [struct.pack("<7I", MO_MAGIC, 0, count, orig_offset, trans_offset, hash_size, hash_offset)]
+    data.extend(struct.pack("<2I", *entry) for entry in orig_table + trans_table)
+    data.append(struct.pack(f"<{hash_size}I", *hash_table))
+    data.extend(strings)
+
+    mo_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = mo_file.with_name(f".{mo_file.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(b"".join(data))
+    os.replace(tmp_path, mo_file)
+
+
+def compile_mo(lang_code: str, prop_path: Path = PROP_PATH, root: Path = LOCALE_PATH) -> Path:
+    """编译指定语言的 properties 文件（所有分段，多行消息已合并）为 .mo 文件"""
+    messages = {
+        f"{event.section}:{event.key}": event.value
+        for event in read_properties(prop_path / f"{lang_code}.properties", join=True)
+        if event.key and event.section
+    }
+    mo_file = mo_path(lang_code, root)
+    write_mo(mo_file, messages)
+    return mo_file
+
+
+def _sh_quote(text: str) -> str:
+    """bash 单引号字符串"""
+    return "'" + text.replace("'", "'\\''") + "'"
+
+
+def _sh_value(value: str) -> str:
+    """多行消息按 lib/lang_utils.sh 的规则合并：去掉行尾 "\\" 之后的内容，下一行去掉行首空格后直接拼接"""
+    parts = value.split("\n")
+    parts = parts[:1] + [part.lstrip() for part in parts[1:]]
+    return "".join(part[: part.rfind("\\")] for part in parts[:-1]) + parts[-1]
+
+
+def compile_sh(lang_code: str, prop_path: Path = PROP_PATH, root: Path = LOCALE_PATH) -> Path:
+    """
+    编译指定语言的 .sh 消息为 bash 文件（source 后定义关联数组）
+    - LANGUAGE_MSGS["file:hash"]：与读取 properties 文件的结果相同
+    - LANGUAGE_LITERALS["file:原文"]：直接按原文查找，运行时不再计算hash
+    """
+    literals = {
+        f"{event.section}:{event.key}": event.value
+        for event in read_properties(prop_path / f"{BASE_LANG}.properties")
+        if event.key and event.section.endswith(SH_POSTFIX)
+    }
+    messages = {
+        f"{event.section}:{event.key}": _sh_value(event.value)
+        for event in read_properties(prop_path / f"{lang_code}.properties")
+        if event.key and event.section.endswith(SH_POSTFIX)
+    }
+
+    lines = [f"# Generated from {lang_code}.properties by python/i18n.py compile (DO NOT UPDATE)", ""]
+    lines.append("declare -gA LANGUAGE_MSGS=(")
+    lines.extend(f"  [{_sh_quote(k)}]={_sh_quote(v)}" for k, v in messages.items())
+    lines.extend([")", "", "declare -gA LANGUAGE_LITERALS=("])
+    for key, value in messages.items():
+        if key in literals:
+            section = key.rsplit(":", 1)[0]
+            lines.append(f"  [{_sh_quote(f'{section}:{literals[key]}')}]={_sh_quote(value)}")
+    lines.extend([")", "", "LANGUAGE_COMPILED=1", ""])
+
+    sh_file = sh_path(lang_code, root)
+    sh_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = sh_file.with_name(f".{sh_file.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+    os.replace(tmp_path, sh_file)
+    return sh_file
+
+
+class MoCatalog(gettext.GNUTranslations):
+    """
+    Compiled catalogue with the read-only interface of diskcache.Cache used by LangCache (get | iterkeys | close)
+    """
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        return self._catalog.get(key, default)
+
+    def iterkeys(self) -> Iterator[str]:
+        return (k for k in self._catalog if k)  # 跳过 "" 条目（catalogue 头部）
+
+    def close(self) -> None:
+        pass
+
+
+def load_mo(mo_file: Path) -> MoCatalog:
+    """读取 .mo 文件"""
+    with open(mo_file, "rb") as f:
+        return MoCatalog(f)
+
+
+# =============================================================================
+# Debug test function (compile + benchmark: .mo vs properties)
+# ./python/lang/mo_util.py [zh en ...]
+# =============================================================================
+def main():
+    lang_codes = sys.argv[1:] or sorted(p.stem for p in PROP_PATH.glob("*.properties") if p.stem[0] not in "_.")
+    rounds = 50
+
+    for lang_code in lang_codes:
+        prop_file = PROP_PATH / f"{lang_code}.properties"
+        mo_file = compile_mo(lang_code)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            props = {f"{ev.section}:{ev.key}": ev.value for ev in read_properties(prop_file, join=True) if ev.key}
+        prop_ms = (time.perf_counter() - start) / rounds * 1000
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            catalog = load_mo(mo_file)
+        mo_ms = (time.perf_counter() - start) / rounds * 1000
+
+        same = all(catalog.get(k) == v for k, v in props.items()) and sum(1 for _ in catalog.iterkeys()) == len(props)
+        print(f"{lang_code:<6} {len(props):5d} messages  properties {prop_ms:6.2f} ms  mo {mo_ms:6.2f} ms  same={same}")
+
+
+# =============================================================================
+# Command-line entry point
+# =============================================================================
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+
+"""
+Streaming reader for language properties files
+Shared by lang_cache (runtime messages), lang_util (i18n update) and msg_handler (global messages).
+Base module, DO NOT depends on other modules
+"""
+
+import io
+from pathlib import Path
+import re
+import sys
+import time
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
+
+
+# 文件匹配模式
+FILE_MODE = "c|cpp|java|js|py|sh|ts"
+SECTION_MATCH = re.compile(rf"^#\s*■=(\S+\.(?:{FILE_MODE}))$")  # 文件分段：# ■=python/i18n.py
+REMARK_MATCH = re.compile(r"^#\s*●=(\S+)$")  # 消息备注：# ●=exiterr@25
+MSG_MATCH = re.compile(r"^([A-Za-z0-9_-]+)\s*=\s*(.*?)(\s#[A-Za-z0-9_-]+@\d+@\S*)?$")  # 消息：key=value
+COMMENTED_MSG_MATCH = re.compile(r"^#?\s*([A-Za-z0-9_-]+)\s*=\s*(.*?)(\s#[A-Za-z0-9_-]+@\d+@\S*)?$")
+CONTINUED = re.compile(r"(?<!\\)\\$")  # 行尾孤立的 "\"：多行消息
+
+
+class SectionRange(NamedTuple):
+    """properties 文件中的一个文件分段（# ■=file 标记行 + 内容行）"""
+
+    offset: int  # 标记行的起始字节
+    length: int  # 分段字节数（到最后一个非空行的换行符为止）
+    start: int  # 第一行内容的行号（从1开始）
+    end: int  # 最后一行内容的下一行行号
+
+
+class PropEvent(NamedTuple):
+    """properties 文件中的一个逻辑行（多行消息合并为一个事件）"""
+
+    section: str  # 文件分段(# ■=file)，头部注释为 ""
+    key: Optional[str]  # 消息 key；注释行 | 分段行为 None
+    value: str  # 消息内容；注释行 | 分段行为去掉首尾空格的原文
+    comment: str  # 消息备注（上一行 # ●=...）
+    line_range: Tuple[int, int]  # 行号范围 [start, end]（从1开始）
+    raw: Tuple[str, ...]  # 原始行（不含换行符）
+
+
+def read_properties(fn, commented: bool = False, join: bool = False) -> Iterator[PropEvent]:
+    """
+    逐行读取 properties 文件，生成 PropEvent（空行跳过）
+
+    Args:
+        fn: properties 文件路径
+        commented: 是否把注释掉的消息(# key=value)也当作消息
+        join: 多行消息的格式
+            - False: 保留行尾的 "\\"，用 "\\n" 拼接（与代码中提取的原文一致）
+            - True: 去掉行尾的 "\\"，用 "\\n" 拼接（运行时的消息文本）
+    """
+    with open(fn, "r", encoding="utf-8") as fh:
+        yield from _read_events(fh, commented, join)
+
+
+def read_section(
+    fn, offset: int, length: int, commented: bool = False, join: bool = False, section: Optional[str] = None
+) -> Iterator[PropEvent]:
+    """
+    只读取 properties 文件的一个分段（懒加载：按字节偏移定位，不解析其它分段）
+
+    Args:
+        fn: properties 文件路径
+        offset: 分段起始字节（# ■=file 标记行）
+        length: 分段字节数
+        commented | join: 同 read_properties（line_range 为分段内的相对行号）
+        section: 分段名称：校验 offset 处是该分段的标记行，
+            不是（字节范围已过期）则重新扫描分段，仍找不到时完整读取文件，只返回该分段的消息
+    """
+    with open(fn, "rb") as fh:
+        data = _read_range(fh, offset, length, section)
+        if data is None:
+            sec = scan_sections(fn)[0].get(section)
+            data = _read_range(fh, sec.offset, sec.length, section) if sec else None
+    if data is None:
+        events = read_properties(fn, commented, join)
+        yield from (event for event in events if event.section == section)
+        return
+    yield from _read_events(io.StringIO(data), commented, join)
+
+
+def _read_range(fh, offset: int, length: int, section: Optional[str]) -> Optional[str]:
+    """读取字节范围；无法解码 | 不是以 section 的标记行开始 | 没有在分段结尾（空行 | 文件末尾）结束时返回 None"""
+    fh.seek(offset)
+    try:
+        data = fh.read(length).decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    if section is not None:
+        match = SECTION_MATCH.match(data.split("\n", 1)[0].strip())
+        if not match or match.group(1) != section:
+            return None
+        if not data.endswith("\n") or fh.readline().strip():
+            return None  # 分段被截断（记录字节范围后文件被修改）
+    return data
+
+
+def scan_sections(fn) -> Tuple[Dict[str, SectionRange], int, int]:
+    """
+    只扫描文件分段标记（不解析消息），用于按分段改写文件
+
+    Returns:
+        ({section: SectionRange}, 文件字节数, 文件行数)
+    """
+    sections: Dict[str, SectionRange] = {}
+    section = None
+    offset = line_no = 0
+    with open(fn, "rb") as fh:
+        for line in fh:
+            line_no += 1
+            stripped = line.strip()
+            if stripped.startswith(b"#"):
+                match = SECTION_MATCH.match(stripped.decode("utf-8"))
+                if match:
+                    section = match.group(1)
+                    sections[section] = SectionRange(offset, len(line), line_no + 1, line_no + 1)
+            if section and stripped:
+                # 非空行：延伸当前分段（分段之间的空行不属于任何分段）
+                sec = sections[section]
+                sections[section] = sec._replace(length=offset + len(line) - sec.offset, end=line_no + 1)
+            offset += len(line)
+
+    return sections, offset, line_no
+
+
+def _read_events(fh, commented: bool, join: bool) -> Iterator[PropEvent]:
+    """逐行解析文本流，生成 PropEvent"""
+    msg_match = COMMENTED_MSG_MATCH if commented else MSG_MATCH
+    section = ""
+    remark = ""
+
+    line_no = 0
+    for line in fh:
+        line_no += 1
+        line = line.rstrip("\n")
+        stripped = line.strip()
+        if not stripped:
+            remark = ""
+            continue  # 空行
+
+        match = SECTION_MATCH.match(stripped)
+        if match:
+            section = match.group(1)
+            remark = ""
+            yield PropEvent(section, None, stripped, "", (line_no, line_no), (line,))
+            continue
+
+        match = msg_match.match(line.lstrip())
+        if not match:
+            match = REMARK_MATCH.match(stripped)
+            yield PropEvent(section, None, stripped, "", (line_no, line_no), (line,))
+            remark = match.group(1) if match else ""
+            continue
+
+        # 消息：处理多行（行尾孤立的 "\"）
+        start = line_no
+        raw = [line]
+        parts = [match.group(2)]
+        while CONTINUED.search(parts[-1].rstrip()):
+            parts[-1] = parts[-1].rstrip()
+            next_line = fh.readline()
+            if not next_line:
+                break  # 文件结束
+            line_no += 1
+            next_line = next_line.rstrip("\n")
+            raw.append(next_line)
+            parts.append(next_line)
+
+        if join:
+            value = "\n".join(part[:-1] for part in parts[:-1]) + "\n" + parts[-1] if len(parts) > 1 else parts[0]
+        else:
+            value = "\n".join(parts)
+
+        yield PropEvent(section, match.group(1), value, remark, (start, line_no), tuple(raw))
+        remark = ""
+
+
+# =============================================================================
+# Debug test function (benchmark: read all properties files)
+# ./python/lang/prop_reader.py [config/lang/en.properties ...]
+# =============================================================================
+def main():
+    files = sys.argv[1:] or sorted(
+        str(p) for p in (Path(__file__).resolve().parent.parent.parent / "config" / "lang").glob("*.properties")
+    )
+    rounds = 50
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        counts = {fn: sum(1 for ev in read_properties(fn, commented=True) if ev.key) for fn in files}
+    elapsed = (time.perf_counter() - start) / rounds * 1000
+
+    for fn, count in counts.items():
+        print(f"{count:6d} messages  {fn}")
+    print(f"{elapsed:.2f} ms/run ({len(files)} files)")
+
+
+# =============================================================================
+# Command-line entry point
+# =============================================================================
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ from iso3166 import countries
 import requests
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urljoin, urlparse
+from urllib.request import getproxies
 import statistics
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
@@ -25,6 +26,9 @@ from python.read_util import confirm_action
 from python.cmd_handler import pm_refresh, pm_upgrade
 from python.msg_handler import _mf, error, info, string, warning
 from python.file_util import write_array
+from python.mirror.probe_limit import AimdLimiter, probe_budget
+from python.mirror.probe_timing import HostResolver, ProbeTiming, timed_get
+from python.mirror.mirror_fresh import FRESH_BYTES, format_lag, is_stale, lag_penalty, parse_index_time
 
 setup_logging()
 
@@ -39,6 +43,18 @@ files_map = {
     "opensuse": ["distribution/leap/15.5/repo/oss/ls-lR.gz", "distribution/leap/15.5/repo/oss/INDEX.gz"],
     "arch": ["core/os/x86_64/core.db.tar.gz", "extra/os/x86_64/extra.db.tar.gz"],
 }
+PROBE_BYTES = 100 * 1024  # bytes downloaded by one probe (less when the probe budget is tight)
+
+# small signed index with the sync time of the mirror (freshness check)
+fresh_map = {
+    "debian": "dists/{codename}/InRelease",
+    "ubuntu": "dists/{codename}/InRelease",
+    "centos": "7.9.2009/os/x86_64/repodata/repomd.xml",
+    "rhel": "repodata/repomd.xml",
+    "opensuse": "distribution/leap/15.5/repo/oss/repodata/repomd.xml",
+    "arch": "lastsync",
+}
+default_codename = {"debian": "bookworm", "ubuntu": "jammy"}  # same suites as files_map
 
 
 def _is_url_accessible(url: str) -> bool:
@@ -63,6 +79,17 @@ class MirrorResult:
     response_time: float  # seconds
     success_rate: float  # 0-1
     error_msg: Optional[str] = None
+    dns_time: float = 0.0  # seconds, resolved once per host before the test
+    connect_time: float = 0.0  # seconds, TCP connect to the resolved address
+    tls_time: float = 0.0  # seconds, TLS handshake (0 for http)
+    ttfb: float = 0.0  # seconds, request sent => response headers
+    index_time: Optional[float] = None  # sync time from the signed index (unix time), None if unknown
+    lag: Optional[float] = None  # seconds behind the freshest candidate, None if unknown
+
+    @property
+    def conn_time(self) -> float:
+        """Connection-level latency (connect + TLS + TTFB), what a package manager with a resolved address sees"""
+        return self.connect_time + self.tls_time + self.ttfb
 
 
 def get_country_name(country_code):
@@ -86,6 +113,12 @@ class MirrorTester:
             }
         )
         self.os_info = OSInfoCache.get_instance().get()
+        self.host = OSInfoCache.get_instance().get_host()  # host capacity (concurrency sizing)
+        self.limiter = AimdLimiter(initial=4, minimum=2, maximum=32)  # in-flight probes (reset by test_all_mirrors)
+        self.budget = probe_budget(1, PROBE_BYTES)  # probe traffic budget (reset by test_all_mirrors)
+        self.cancelled = threading.Event()
+        self.resolver = HostResolver()  # mirror hosts resolved once per run (test_all_mirrors)
+        self.env_proxies = {k: v for k, v in getproxies().items() if k in ("http", "https")}  # probe through requests
         self.system_country = os.environ.get("LANGUAGE").split("_")[1].split(":")[0]
         self.path = None  # package management configuation file
         self.urls = []  # urls in the core configuration file
@@ -93,6 +126,7 @@ class MirrorTester:
         self.mirror_list = ""
         self.netlocs = set()  # Unique domain names set (domain support both https and http, use https)
         self.is_debug = os.environ.get("DEBUG") == "0"  # debug flag
+        self.proxy = os.environ.get("MIRROR_PROXY")  # caching proxy (mirror_proxy.py), e.g. http://10.0.0.2:3142/
 
     def fetch_mirror_list(self, limit: int = None) -> None:
         print()
@@ -136,55 +170,59 @@ class MirrorTester:
         speeds = []
         max_speed = 0
         response_times = []
+        timings: List[ProbeTiming] = []  # 成功的探测（分段耗时）
         success_count = 0
         error_msg = None
+        exhausted = False  # 探测流量预算用完
 
         for i in range(test_count):
             for test_file in test_files:
+                granted = used = 0
                 try:
                     test_url = urljoin(url + "/", test_file)
 
                     if self.cancelled.is_set():
                         return None  # 强行中断，退出
 
-                    start_time = time.time()
-                    response = self.session.get(test_url, timeout=5, stream=True)  # 5秒超时
+                    granted = self.budget.grant(first=not speeds, cancelled=self.cancelled)
+                    if not granted:
+                        exhausted = True
+                        break
+
+                    with self.limiter.slot(self.cancelled) as sample:
+                        timing = self.probe(test_url, granted)  # 5秒超时，只请求预算内的字节
+                        sample.latency, sample.nbytes = timing.latency, timing.nbytes
+                        sample.ok = timing.error is None  # 失败：按 slot 耗时计入（connect 等为 0）
+                    used = timing.nbytes
 
                     if self.cancelled.is_set():
                         return None  # 强行中断，退出
 
-                    if response.status_code == 200:
-                        # 下载部分数据来测试速度
-                        downloaded = 0
-                        chunk_start = time.time()
-
-                        for chunk in response.iter_content(chunk_size=8192):
-                            downloaded += len(chunk)
-                            if downloaded > 100 * 1024:  # 下载100KB后停止
-                                break
-
-                        end_time = time.time()
-                        elapsed = end_time - chunk_start
+                    if timing.error is None and timing.transfer > 0 and timing.nbytes > 0:
+                        speed = timing.nbytes / timing.transfer / 1024  # KB/s
 
-                        if elapsed > 0 and downloaded > 0:
-                            speed = downloaded / elapsed / 1024  # KB/s
+                        # 检查是否超过速率限制 (设置阈值为 < limit_cap的1/3)
+                        if limit_cap:
+                            max_speed = max(max_speed, speed)
+                            if max_speed < limit_cap / test_count:
+                                return None  # 超过限制，退出
 
-                            # 检查是否超过速率限制 (设置阈值为 < limit_cap的1/3)
-                            if limit_cap:
-                                max_speed = max(max_speed, speed)
-                                if max_speed < limit_cap / test_count:
-                                    return None  # 超过限制，退出
-
-                            speeds.append(speed)
-                            response_times.append(end_time - start_time)
-                            success_count += 1
-                            break  # 成功就跳出文件循环
-
-                    response.close()
+                        speeds.append(speed)
+                        response_times.append(timing.latency + timing.transfer)
+                        timings.append(timing)
+                        success_count += 1
+                        break  # 成功就跳出文件循环
+                    error_msg = timing.error
 
                 except Exception as e:
                     error_msg = str(e)
                     continue
+                finally:
+                    if granted:
+                        self.budget.settle(granted, used)
+
+            if exhausted:
+                break  # 剩余预算留给还没有测速的镜像
 
             # 在测试之间添加小延迟
             if i < test_count - 1:
@@ -201,14 +239,97 @@ class MirrorTester:
                 response_time=statistics.mean(response_times),
                 success_rate=success_count / test_count,
                 error_msg=error_msg if not speeds else None,
+                dns_time=statistics.mean(t.dns for t in timings),
+                connect_time=statistics.mean(t.connect for t in timings),
+                tls_time=statistics.mean(t.tls for t in timings),
+                ttfb=statistics.mean(t.ttfb for t in timings),
             )
         else:
             msg = f"speed: 0 KB/s; url: {url}" + (f"\n{error_msg}" if error_msg else "")
             logging.error(msg)
             return None  # 没有成功的测试
 
-    def test_all_mirrors(self, max_workers: int = 20, top_n: int = 10) -> List[MirrorResult]:
-        """Test speed for all mirrors, only keep top_10"""
+    def probe(self, url: str, nbytes: int, keep_body: bool = False) -> ProbeTiming:
+        """
+        One timed GET of the first nbytes of url: direct to the pre-resolved address,
+        through requests when a proxy is configured in the environment (only TTFB | transfer are measured)
+        """
+        headers = {"User-Agent": self.session.headers["User-Agent"]}
+        if urlparse(url).scheme not in self.env_proxies:
+            return timed_get(url, self.resolver, nbytes, timeout=5, headers=headers, keep_body=keep_body)
+
+        timing = ProbeTiming(url)
+        try:
+            start = time.perf_counter()
+            headers["Range"] = f"bytes=0-{nbytes - 1}"
+            with self.session.get(url, timeout=5, stream=True, headers=headers) as response:
+                timing.ttfb = time.perf_counter() - start
+                timing.status = response.status_code
+                if response.status_code not in (200, 206):
+                    timing.error = f"HTTP {response.status_code}"
+                    return timing
+                start = time.perf_counter()
+                for chunk in response.iter_content(chunk_size=8192):
+                    timing.nbytes += len(chunk)
+                    if keep_body:
+                        timing.body += chunk
+                    if timing.nbytes >= nbytes:
+                        break
+                timing.transfer = time.perf_counter() - start
+        except requests.RequestException as e:
+            timing.error = str(e)
+        return timing
+
+    def check_freshness(self, results: List[MirrorResult]) -> None:
+        """
+        Fetch the signed index of the top candidates (the fastest top_n mirrors) concurrently
+        (InRelease | repomd.xml | lastsync), set index_time and lag (behind the freshest candidate)
+        Skipped when the test was cancelled; a mirror is left unchecked (lag unknown) when the probe budget runs out
+        """
+        path = fresh_map.get(self.os_info.ostype)
+        if not path or not results or self.cancelled.is_set():
+            return
+        ostype = self.os_info.ostype
+        path = path.format(codename=self.os_info.codename or default_codename.get(ostype, ""))
+
+        def fetch(result: MirrorResult) -> Optional[float]:
+            if self.cancelled.is_set():
+                return None
+            granted = self.budget.grant(first=False, cancelled=self.cancelled, nbytes=FRESH_BYTES)
+            if not granted:
+                return None
+            timing = self.probe(urljoin(result.url + "/", path), granted, keep_body=True)
+            self.budget.settle(granted, timing.nbytes)
+            return parse_index_time(path, timing.body) if timing.error is None else None
+
+        with ThreadPoolExecutor(max_workers=min(len(results), self.limiter.maximum)) as executor:
+            index_times = list(executor.map(fetch, results))
+
+        newest = max((t for t in index_times if t), default=None)
+        for result, index_time in zip(results, index_times):
+            result.index_time = index_time
+            result.lag = max(0.0, newest - index_time) if index_time and newest else None
+
+    def resolve_mirrors(self, max_workers: int) -> None:
+        """Resolve every mirror host concurrently before the speed test (skipped when probing through a proxy)"""
+        if self.env_proxies:
+            return
+        start_time = time.time()
+        hosts = {urlparse(mirror.get("url", "")).hostname for mirror in self.mirrors} - {None}
+        resolved = self.resolver.resolve_all(hosts, max_workers)
+        ok = sum(1 for host in hosts if resolved[host].addrs)
+        string(r"Resolved {} of {} mirror hosts ({} seconds)", ok, len(hosts), f"{time.time() - start_time:.2f}")
+
+    def test_all_mirrors(self, max_workers: int = None, top_n: int = 10) -> List[MirrorResult]:
+        """
+        Test speed for all mirrors, only keep top_10
+        max_workers: upper bound of in-flight probes (sized from host capacity by default),
+        the AIMD limiter raises | lowers the actual number from throughput and latency
+        """
+        if max_workers is None:
+            max_workers = self.host.workers(per_cpu=8, minimum=8, maximum=32)
+        self.limiter = AimdLimiter(initial=min(4, max_workers), minimum=2, maximum=max_workers)
+        self.budget = probe_budget(len(self.mirrors), PROBE_BYTES, metered=bool(self.host.cloud_vendor))
 
         string(
             r"Starting to test {} mirrors, filtering the top {} fastest mirrors, please wait...",
@@ -217,6 +338,7 @@ class MirrorTester:
         )
 
         start_time = time.time()
+        self.resolve_mirrors(max_workers)
 
         lock = threading.Lock()
         fastest_results: List[MirrorResult] = []
@@ -260,6 +382,7 @@ class MirrorTester:
             except Exception:
                 pass
             finally:
+                self.budget.finish_target()
                 if not self.cancelled.is_set():
                     update_progress()
 
@@ -278,11 +401,13 @@ class MirrorTester:
             self.cancelled.set()
 
         print()  # return line
+        logging.debug(f"mirror probes: {self.limiter.summary()}")
 
         # 1 filter：Remove mirrors that are completely inaccessible
         results = [r for r in fastest_results if r.success_rate > 0 and r.avg_speed > 0]
         if not results:
             return None
+        self.check_freshness(results)
 
         # 2 sort the results
         top_10 = self.filter_and_rank_mirrors(results)
@@ -293,17 +418,24 @@ class MirrorTester:
         tot_time = f"{end_time - start_time:.2f}"
         print()
         string(r"Found top {} fastest {} mirrors (total time: {} seconds)", len(top_10), self.os_info.ostype, tot_time)
+        string(r"Probe traffic: {}", self.budget.summary())
 
         return top_10
 
     def filter_and_rank_mirrors(self, results: List[MirrorResult]) -> tuple:
         """Filter and rank mirrors"""
 
-        # Sort by composite score (speed * success rate / response time)
+        # Exclude stale mirrors (index far behind the freshest candidate), unless every mirror is stale
+        results = [r for r in results if not is_stale(r.lag)] or results
+
+        # Sort by composite score (speed * success rate / connection latency * freshness)
+        # connection latency excludes DNS: package managers resolve once and reuse the address
+        # a lagging mirror costs hash mismatches and metadata retries, far more than a slower download
         def calculate_score(result: MirrorResult) -> float:
-            if result.response_time == 0 or result.response_time == float("inf"):
+            latency = result.conn_time or result.response_time
+            if latency == 0 or latency == float("inf"):
                 return 0
-            return (result.avg_speed * result.success_rate) / result.response_time
+            return (result.avg_speed * result.success_rate) / latency * lag_penalty(result.lag)
 
         # Calculate scores and sort
         for result in results:
@@ -359,17 +491,25 @@ class MirrorTester:
             error_msg=error_msg,
         )
 
+    def proxy_url(self, url: str, proxy: Optional[str] = None) -> str:
+        """Source url via the caching proxy (if any), the proxy serves the ranked mirrors of this repository"""
+        proxy = proxy or self.proxy
+        return proxy.rstrip("/") + "/" if proxy else url
+
     def print_results(self, results: List[MirrorResult]):
         print()
-        print("-" * 80)
+        print("-" * 108)
         print(
-            f"{_mf('Rank'):<4} {_mf('Speed(KB/s)'):<8} {_mf('Resp Time(s)'):<6} {_mf('Succ Rate'):<6} {_mf('Country/Region'):<16} {_mf('Mirror URL')}"
+            f"{_mf('Rank'):<4} {_mf('Speed(KB/s)'):<8} {_mf('Resp Time(s)'):<6} {_mf('Succ Rate'):<6} {_mf('DNS/TCP/TLS/TTFB(ms)'):<20} {_mf('Lag'):>7} {_mf('Country/Region'):<16} {_mf('Mirror URL')}"
         )
-        print("-" * 80)
+        print("-" * 108)
 
         for i, result in enumerate(results, 1):
+            timing = "/".join(
+                f"{t * 1000:.0f}" for t in (result.dns_time, result.connect_time, result.tls_time, result.ttfb)
+            )
             print(
-                f"{i:<4}{result.avg_speed:>9.1f}{result.response_time:>11.2f}{result.success_rate:>11.1%}{result.country:^18}{result.url}"
+                f"{i:<4}{result.avg_speed:>9.1f}{result.response_time:>11.2f}{result.success_rate:>11.1%}  {timing:<20}{format_lag(result.lag):>7} {result.country:^18}{result.url}"
             )
 
     def run(self):
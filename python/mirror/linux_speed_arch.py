@@ -6,16 +6,27 @@ import os
 from pathlib import Path
 import re
 import sys
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+import requests
 
 
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))  # add root sys.path
 
+from python.cache.cache_util import cache_namespace, open_cache, open_current
 from python.mirror.linux_speed import MirrorResult, MirrorTester, get_country_name
-from python.msg_handler import _mf
+from python.msg_handler import _mf, string
 from python.file_util import write_source_file
 from python.read_util import confirm_action
 
+# Mirror status (completion | delay | score per mirror URL), refreshed by archlinux.org every few minutes
+STATUS_URL = "https://archlinux.org/mirrors/status/json/"
+STATUS_TTL = 3600  # seconds, cached JSON is reused within this time
+MIN_COMPLETION = 1.0  # completion_pct: fraction of the recent checks where the mirror was in sync
+MAX_DELAY = 6 * 3600  # seconds behind the tier 0 mirror
+KEEP_RATIO = 0.2  # keep the best-scored 20% for bandwidth probing
+MIN_KEEP = 30
+
 
 class ArchMirrorTester(MirrorTester):
     def __init__(self):
@@ -74,6 +85,70 @@ class ArchMirrorTester(MirrorTester):
     # ==============================================================================
     # (2) Search Fast mirrors
     # ==============================================================================
+    def fetch_mirror_status(self) -> Optional[Dict]:
+        """
+        Mirror status JSON (cached for STATUS_TTL in the versioned cache layout), None if unavailable
+        When the refresh fails, the expired version is still used (better than the backup mirror list)
+        """
+        path = cache_namespace("mirror_status", "arch")
+
+        def build(cache):
+            response = requests.get(STATUS_URL, timeout=10)
+            response.raise_for_status()
+            cache.set("status", response.json())
+
+        try:
+            with open_cache(path, build, ttl=STATUS_TTL) as cache:
+                return cache.get("status")
+        except (requests.RequestException, ValueError) as e:
+            string(r"Failed to fetch the mirror list: {}", e)
+        cache = open_current(path)  # 不检查 ttl：上一次成功获取的版本
+        if cache is None:
+            return None
+        with cache:
+            return cache.get("status")
+
+    def filter_mirror_status(self, status: Dict) -> List[Dict]:
+        """
+        Drop mirrors that are inactive, incomplete, far behind or not HTTPS (before any bandwidth probing),
+        keep the best-scored subset (lower score is better), system country first
+        """
+        urls = status.get("urls") or []
+        passed = [
+            m
+            for m in urls
+            if m.get("active")
+            and m.get("protocol") == "https"
+            and (m.get("completion_pct") or 0) >= MIN_COMPLETION
+            and m.get("delay") is not None
+            and m["delay"] <= MAX_DELAY
+            and m.get("score") is not None
+        ]
+        passed.sort(key=lambda m: m["score"])
+
+        keep = passed[: max(MIN_KEEP, int(len(urls) * KEEP_RATIO))]
+        system_country_name = get_country_name(self.system_country).lower()
+        local = [m for m in passed if m.get("country") and m["country"].lower() in system_country_name][:MIN_KEEP]
+        selected = local + [m for m in keep if m not in local]
+
+        mirrors = []
+        for m in selected:
+            url = m["url"] if m["url"].endswith("/") else m["url"] + "/"
+            if not self.url_exists(mirrors, url):
+                mirrors.append({"country": m.get("country") or "N/A", "url": url})
+        string(r"Mirror status: {} of {} mirrors selected for speed testing", len(mirrors), len(urls))
+        return mirrors
+
+    def fetch_mirror_list(self, limit: int = None) -> None:
+        """Prefilter with the mirror status JSON; keep the backup mirror list if it is unavailable"""
+        print()
+        string(r"{} Mirror Speed Testing Tool", self.os_info.ostype)
+        print("=" * 80)
+        status = self.fetch_mirror_status()
+        mirrors = self.filter_mirror_status(status) if status else []
+        if mirrors:
+            self.mirrors = mirrors[:limit] if limit else mirrors  # mirrors limitation(for testing)
+
     def parse_mirror_list(self, lines: List[str]) -> List[Dict]:
         """Parse the HTML content"""
 
@@ -128,12 +203,15 @@ class ArchMirrorTester(MirrorTester):
         """Select the fastest mirror and update the package manager file"""
 
         prompt = _mf("Would you like to switch to the new mirror list?")
+        self.fetch_mirror_list(12 if self.is_debug else None)
         top_10 = self.test_all_mirrors()
         confirm_action(prompt, self.update_pm_file, top_10, no_value=True)
 
-    def update_pm_file(self, top_10):
-        # generate custom content
+    def update_pm_file(self, top_10, proxy: Optional[str] = None):
+        # generate custom content (pacman tries servers in order: proxy first, mirrors as fallback)
         lines = self.add_custom_sources(top_10)
+        if proxy := proxy or self.proxy:
+            lines.insert(0, f"Server = {self.proxy_url('', proxy)}$repo/os/$arch")
 
         # update source file
         write_source_file(self.path, lines)
@@ -8,6 +8,7 @@ from pathlib import Path
 import platform
 import re
 import sys
+from typing import Optional
 
 
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))  # add root sys.path
@@ -154,8 +155,8 @@ class CentosMirrorTester(MirrorTester):
     # ==============================================================================
     # (3) Update PM File
     # ==============================================================================
-    def update_pm_file(self, mirror):
-        url = mirror.url
+    def update_pm_file(self, mirror, proxy: Optional[str] = None):
+        url = self.proxy_url(mirror.url, proxy)
 
         # generate custom content (One mirror is enough for CentOS)
         lines = self.add_custom_sources(url)
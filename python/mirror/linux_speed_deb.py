@@ -5,7 +5,7 @@
 from pathlib import Path
 import re
 import sys
-from typing import List
+from typing import List, Optional
 
 
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))  # add root sys.path
@@ -147,10 +147,11 @@ class DebianMirrorTester(MirrorTester):
     # ==============================================================================
     # (3) Update PM File
     # ==============================================================================
-    def update_pm_file(self, mirror):
-        # 1. check custom mirror
+    def update_pm_file(self, mirror, proxy: Optional[str] = None):
+        # 1. check custom mirror (security is another repository tree: not proxied)
         self.check_mirror_components(mirror)
-        url, url_upd, url_sec = mirror.url, mirror.url_upd, mirror.url_sec
+        url, url_upd, url_sec = self.proxy_url(mirror.url, proxy), mirror.url_upd, mirror.url_sec
+        url_upd = url_upd and url
 
         # 2. generate custom content
         lines = self.add_custom_sources(url, url_upd, url_sec)
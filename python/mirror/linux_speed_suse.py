@@ -5,7 +5,7 @@
 from pathlib import Path
 import re
 import sys
-from typing import List
+from typing import List, Optional
 
 
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))  # add root sys.path
@@ -150,8 +150,8 @@ class OpenSUSEMirrorTester(MirrorTester):
     # ==============================================================================
     # (3) Update PM File
     # ==============================================================================
-    def update_pm_file(self, mirror):
-        url = mirror.url
+    def update_pm_file(self, mirror, proxy: Optional[str] = None):
+        url = self.proxy_url(mirror.url, proxy)
 
         # generate custom content
         results = self.add_custom_sources(url)
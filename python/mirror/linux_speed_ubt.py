@@ -7,7 +7,7 @@ import platform
 import re
 import sys
 import requests
-from typing import List
+from typing import List, Optional
 
 
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))  # add root sys.path
@@ -168,10 +168,10 @@ class UbuntuMirrorTester(MirrorTester):
     # ==============================================================================
     # (3) Update PM File
     # ==============================================================================
-    def update_pm_file(self, mirror):
+    def update_pm_file(self, mirror, proxy: Optional[str] = None):
         # 1. check custom mirror
         self.check_mirror_components(mirror)
-        url, url_sec = mirror.url, mirror.url_sec
+        url, url_sec = self.proxy_url(mirror.url, proxy), mirror.url_sec
 
         # 2. generate custom content
         lines = self.add_custom_sources(url, url_sec)
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+
+"""
+Caching HTTP proxy for package mirrors (in the spirit of apt-cacher-ng)
+Hosts in the same rack point their source files at the proxy, each package is downloaded from the internet once.
+    - upstreams: ranked mirrors (MirrorTester), tried in order with failover
+    - cache: content addressed blobs (sha256) + path index (symlinks), identical files are stored once
+    - package files (.deb | .rpm | .pkg.tar.zst ...) never expire, index files are revalidated after INDEX_TTL
+    - listens on 127.0.0.1; serving the rack is opt-in: MIRROR_PROXY_BIND=0.0.0.0 (or the LAN address)
+Base module, DO NOT depends on other modules (asyncio + urllib, no third party packages)
+"""
+
+import asyncio
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+import hashlib
+import logging
+import os
+from pathlib import Path
+import posixpath
+import re
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+
+PROXY_PORT = 3142  # 与 apt-cacher-ng 相同
+PROXY_BIND = os.environ.get("MIRROR_PROXY_BIND", "127.0.0.1")  # 监听地址：默认只接受本机请求（不对外开放缓存代理）
+CACHE_DIR = "/var/cache/sj_mirror_proxy"
+INDEX_TTL = 300  # 索引文件（Release | repomd.xml | *.db ...）的有效期（秒）
+FAIL_PENALTY = 60  # 上游失败后降级的时间（秒）
+TIMEOUT = 15  # 上游超时（秒）
+CHUNK_SIZE = 65536
+FETCH_WORKERS = 16  # 同时下载的上游请求数
+
+# 内容不会变化的文件：包文件 | 签名 | by-hash 索引
+IMMUTABLE_MATCH = re.compile(r"(\.(u?deb|d?rpm|pkg\.tar\.(zst|xz|gz)(\.sig)?)|/by-hash/[^/]+/[0-9a-fA-F]+)$")
+
+logger = logging.getLogger(__name__)
+
+
+class CacheError(Exception):
+    """本地缓存写入失败（路径 | 目录冲突、磁盘已满...），不是上游的错误：不降级上游"""
+
+
+class MirrorProxy:
+    """
+    One proxy serves one repository tree: GET /<path> => <upstream><path>
+    """
+
+    def __init__(self, upstreams: List[str], cache_dir: str = CACHE_DIR, index_ttl: int = INDEX_TTL):
+        if not upstreams:
+            raise ValueError("no upstream mirrors")
+        self.upstreams = [url.rstrip("/") + "/" for url in upstreams]
+        self.cache_dir = Path(cache_dir)
+        self.index_ttl = index_ttl
+        self.penalty: Dict[str, float] = {}  # 上游 => 降级截止时间
+        self.stats = Counter()  # hit | miss | coalesced | revalidated | error | bytes_up | bytes_out
+        self._stats_lock = threading.Lock()  # 下载线程和事件循环都会计数
+        self._inflight: Dict[str, asyncio.Future] = {}  # 同一路径的并发请求只下载一次
+        self._executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="mirror_proxy")
+        for sub in ("blobs", "paths", "tmp"):
+            (self.cache_dir / sub).mkdir(parents=True, exist_ok=True)
+
+    # ==============================================================================
+    # (1) Cache layout
+    # ==============================================================================
+    def entry_path(self, path: str) -> Path:
+        """路径索引：paths/<path> -> ../blobs/ab/<sha256>（符号链接的 mtime 为下载 | 验证时间）"""
+        return self.cache_dir / "paths" / path
+
+    def blob_path(self, digest: str) -> Path:
+        return self.cache_dir / "blobs" / digest[:2] / digest
+
+    def lookup(self, path: str) -> Tuple[Optional[Path], bool]:
+        """
+        Returns:
+            (缓存文件 | None, 是否仍然有效)
+        """
+        entry = self.entry_path(path)
+        try:
+            fetched = os.lstat(entry).st_mtime
+            blob = entry.resolve(strict=True)
+        except OSError:
+            return None, False
+        fresh = IMMUTABLE_MATCH.search(path) is not None or time.time() - fetched < self.index_ttl
+        return blob, fresh
+
+    def store(self, path: str, tmp_file: str, digest: str) -> Path:
+        """保存下载的文件：相同内容（sha256）只保存一份，然后原子替换路径索引"""
+        blob = self.blob_path(digest)
+        if blob.exists():
+            os.unlink(tmp_file)
+        else:
+            blob.parent.mkdir(exist_ok=True)
+            os.chmod(tmp_file, 0o644)
+            os.replace(tmp_file, blob)
+
+        entry = self.entry_path(path)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        link = entry.with_name(f".{entry.name}.{os.getpid()}.link")
+        os.symlink(os.path.relpath(blob, entry.parent), link)
+        os.replace(link, entry)
+        return blob
+
+    # ==============================================================================
+    # (2) Upstream fetch (blocking, runs in worker threads)
+    # ==============================================================================
+    def count(self, name: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[name] += n
+
+    def ranked_upstreams(self) -> List[str]:
+        """排名顺序，最近失败的上游放到最后"""
+        now = time.monotonic()
+        return sorted(self.upstreams, key=lambda url: self.penalty.get(url, 0) > now)
+
+    def fetch(self, path: str, stale: Optional[Path]) -> Tuple[int, Optional[Path]]:
+        """
+        依次从上游下载（失败 | 5xx 切换到下一个，404 也尝试下一个：镜像可能尚未同步）
+
+        Returns:
+            (HTTP 状态码, 缓存文件)
+        """
+        status = 502
+        for upstream in self.ranked_upstreams():
+            request = Request(upstream + path, headers={"User-Agent": "sj-mirror-proxy"})
+            if stale:
+                request.add_header(
+                    "If-Modified-Since", formatdate(os.lstat(self.entry_path(path)).st_mtime, usegmt=True)
+                )
+            try:
+                with urlopen(request, timeout=TIMEOUT) as response:
+                    return 200, self._download(path, response)
+            except HTTPError as e:
+                if e.code == 304 and stale:
+                    os.utime(self.entry_path(path), follow_symlinks=False)  # 未变化：刷新验证时间
+                    self.count("revalidated")
+                    return 200, stale
+                if e.code == 404:
+                    status = 404
+                    continue
+                logger.warning("upstream %s: HTTP %s", upstream + path, e.code)
+            except (OSError, ValueError) as e:
+                logger.warning("upstream %s: %s", upstream + path, e)
+            self.penalty[upstream] = time.monotonic() + FAIL_PENALTY
+
+        if stale:
+            return 200, stale  # 所有上游都不可用：使用过期的索引
+        return status, None
+
+    def _download(self, path: str, response) -> Path:
+        """流式写入临时文件并计算 sha256；读取上游的错误原样抛出，本地写入 | 保存的错误抛出 CacheError"""
+        sha256 = hashlib.sha256()
+        try:
+            fd, tmp_file = tempfile.mkstemp(dir=self.cache_dir / "tmp")
+        except OSError as e:
+            raise CacheError(e) from e
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while chunk := response.read(CHUNK_SIZE):
+                    sha256.update(chunk)
+                    try:
+                        f.write(chunk)
+                    except OSError as e:
+                        raise CacheError(e) from e
+                    self.count("bytes_up", len(chunk))
+            try:
+                return self.store(path, tmp_file, sha256.hexdigest())
+            except OSError as e:
+                raise CacheError(e) from e
+        except BaseException:
+            if os.path.exists(tmp_file):
+                os.unlink(tmp_file)
+            raise
+
+    # ==============================================================================
+    # (3) HTTP server
+    # ==============================================================================
+    async def get(self, path: str) -> Tuple[int, Optional[Path]]:
+        """缓存命中直接返回；否则下载（同一路径的并发请求共享一次下载）"""
+        blob, fresh = self.lookup(path)
+        if fresh:
+            self.count("hit")
+            return 200, blob
+
+        if path in self._inflight:
+            self.count("coalesced")
+            return await asyncio.shield(self._inflight[path])
+
+        self.count("miss")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[path] = future
+        result: Tuple[int, Optional[Path]] = (502, None)
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, self.fetch, path, blob)
+        except Exception as e:
+            logger.error("fetch %s: %s", path, e)
+        finally:
+            del self._inflight[path]
+            future.set_result(result)  # 下载的请求被取消（客户端断开）时，等待者也会得到结果（502）
+        return result
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """HTTP/1.1（keep-alive），只支持 GET | HEAD"""
+        try:
+            while request_line := await reader.readline():
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = request_line.decode("latin-1").split()
+                keep_alive = len(parts) == 3 and parts[2] == "HTTP/1.1" and headers.get("connection") != "close"
+                if len(parts) != 3:
+                    await self.respond(writer, 400, None, False)
+                elif parts[0] not in ("GET", "HEAD"):
+                    await self.respond(writer, 405, None, keep_alive)
+                elif (path := normalize_path(parts[1])) is None:
+                    await self.respond(writer, 404, None, keep_alive)
+                else:
+                    status, blob = await self.get(path)
+                    await self.respond(writer, status, blob, keep_alive, head=parts[0] == "HEAD")
+                    logger.info("%s %s %s", parts[0], path, status)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(
+        self, writer: asyncio.StreamWriter, status: int, blob: Optional[Path], keep_alive: bool, head=False
+    ):
+        reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 502: "Bad Gateway"}
+        size = os.path.getsize(blob) if blob else 0
+        headers = [
+            f"HTTP/1.1 {status} {reasons.get(status, '')}",
+            f"Content-Length: {size}",
+            "Content-Type: application/octet-stream",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if blob:
+            headers.append(f"Last-Modified: {formatdate(os.path.getmtime(blob), usegmt=True)}")
+        if status >= 500:
+            self.count("error")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1"))
+        if blob and not head:
+            with open(blob, "rb") as f:
+                await asyncio.get_running_loop().sendfile(writer.transport, f)  # 零拷贝（不支持时自动回退）
+            self.count("bytes_out", size)
+        await writer.drain()
+
+    async def serve(self, host: str = PROXY_BIND, port: int = PROXY_PORT) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port)
+
+
+def normalize_path(target: str) -> Optional[str]:
+    """请求路径 => 缓存路径（去掉 scheme | host，拒绝目录和越界路径）"""
+    path = urlsplit(target).path
+    if not path or path.endswith("/") or "\0" in path:
+        return None
+    path = posixpath.normpath(path).lstrip("/")
+    if not path or path == "." or path.startswith(".."):
+        return None
+    return path
+
+
+def run_proxy(upstreams: List[str], port: int = PROXY_PORT, cache_dir: str = CACHE_DIR, host: str = PROXY_BIND) -> int:
+    """Run the proxy until Ctrl+C, then print the cache statistics"""
+    proxy = MirrorProxy(upstreams, cache_dir)
+
+    async def _run():
+        server = await proxy.serve(host, port)
+        print(f"Mirror proxy: http://{host}:{port}/ => {', '.join(proxy.upstreams)} (cache: {cache_dir})")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        pass
+    print(f"\n{dict(proxy.stats)}")
+    return 0
+
+
+# =============================================================================
+# Debug test function (end to end with a local fake upstream)
+# ./python/mirror/mirror_proxy.py
+# =============================================================================
+def main():
+    import functools
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.request import urlopen as fetch
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp, "repo")
+        (repo / "pool").mkdir(parents=True)
+        (repo / "pool" / "a_1.0.deb").write_bytes(os.urandom(300_000))
+        (repo / "pool" / "b_1.0.deb").write_bytes((repo / "pool" / "a_1.0.deb").read_bytes())  # 相同内容
+        (repo / "Release").write_text("Suite: test\n")
+
+        handler = functools.partial(SimpleHTTPRequestHandler, directory=str(repo))
+        upstream = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=upstream.serve_forever, daemon=True).start()
+        dead = "http://127.0.0.1:9/"  # 第一个上游不可用：测试故障切换
+        proxy = MirrorProxy([dead, f"http://127.0.0.1:{upstream.server_port}/"], Path(tmp, "cache"), index_ttl=0)
+
+        async def client(path):
+            return await asyncio.to_thread(lambda: fetch(f"http://127.0.0.1:{port}/{path}").read())
+
+        async def _test():
+            nonlocal port
+            server = await proxy.serve("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                data = await asyncio.gather(*[client("pool/a_1.0.deb") for _ in range(5)])
+                assert all(d == (repo / "pool" / "a_1.0.deb").read_bytes() for d in data)
+                await client("pool/b_1.0.deb")
+                await client("Release")
+                await client("Release")  # index_ttl=0：重新验证
+                try:
+                    await client("missing.deb")
+                except HTTPError as e:
+                    print(f"missing.deb: HTTP {e.code}")
+
+        port = 0
+        asyncio.run(_test())
+        upstream.shutdown()
+        blobs = sum(1 for p in Path(tmp, "cache", "blobs").rglob("*") if p.is_file())
+        print(f"stats: {dict(proxy.stats)}  blobs: {blobs}")
+
+
+# =============================================================================
+# Command-line entry point
+# =============================================================================
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+
+"""
+AIMD concurrency limiter for speed probes (mirror speed test | pip index test)
+A probe takes a slot before each request and reports its latency and bytes when done.
+After every window of completions the in-flight limit is adjusted:
+    - additive increase (+1) while the per-probe latency stays near its baseline
+    - multiplicative decrease (x0.5) when latency inflates and aggregate throughput stops growing
+      (more probes in flight only queue on the same link and distort each other's speed)
+ProbeBudget caps the total probe traffic and its rate (metered links), shared by all probe threads:
+    - every target gets its first probe before any repeat probe is granted (coverage first)
+    - a token bucket admits probes at PROBE_RATE_KB, the download itself is never throttled (speed stays accurate)
+Stdlib only (mypip runs before pip packages are installed)
+Base module, DO NOT depends on other modules
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import math
+import os
+import statistics
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+
+INCREASE = 1  # 加性增加：每个窗口 +1
+DECREASE = 0.5  # 乘性减少：每个窗口 x0.5
+LATENCY_INFLATION = 1.5  # 窗口延迟中位数 > 基线的倍数时视为排队
+THROUGHPUT_GAIN = 0.05  # 吞吐量增长超过 5% 视为并发仍然有效
+MIN_WINDOW = 4  # 窗口的最少样本数（窗口 = max(MIN_WINDOW, 当前并发数)）
+
+MB = 1024 * 1024
+PROBE_BUDGET_MB = os.environ.get("PROBE_BUDGET_MB")  # 探测的总流量上限 (MB)，0 为不限制
+PROBE_RATE_KB = os.environ.get("PROBE_RATE_KB")  # 探测的速率上限 (KB/s)，未设置不限制
+METERED_BUDGET_MB = 32  # PROBE_BUDGET_MB 未设置时，云主机（流量计费）的默认预算
+MIN_PROBE_BYTES = 16 * 1024  # 小于此值的探测测速不准确：不再发起
+
+
+@dataclass
+class ProbeSample:
+    """一次探测的结果（在 slot 内填写）"""
+
+    started: float = field(default_factory=time.perf_counter)
+    latency: Optional[float] = None  # 延迟（如: 首字节时间），未填写时为整个 slot 的耗时
+    nbytes: int = 0  # 下载的字节数，未知为 0（吞吐量按完成数计算）
+    ok: bool = True  # 失败 | 超时：延迟按 slot 耗时计入（拥塞时失败也是信号）
+
+
+class AimdLimiter:
+    """AIMD 并发限制器（线程安全）"""
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 64):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(self.maximum, max(self.minimum, initial)))
+        self.inflight = 0
+        self.base_latency: Optional[float] = None  # 延迟基线（各窗口中位数的最小值）
+        self.history: List[Tuple[float, int, float, float]] = []  # (时间, 并发数, 吞吐量, 延迟中位数)
+        self._cond = threading.Condition()
+        self._samples: List[ProbeSample] = []
+        self._window_start = time.perf_counter()
+        self._prev_throughput = 0.0
+        self._decreased = 0.0  # 上次减少的时间：之前开始的探测不再计入（每轮只减少一次）
+        self._created = self._window_start
+
+    @property
+    def current(self) -> int:
+        return int(self.limit)
+
+    def acquire(self, cancelled: Optional[threading.Event] = None) -> None:
+        """等待空闲的 slot（cancelled 被设置时直接放行，由调用者检查后退出）"""
+        with self._cond:
+            while self.inflight >= int(self.limit) and not (cancelled and cancelled.is_set()):
+                self._cond.wait(0.1)
+            self.inflight += 1
+
+    def release(self, sample: ProbeSample) -> None:
+        with self._cond:
+            self.inflight -= 1
+            if not sample.ok or sample.latency is None:
+                sample.latency = time.perf_counter() - sample.started
+            if sample.started >= self._decreased:
+                self._samples.append(sample)
+            if len(self._samples) >= max(MIN_WINDOW, int(self.limit)):
+                self._adjust()
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, cancelled: Optional[threading.Event] = None) -> Iterator[ProbeSample]:
+        """
+        with limiter.slot() as sample:
+            ... 请求 ...
+            sample.latency, sample.nbytes = ttfb, downloaded
+        异常退出时记为失败
+        """
+        self.acquire(cancelled)
+        sample = ProbeSample()
+        try:
+            yield sample
+        except BaseException:
+            sample.ok = False
+            raise
+        finally:
+            self.release(sample)
+
+    def _adjust(self) -> None:
+        """窗口结束：比较吞吐量和延迟，调整并发数（调用者持有锁）"""
+        now = time.perf_counter()
+        elapsed = max(now - self._window_start, 1e-6)
+        nbytes = sum(s.nbytes for s in self._samples)
+        throughput = (nbytes if nbytes else len(self._samples)) / elapsed  # bytes/s | 探测数/s
+        latency = statistics.median(s.latency for s in self._samples)
+        if latency > 0 and (self.base_latency is None or latency < self.base_latency):
+            self.base_latency = latency  # 延迟为 0 的窗口不能作为基线（之后所有窗口都会被视为排队）
+
+        inflated = self.base_latency is not None and latency > self.base_latency * LATENCY_INFLATION
+        grew = throughput > self._prev_throughput * (1 + THROUGHPUT_GAIN)
+        if inflated and not grew:
+            self.limit = max(self.minimum, self.limit * DECREASE)
+            self._decreased = now
+        elif not inflated:
+            self.limit = min(self.maximum, self.limit + INCREASE)
+        # 延迟升高但吞吐量仍在增长：保持
+
+        self.history.append((round(now - self._created, 3), int(self.limit), throughput, latency))
+        self._prev_throughput = throughput
+        self._samples = []
+        self._window_start = now
+
+    def summary(self) -> str:
+        limits = [h[1] for h in self.history] or [self.current]
+        return f"concurrency {self.current} (min {min(limits)}, max {max(limits)}, {len(self.history)} windows)"
+
+
+class ProbeBudget:
+    """
+    探测流量预算 + 令牌桶限速（线程安全）
+    每个目标的第一次探测按 总预算 / 目标数 预留，重复探测只使用预留之外的部分
+    """
+
+    def __init__(self, total: Optional[int], rate: Optional[int], targets: int, probe_bytes: int):
+        self.total = total  # None 为不限制
+        self.rate = rate  # bytes/s，None 为不限制
+        self.used = 0  # 实际下载的字节数
+        self.skipped = 0  # 因预算不足放弃的探测数
+        self.probe_bytes = probe_bytes
+        self.first_bytes = probe_bytes  # 第一次探测的字节数（预算紧张时平均分配，不少于 MIN_PROBE_BYTES）
+        if total is not None:
+            self.first_bytes = max(MIN_PROBE_BYTES, min(probe_bytes, total // max(1, targets)))
+        self._pending = targets  # 尚未完成的目标数（为其保留第一次探测）
+        self._granted = 0  # 已授予、尚未结算的字节数
+        self._burst = max(rate or 0, probe_bytes)
+        self._tokens = float(self._burst)
+        self._refilled = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def grant(self, first: bool, cancelled: Optional[threading.Event] = None, nbytes: Optional[int] = None) -> int:
+        """
+        申请一次探测可以下载的字节数，预算不足返回 0（限速时等待令牌）
+        first: 目标还没有成功的测速（使用预留部分），否则为重复探测（只使用剩余部分）
+        nbytes: 本次最多需要的字节数（默认 probe_bytes）
+        """
+        wanted = nbytes or self.probe_bytes
+        with self._lock:
+            remaining = math.inf if self.total is None else self.total - self.used - self._granted
+            if first:
+                amount = min(self.first_bytes, wanted, remaining)
+            else:
+                amount = min(wanted, remaining - max(0, self._pending - 1) * self.first_bytes)
+            if amount < MIN_PROBE_BYTES:
+                self.skipped += 1
+                return 0
+            amount = int(amount)
+            self._granted += amount
+        self._take_tokens(amount, cancelled)
+        return amount
+
+    def settle(self, granted: int, used: int) -> None:
+        """结算：返还未使用的预算和令牌"""
+        with self._lock:
+            self._granted -= granted
+            self.used += used
+            self._tokens = min(self._burst, self._tokens + max(0, granted - used))
+
+    def finish_target(self) -> None:
+        """目标测试结束：释放为其保留的第一次探测"""
+        with self._lock:
+            self._pending = max(0, self._pending - 1)
+
+    def _take_tokens(self, amount: int, cancelled: Optional[threading.Event]) -> None:
+        if not self.rate:
+            return
+        while not (cancelled and cancelled.is_set()):
+            with self._lock:
+                now = time.perf_counter()
+                self._tokens = min(self._burst, self._tokens + (now - self._refilled) * self.rate)
+                self._refilled = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self.rate
+            time.sleep(min(wait, 0.1))
+
+    def summary(self) -> str:
+        budget = f"{self.total / MB:.1f} MB" if self.total is not None else "unlimited"
+        rate = f", rate {self.rate // 1024} KB/s" if self.rate else ""
+        return f"{self.used / MB:.2f} MB used (budget {budget}{rate}, {self.skipped} probes skipped)"
+
+
+def probe_budget(targets: int, probe_bytes: int, metered: bool = False) -> ProbeBudget:
+    """按环境变量创建预算（metered: 按流量计费的主机，如云主机）"""
+    if PROBE_BUDGET_MB:
+        total = int(float(PROBE_BUDGET_MB) * MB) or None
+    else:
+        total = METERED_BUDGET_MB * MB if metered else None
+    rate = int(float(PROBE_RATE_KB) * 1024) if PROBE_RATE_KB else None
+    return ProbeBudget(total, rate or None, targets, probe_bytes)
+
+
+def run_limited(
+    func: Callable, items: Iterable, limiter: AimdLimiter, cancelled: Optional[threading.Event] = None
+) -> Iterator[Tuple[object, object]]:
+    """
+    并发执行 func(item, limiter)，按完成顺序返回 (item, 结果)，func 的异常在这里抛出
+    线程数为 limiter.maximum；实际在途的探测数由 func 内的 limiter.slot() 控制
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    with ThreadPoolExecutor(max_workers=limiter.maximum) as executor:
+        futures = {executor.submit(func, item, limiter): item for item in items}
+        for future in as_completed(futures):
+            if cancelled and cancelled.is_set():
+                break
+            yield futures[future], future.result()
+
+
+# =============================================================================
+# Debug test function (simulated link: 6 probes saturate it, more only share the bandwidth)
+# ./python/mirror/probe_limit.py
+# =============================================================================
+def main():
+    limiter = AimdLimiter(initial=2, minimum=1, maximum=32)
+
+    def probe(item, limiter):
+        with limiter.slot() as sample:
+            sample.latency = 0.05 * max(1.0, limiter.inflight / 6)
+            time.sleep(sample.latency)
+            sample.nbytes = 100 * 1024
+
+    start = time.perf_counter()
+    for _ in run_limited(probe, range(300), limiter):
+        pass
+    for when, limit, throughput, latency in limiter.history:
+        print(f"{when:>7.2f}s  limit {limit:>3}  {throughput / 1024:>9.1f} KB/s  latency {latency * 1000:>7.1f} ms")
+    print(f"{limiter.summary()}, {time.perf_counter() - start:.2f}s")
+
+
+# =============================================================================
+# Command-line entry point
+# =============================================================================
+if __name__ == "__main__":
+    main()
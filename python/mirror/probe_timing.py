@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+
+"""
+Connection-level timing for mirror probes
+    - HostResolver: resolves every mirror host concurrently before the speed test, cached for the run
+    - timed_get: GET over a socket connected to the pre-resolved address, timing each stage separately:
+      connect (TCP) | tls (handshake) | ttfb (request sent => response headers) | transfer (body)
+DNS time is measured once per host by the resolver, so it never inflates the per-probe timings
+(package managers resolve once and reuse the address as well).
+Stdlib only
+Base module, DO NOT depends on other modules
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import http.client
+import socket
+import ssl
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+
+MAX_REDIRECTS = 3
+
+
+@dataclass
+class Resolved:
+    """一个主机的解析结果"""
+
+    host: str
+    addrs: List[Tuple] = field(default_factory=list)  # [(family, ip)]，按 getaddrinfo 的顺序
+    dns: float = 0.0  # 解析耗时 (seconds)
+    error: Optional[str] = None
+
+
+@dataclass
+class ProbeTiming:
+    """一次 GET 的分段耗时 (seconds)，跟随重定向时为最后一跳"""
+
+    url: str
+    status: int = 0
+    dns: float = 0.0
+    connect: float = 0.0
+    tls: float = 0.0
+    ttfb: float = 0.0
+    transfer: float = 0.0
+    nbytes: int = 0
+    redirects: int = 0
+    error: Optional[str] = None
+    body: bytes = b""  # 下载的内容（keep_body=True 时）
+
+    @property
+    def latency(self) -> float:
+        """连接级延迟：connect + tls + ttfb（不含 DNS）"""
+        return self.connect + self.tls + self.ttfb
+
+
+class HostResolver:
+    """主机名解析缓存（线程安全），本次运行有效"""
+
+    def __init__(self, timeout: float = 5):
+        self.timeout = timeout
+        self.cache: Dict[str, Resolved] = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, host: str) -> Resolved:
+        start = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+            addrs = list(dict.fromkeys((family, sockaddr[0]) for family, _, _, _, sockaddr in infos))
+            return Resolved(host, addrs, time.perf_counter() - start)
+        except (OSError, UnicodeError) as e:
+            return Resolved(host, [], time.perf_counter() - start, str(e))
+
+    def resolve_all(self, hosts: Iterable[str], max_workers: int = 32) -> Dict[str, Resolved]:
+        """并发解析（getaddrinfo 是阻塞调用，用线程），超时的主机记为失败"""
+        hosts = [h for h in dict.fromkeys(hosts) if h and h not in self.cache]
+        if not hosts:
+            return self.cache
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(hosts))))
+        futures = {host: executor.submit(self._resolve, host) for host in hosts}
+        deadline = time.perf_counter() + self.timeout
+        for host, future in futures.items():
+            try:
+                result = future.result(timeout=max(0, deadline - time.perf_counter()))
+            except Exception:
+                result = Resolved(host, [], self.timeout, "resolve timeout")
+            with self._lock:
+                self.cache[host] = result
+        executor.shutdown(wait=False)  # 超时的解析在后台结束
+        return self.cache
+
+    def get(self, host: str) -> Resolved:
+        """读取缓存，未解析的主机（如重定向的目标）立即解析"""
+        with self._lock:
+            if host in self.cache:
+                return self.cache[host]
+        result = self._resolve(host)
+        with self._lock:
+            return self.cache.setdefault(host, result)
+
+
+_ssl_context: Optional[ssl.SSLContext] = None
+
+
+def _connect(resolved: Resolved, port: int, timeout: float) -> Tuple[socket.socket, float]:
+    """依次连接解析到的地址，返回 (socket, 连接耗时)"""
+    error: Optional[Exception] = None
+    for family, ip in resolved.addrs:
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        start = time.perf_counter()
+        try:
+            sock.connect((ip, port))
+            return sock, time.perf_counter() - start
+        except OSError as e:
+            sock.close()
+            error = e
+    raise error or OSError(f"no address for {resolved.host}: {resolved.error}")
+
+
+def timed_get(
+    url: str,
+    resolver: HostResolver,
+    nbytes: int,
+    timeout: float = 5,
+    headers: Optional[Dict[str, str]] = None,
+    keep_body: bool = False,
+) -> ProbeTiming:
+    """
+    GET url（Range: 只请求前 nbytes 字节），读取 nbytes 后停止
+    失败时 error 为错误信息，status 为 0 或 HTTP 状态码；keep_body: 保存内容（如: 索引文件）
+    """
+    global _ssl_context
+    timing = ProbeTiming(url)
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urlsplit(timing.url)
+        host, https = parts.hostname or "", parts.scheme == "https"
+        port = parts.port or (443 if https else 80)
+        resolved = resolver.get(host)
+        timing.dns = resolved.dns
+        timing.connect = timing.tls = timing.ttfb = 0.0  # 只记录最后一跳（https => http 重定向时没有 TLS）
+        sock = None
+        try:
+            sock, timing.connect = _connect(resolved, port, timeout)
+            if https:
+                if _ssl_context is None:
+                    _ssl_context = ssl.create_default_context()
+                start = time.perf_counter()
+                sock = _ssl_context.wrap_socket(sock, server_hostname=host)
+                timing.tls = time.perf_counter() - start
+
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+            conn.sock = sock  # 已连接的 socket：跳过 http.client 的 DNS 解析和连接
+            if https:
+                conn.default_port = 443  # Host 头只在非默认端口时带端口（与 apt | dnf | pacman 一致）
+            path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            start = time.perf_counter()
+            conn.request("GET", path, headers={**(headers or {}), "Range": f"bytes=0-{nbytes - 1}"})
+            response = conn.getresponse()
+            timing.ttfb = time.perf_counter() - start
+            timing.status = response.status
+
+            location = response.getheader("Location")
+            if 300 <= response.status < 400 and location:
+                timing.url = urljoin(timing.url, location)
+                timing.redirects += 1
+                continue
+            if response.status not in (200, 206):
+                timing.error = f"HTTP {response.status}"
+                return timing
+
+            start = time.perf_counter()
+            while timing.nbytes < nbytes:
+                chunk = response.read(min(8192, nbytes - timing.nbytes))
+                if not chunk:
+                    break
+                timing.nbytes += len(chunk)
+                if keep_body:
+                    timing.body += chunk
+            timing.transfer = time.perf_counter() - start
+            return timing
+        except (OSError, http.client.HTTPException) as e:
+            timing.error = str(e) or type(e).__name__
+            return timing
+        finally:
+            if sock is not None:
+                sock.close()
+
+    timing.error = "too many redirects"
+    return timing
+
+
+# =============================================================================
+# Debug test function
+# ./python/mirror/probe_timing.py [url ...]
+# =============================================================================
+def main():
+    urls = sys.argv[1:] or ["https://mirrors.kernel.org/debian/README", "http://deb.debian.org/debian/README"]
+    resolver = HostResolver()
+    start = time.perf_counter()
+    resolver.resolve_all(urlsplit(url).hostname for url in urls)
+    print(f"resolved {len(resolver.cache)} hosts in {(time.perf_counter() - start) * 1000:.1f} ms")
+    for url in urls:
+        t = timed_get(url, resolver, 100 * 1024)
+        print(
+            f"{t.status:>3} dns {t.dns * 1000:>6.1f} connect {t.connect * 1000:>6.1f} tls {t.tls * 1000:>6.1f} "
+            f"ttfb {t.ttfb * 1000:>6.1f} transfer {t.transfer * 1000:>7.1f} ms {t.nbytes:>7} bytes "
+            f"{t.redirects} redirects {t.error or ''} {t.url}"
+        )
+
+
+# =============================================================================
+# Command-line entry point
+# =============================================================================
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,9 @@ __all__ = ["string", "_mf"]  # export
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))  # add root sys.path
 
-from python.hash_util import _djb2_with_salt_20, _padded_number_to_base64, md5
+from python.hash_util import msg_key
 from python.cache.lang_cache import LangCache
+from python.lang.prop_reader import read_properties
 from python.json_handler import json_getopt
 from python.debug_tool import print_array
 
@@ -74,21 +75,11 @@ def load_properties_to_env():
     lang_file = get_lang_file()
     prop_begin = False  # only read after "# msg_handler"
 
-    with open(lang_file, "r") as f:
-        for line in f:
-            line = line.strip()
-            if line.startswith("#") and "msg_handler" in line:
-                prop_begin = True
-            if not line or line.startswith("#"):
-                continue
-            if not prop_begin:
-                continue
-            if "=" not in line:
-                continue
-            key, val = line.split("=", 1)
-            key = key.strip()
-            val = val.strip().strip('"').strip("'")  # 去除引号
-            os.environ[key] = val
+    for event in read_properties(lang_file, join=True):
+        if event.key is None:
+            prop_begin = prop_begin or "msg_handler" in event.value
+        elif prop_begin:
+            os.environ[event.key] = event.value.strip().strip('"').strip("'")  # 去除引号
 
 
 # =============================================================================
@@ -258,12 +249,13 @@ def print_stack_err(max_depth=6, start_depth=2):
 # 输出格式：
 # 返回全局变量：CURRENT_FUNCTION | CURRENT_FILE
 # ==============================================================================
-def get_trans_msg(msg):
+def get_trans_msg(msg, lang=None):
     """
     Translate message using global variables
 
     Args:
         msg (str): Original message
+        lang (str): Explicit locale (e.g. zh_TW), falls back through zh_TW => zh => en; None = $LANGUAGE
 
     Returns:
         str: Translated message or original message if translation not found
@@ -286,18 +278,11 @@ def get_trans_msg(msg):
         if source_file.startswith(root_dir + "/"):
             source_file = source_file[len(root_dir) + 1 :]
 
-    # Try DJB2 hash first
-    current_hash = _djb2_with_salt_20(msg)
-    current_hash = _padded_number_to_base64(f"{current_hash}_6")
-    key = f"{source_file}:{current_hash}"
+    # DJB2 hash (widened if it is in the collision index): exactly one lookup
+    coll = LANG_CACHE.coll
+    key = msg_key(msg, source_file, coll["keys"], coll["widen"])
 
-    result = LANG_CACHE.get(key)
-
-    if not result:
-        # Try MD5
-        current_hash = md5(msg)
-        key = f"{source_file}:{current_hash}"
-        result = LANG_CACHE.get(key)
+    result = LANG_CACHE.get(key, lang)
 
     if not result:
         result = msg
@@ -350,6 +335,7 @@ def msg_parse_tmpl(template, *args):
 # ignore = i - 忽略翻译
 # stack = s - 显示调用栈(测试)
 # error = e - 返回错误状态
+# lang - 指定语言（如 zh_TW，按 zh_TW => zh => en 回退）
 #
 # 使用示例：
 # msg_parse_param({}, "How {0} {1} {0}!", "do", "you") ==> "How do you do!"
@@ -361,7 +347,7 @@ def msg_parse_tmpl(template, *args):
 def msg_parse_param(options, *args):
     # 自动翻译
     if not json_getopt(options, "ignore"):
-        result = get_trans_msg(args[0])  # 获取翻译消息
+        result = get_trans_msg(args[0], json_getopt(options, "lang") or None)  # 获取翻译消息（可指定语言）
     else:
         result = args[0]
     template = msg_parse_tmpl(result, *args[1:])  # parse text by template
@@ -439,6 +425,7 @@ def parse_options(args):
 # ignore = i - 忽略翻译
 # stack = s - 显示调用栈(测试)
 # error = e - 返回错误状态
+# lang - 指定语言，例如 _mf("Completed", lang="zh_TW")
 # ==============================================================================
 def exiterr(*args, **kwargs):
     """输出错误消息并退出"""
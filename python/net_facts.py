@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+"""
+Network facts collector (snapshot for NetworkSetup.check_env)
+Reads the kernel state directly instead of parsing ip | dmidecode output:
+    - default route | gateway | dhcp: netlink RTM_GETROUTE (fallback /proc/net/route)
+    - interface IPv4 address: netlink RTM_GETADDR (fallback ioctl SIOCGIFADDR)
+    - network service: unit_state snapshot (one systemctl show for all units)
+The remaining subprocess (nmcli) runs while the service states are queried.
+Cloud vendor | virtualisation: host_facts (OSInfoCache.get_host)
+Base module, only depends on unit_state
+"""
+
+from dataclasses import dataclass, field
+import fcntl
+from pathlib import Path
+import re
+import shutil
+import socket
+import struct
+import subprocess
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # add root sys.path
+
+from python.unit_state import NETWORK_SERVICES, first_active
+
+
+PROC_ROUTE = "/proc/net/route"
+
+# netlink (linux/netlink.h, linux/rtnetlink.h)
+NLMSG_HDR = struct.Struct("=IHHII")  # len, type, flags, seq, pid
+RTMSG = struct.Struct("=BBBBBBBBI")  # family, dst_len, src_len, tos, table, protocol, scope, type, flags
+IFADDRMSG = struct.Struct("=BBBBI")  # family, prefixlen, flags, scope, index
+RTATTR = struct.Struct("=HH")  # len, type
+NLM_F_DUMP_REQUEST = 0x301  # NLM_F_REQUEST | NLM_F_DUMP
+NLMSG_ERROR, NLMSG_DONE = 2, 3
+RTM_NEWADDR, RTM_GETADDR, RTM_NEWROUTE, RTM_GETROUTE = 20, 22, 24, 26
+RTA_OIF, RTA_GATEWAY, RTA_PRIORITY, RTA_TABLE = 4, 5, 6, 15
+IFA_ADDRESS, IFA_LOCAL = 1, 2
+RT_TABLE_MAIN, RTN_UNICAST, RTPROT_DHCP = 254, 1, 16
+SIOCGIFADDR = 0x8915
+
+
+@dataclass
+class NetFacts:
+    """网络环境快照"""
+
+    main_iface: str = ""  # 默认路由的网卡 (如: eth0)
+    curr_ip: str = ""  # 网卡的 IPv4 地址
+    gateway: str = ""  # 默认网关
+    dhcp: bool = False  # 默认路由由 DHCP 下发 (proto dhcp)
+    net_service: Optional[str] = None  # 活动的网络服务 (NETWORK_SERVICES 之一)
+    nm_dns: List[str] = field(default_factory=list)  # NetworkManager 的 IPv4 DNS
+    elapsed_ms: float = 0.0  # 收集耗时
+
+
+def _netlink_dump(msg_type: int, body: bytes) -> Iterator[Tuple[bytes, Dict[int, bytes]]]:
+    """发送 dump 请求，逐条返回 (消息头部结构, {属性类型: 属性值})"""
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE) as sock:
+        sock.bind((0, 0))
+        sock.send(NLMSG_HDR.pack(NLMSG_HDR.size + len(body), msg_type, NLM_F_DUMP_REQUEST, 1, 0) + body)
+        while True:
+            data = sock.recv(65536)
+            offset = 0
+            while offset + NLMSG_HDR.size <= len(data):
+                length, nl_type, _, _, _ = NLMSG_HDR.unpack_from(data, offset)
+                if nl_type == NLMSG_DONE:
+                    return
+                if nl_type == NLMSG_ERROR or length < NLMSG_HDR.size:
+                    raise OSError(f"netlink error (type {msg_type})")
+                yield from _parse_msg(data[offset + NLMSG_HDR.size : offset + length], msg_type)
+                offset += (length + 3) & ~3
+
+
+def _parse_msg(payload: bytes, msg_type: int) -> Iterator[Tuple[bytes, Dict[int, bytes]]]:
+    """拆分消息头部和属性（rtattr，4字节对齐）"""
+    head_size = RTMSG.size if msg_type == RTM_GETROUTE else IFADDRMSG.size
+    attrs = {}
+    offset = head_size
+    while offset + RTATTR.size <= len(payload):
+        length, attr_type = RTATTR.unpack_from(payload, offset)
+        if length < RTATTR.size:
+            break
+        attrs.setdefault(attr_type, payload[offset + RTATTR.size : offset + length])
+        offset += (length + 3) & ~3
+    yield payload[:head_size], attrs
+
+
+def read_default_route() -> Tuple[str, str, bool]:
+    """
+    默认路由（metric 最小的一条）
+
+    Returns:
+        (网卡, 网关, 是否有 DHCP 下发的默认路由)
+    """
+    try:
+        best, dhcp = None, False
+        for head, attrs in _netlink_dump(RTM_GETROUTE, RTMSG.pack(socket.AF_INET, 0, 0, 0, 0, 0, 0, 0, 0)):
+            _, dst_len, _, _, table, protocol, _, rt_type, _ = RTMSG.unpack(head)
+            if RTA_TABLE in attrs:
+                table = struct.unpack("=I", attrs[RTA_TABLE])[0]
+            if dst_len or table != RT_TABLE_MAIN or rt_type != RTN_UNICAST or RTA_OIF not in attrs:
+                continue
+            dhcp = dhcp or protocol == RTPROT_DHCP
+            metric = struct.unpack("=I", attrs[RTA_PRIORITY])[0] if RTA_PRIORITY in attrs else 0
+            if best is None or metric < best[0]:
+                gateway = socket.inet_ntoa(attrs[RTA_GATEWAY]) if RTA_GATEWAY in attrs else ""
+                best = (metric, socket.if_indextoname(struct.unpack("=I", attrs[RTA_OIF])[0]), gateway)
+        return (best[1], best[2], dhcp) if best else ("", "", dhcp)
+    except OSError:
+        return _read_proc_route()
+
+
+def _read_proc_route() -> Tuple[str, str, bool]:
+    """/proc/net/route（十六进制，小端）：没有路由协议信息，dhcp 为 False"""
+    best = None
+    try:
+        with open(PROC_ROUTE, "r") as f:
+            for line in f.readlines()[1:]:
+                fields = line.split()
+                if len(fields) < 8 or fields[1] != "00000000" or fields[7] != "00000000":
+                    continue
+                metric = int(fields[6])
+                if best is None or metric < best[0]:
+                    best = (metric, fields[0], socket.inet_ntoa(struct.pack("<I", int(fields[2], 16))))
+    except (OSError, ValueError):
+        pass
+    return (best[1], best[2], False) if best else ("", "", False)
+
+
+def read_ipv4(iface: str) -> str:
+    """网卡的第一个 IPv4 地址（与 ip -4 addr show 的第一条 inet 相同）"""
+    if not iface:
+        return ""
+    try:
+        index = socket.if_nametoindex(iface)
+        for head, attrs in _netlink_dump(RTM_GETADDR, IFADDRMSG.pack(socket.AF_INET, 0, 0, 0, 0)):
+            if IFADDRMSG.unpack(head)[4] == index and (addr := attrs.get(IFA_LOCAL) or attrs.get(IFA_ADDRESS)):
+                return socket.inet_ntoa(addr)
+        return ""
+    except OSError:
+        pass
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            data = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, struct.pack("256s", iface.encode()[:15]))
+            return socket.inet_ntoa(data[20:24])
+    except OSError:
+        return ""
+
+
+def _spawn(cmd: List[str]) -> Optional[subprocess.Popen]:
+    """启动子进程（不等待），命令不存在返回 None"""
+    if not shutil.which(cmd[0]):
+        return None
+    try:
+        return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    except OSError:
+        return None
+
+
+def _output(process: Optional[subprocess.Popen], timeout: float = 5) -> str:
+    """读取子进程的输出（超时则结束子进程）"""
+    if process is None:
+        return ""
+    try:
+        return process.communicate(timeout=timeout)[0] or ""
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        return ""
+
+
+def collect_facts() -> NetFacts:
+    """收集网络环境：子进程先全部启动，然后读取内核信息，最后等待子进程"""
+    start = time.perf_counter()
+    facts = NetFacts()
+
+    # 1. 内核信息
+    facts.main_iface, facts.gateway, facts.dhcp = read_default_route()
+    facts.curr_ip = read_ipv4(facts.main_iface)
+    nmcli = _spawn(["nmcli", "-t", "-f", "IP4.DNS", "device", "show", facts.main_iface]) if facts.main_iface else None
+
+    # 2. 服务状态（nmcli 运行期间查询），等待子进程
+    facts.net_service = first_active(NETWORK_SERVICES)
+    nm_output = _output(nmcli)
+    if facts.net_service == "NetworkManager":
+        facts.nm_dns = re.findall(r"^IP4\.DNS\[\d+\]:\s*(\S+)", nm_output, re.M)
+
+    facts.elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+    return facts
+
+
+# =============================================================================
+# Debug test function (compare with ip | dmidecode | systemctl)
+# ./python/net_facts.py
+# =============================================================================
+def main():
+    start = time.perf_counter()
+    for _ in range(10):
+        facts = collect_facts()
+    print(facts)
+    print(f"{(time.perf_counter() - start) * 100:.2f} ms/run")
+    for cmd in ("ip -o route get 1", "ip -4 addr show", "ip route show default"):
+        result = subprocess.run(cmd.split(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        print(f"$ {cmd}\n{result.stdout}", file=sys.stderr)
+
+
+# =============================================================================
+# Command-line entry point
+# =============================================================================
+if __name__ == "__main__":
+    main()
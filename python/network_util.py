@@ -4,14 +4,17 @@ from pathlib import Path
 import os
 import shutil
 import sys
-from typing import List
+from typing import List, Optional
 
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))  # add root sys.path
 
 from python.file_util import read_env_file
-from python.cmd_handler import cmd_ex_str, cmd_ex_pat
-from python.system import get_network_service, get_param_fixip, get_static_ip, check_dns
+from python.cmd_handler import cmd_ex_str
+from python.net_facts import NetFacts, collect_facts
+from python.dns_bench import best_order
+from python.cache.os_info import OSInfoCache
+from python.system import get_param_fixip, get_static_ip, check_dns
 from python.read_util import confirm_action
 from python.msg_handler import _mf, exiterr, info, string
 from python.debug_tool import print_array
@@ -69,6 +72,7 @@ class NetworkSetup:
     def __init__(self, type="infrastructure"):
         self.type = type
         self.env = read_env_file(os.path.join(CONF_DIR, ".env"), type)
+        self.facts: Optional[NetFacts] = None  # network facts snapshot (check_env)
 
     # ==============================================================================
     # (0) Function Tools
@@ -94,12 +98,15 @@ class NetworkSetup:
 
     def find_ip4_dns(self):
         """
-        Find all IPv4 DNS server
+        Find all IPv4 DNS server, ordered by measured resolver latency (dns_bench)
         """
         nm_type = self.env.get("CURR_NM")
         main_interface = self.env.get("MAIN_IFACE")
         if nm_type == "NetworkManager":
-            dns_servers = nmcli_dns_check(cmd_ex_str(f"nmcli device show {main_interface}"))
+            if self.facts and self.facts.nm_dns:
+                dns_servers = list(self.facts.nm_dns)  # collected with the network facts
+            else:
+                dns_servers = nmcli_dns_check(cmd_ex_str(f"nmcli device show {main_interface}"))
 
         # elif nm_type == "systemd-networkd":
         #     # systemd-networkd 使用 resolv.conf
@@ -123,7 +130,8 @@ class NetworkSetup:
         if DEF_DNS1 not in dns_servers:
             dns_servers.append(DEF_DNS1)
 
-        return " ".join(dns_servers)
+        # fastest resolver first: UDP queries for mirror hostnames (cold | warm), median + p90 latency
+        return " ".join(best_order(dns_servers))
 
     # ==============================================================================
     # (1) Check Network Environment
@@ -132,31 +140,33 @@ class NetworkSetup:
         """
         Check whether the server is using a static IP
         """
+        # Network facts: netlink | /proc | /sys, remaining commands run concurrently
+        self.facts = facts = collect_facts()
+
         # Extract the primary network interface
-        main_interface = cmd_ex_pat("ip -o route get 1", r"dev (\S+)")
+        main_interface = facts.main_iface
         self.env["MAIN_IFACE"] = main_interface
 
         # current IP Address
-        curr_ip = cmd_ex_pat(f"ip -4 addr show {main_interface}", r"inet (\d+\.\d+\.\d+\.\d+)/")
+        curr_ip = facts.curr_ip
         self.env["CURR_IP"] = curr_ip
 
-        gateway = cmd_ex_pat("ip route show default", r"default via (\d+\.\d+\.\d+\.\d+)")
+        gateway = facts.gateway
         self.env["GATEWAY"] = gateway
 
-        # Check if a DHCP client is running
-        # pgrep -f "dhclient|dhcpcd|nm-dhcp|NetworkManager.*dhcp"
+        # Check if the default route is given by DHCP (ip route show default: "proto dhcp")
         # dhcp_client = bool(cmd_ex_str(["pgrep", "-f", "dhclient|dhcpcd|nm-dhcp|NetworkManager.*dhcp"]))
-        dhcp_client = "proto dhcp" in (cmd_ex_str(["ip", "route", "show", "default"]))
+        dhcp_client = facts.dhcp
         self.env["DHCP_CLIENT"] = dhcp_client
 
-        # call dmidecode for system-manufacturer
-        manufacturer = is_cloud_manufacturer(cmd_ex_str("dmidecode -s system-manufacturer"))
+        # cloud vendor (host facts: DMI information in sysfs)
+        manufacturer = is_cloud_manufacturer(OSInfoCache.get_instance().get_host().cloud_vendor)
         if manufacturer:
             self.env["IS_CLOUD"] = manufacturer.strip()
 
         # New installation must have：
         # NetworkManager、networking[ifupdown]、wicked、network[network-scripts]、systemd-networkd
-        nm_type = get_network_service()
+        nm_type = facts.net_service
         self.env["CURR_NM"] = nm_type
         if not dhcp_client:
             self.env["STATIC_IP"] = get_static_ip(nm_type)
@@ -3,7 +3,6 @@ import logging
 import os
 from pathlib import Path
 import random
-import subprocess
 import re
 import sys
 import threading
@@ -14,6 +13,8 @@ import unicodedata
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))  # add root sys.path
 
+from python.unit_state import NETWORK_SERVICES, first_active, is_active
+
 
 # 全局日志配置（放在文件开头）
 LOG_FILE = "/var/log/sj_install.log"
@@ -100,12 +101,9 @@ def check_network_service(service_name):
     返回值:
         bool: 如果服务处于活动状态，返回服务名称；或者返回None
     """
-    cmd = ["systemctl", "is-active", "--quiet", service_name]
-
     try:
-        # 使用 systemctl 检查服务状态
-        result = subprocess.run(cmd, check=False)
-        if result.returncode == 0:
+        # 服务状态快照（unit_state：一次 systemctl show 获取所有服务）
+        if is_active(service_name):
             return service_name
     except Exception as e:
         logging.error(f"check_network_service， {service_name}) failed: {e}")
@@ -120,13 +118,8 @@ def get_network_service():
     返回值:
         str: 当前活动的网络服务名称
     """
-    # 定义可能的网络服务名称
-    services = ["NetworkManager", "networking", "wicked", "network", "systemd-networkd"]
-    for service in services:
-        if check_network_service(service):
-            return service
-
-    return None
+    # 可能的网络服务名称（按优先级），一次查询
+    return first_active(NETWORK_SERVICES)
 
 
 def get_static_ip(nm_type):
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+"""
+Systemd unit states, one `systemctl show` call for every unit of interest
+The snapshot is cached for the current provisioning step (cmd_trace.trace_step),
+for NO_STEP_TTL seconds outside a step, and dropped when a command changes unit states (systemctl start | restart | enable ...).
+Base module, only depends on cmd_trace
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Union
+
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # add root sys.path
+
+from python.cmd_trace import current_step
+
+
+# 网络服务（按优先级）：NetworkManager、networking[ifupdown]、wicked、network[network-scripts]、systemd-networkd
+NETWORK_SERVICES = ["NetworkManager", "networking", "wicked", "network", "systemd-networkd"]
+WATCHED_UNITS = NETWORK_SERVICES + ["ssh", "sshd", "docker"]  # 第一次查询时一起获取
+SHOW_PROPS = "Id,LoadState,ActiveState,SubState"
+NO_STEP_TTL = 2.0  # 不在步骤中时快照的有效时间（秒）：避免长时间使用过期的状态
+
+# 会改变服务状态的命令
+CHANGE_MATCH = re.compile(
+    r"\b(systemctl\s+(\S+\s+)*?(start|stop|restart|try-restart|reload|reload-or-restart|kill|enable|disable|mask|unmask|"
+    r"daemon-reload|isolate)|service\s+\S+\s+(start|stop|restart|reload))\b"
+)
+
+
+@dataclass(frozen=True)
+class UnitState:
+    """服务状态 (systemctl show)"""
+
+    name: str  # 查询的名称 (如: ssh, 可能是别名)
+    unit_id: str = ""  # 实际的 unit (如: ssh.service)
+    load_state: str = ""  # loaded | not-found | masked ...
+    active_state: str = ""  # active | inactive | failed | activating ...
+    sub_state: str = ""  # running | exited | dead ...
+
+    @property
+    def active(self) -> bool:
+        return self.active_state == "active"
+
+
+_snapshot: Dict[str, UnitState] = {}
+_snapshot_step: Optional[str] = None  # 快照所属的步骤
+_snapshot_time = 0.0  # 快照的创建时间 (monotonic)
+
+
+def query_units(units: Iterable[str]) -> Dict[str, UnitState]:
+    """
+    一次 systemctl show 获取所有 unit 的状态（输出按查询顺序，每个 unit 一段，以空行分隔）
+    systemd 不可用时所有 unit 的状态为空（非 active）
+    """
+    units = list(dict.fromkeys(units))
+    states = {name: UnitState(name) for name in units}
+    if not units:
+        return states
+    try:
+        result = subprocess.run(
+            ["systemctl", "show", "--no-pager", "-p", SHOW_PROPS, "--", *units],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return states
+    if result.returncode != 0:
+        return states
+
+    for name, block in zip(units, result.stdout.strip().split("\n\n")):
+        props = dict(line.split("=", 1) for line in block.splitlines() if "=" in line)
+        states[name] = UnitState(
+            name,
+            unit_id=props.get("Id", ""),
+            load_state=props.get("LoadState", ""),
+            active_state=props.get("ActiveState", ""),
+            sub_state=props.get("SubState", ""),
+        )
+    return states
+
+
+def unit_states(units: Iterable[str]) -> Dict[str, UnitState]:
+    """从快照读取；快照属于其它步骤 | 不在步骤中且已过期 | 缺少 unit 时重新查询（WATCHED_UNITS 一起查询）"""
+    global _snapshot, _snapshot_step, _snapshot_time
+    units = list(units)
+    step = current_step()
+    if step != _snapshot_step or (not step and time.monotonic() - _snapshot_time > NO_STEP_TTL):
+        _snapshot, _snapshot_step = {}, step
+    missing = [name for name in units if name not in _snapshot]
+    if missing:
+        if not _snapshot:
+            missing = missing + WATCHED_UNITS
+            _snapshot_time = time.monotonic()
+        _snapshot.update(query_units(missing))
+    return {name: _snapshot[name] for name in units}
+
+
+def unit_state(name: str) -> UnitState:
+    return unit_states([name])[name]
+
+
+def is_active(name: str) -> bool:
+    """服务是否处于活动状态 (systemctl is-active)"""
+    return unit_state(name).active
+
+
+def first_active(names: List[str]) -> Optional[str]:
+    """第一个处于活动状态的服务（按给定顺序），没有则返回 None"""
+    return next((name for name, state in unit_states(names).items() if state.active), None)
+
+
+def invalidate_units() -> None:
+    """丢弃快照（下次查询时重新获取）"""
+    _snapshot.clear()
+
+
+def note_command(cmd: Union[str, List[str]]) -> None:
+    """执行的命令可能改变服务状态时丢弃快照"""
+    if CHANGE_MATCH.search(cmd if isinstance(cmd, str) else " ".join(cmd)):
+        invalidate_units()
+
+
+# =============================================================================
+# Debug test function
+# ./python/unit_state.py [unit ...]
+# =============================================================================
+def main():
+    units = sys.argv[1:] or WATCHED_UNITS
+    start = time.perf_counter()
+    states = unit_states(units)
+    elapsed = (time.perf_counter() - start) * 1000
+    for state in states.values():
+        print(f"{state.name:<20} {state.unit_id:<28} {state.load_state:<10} {state.active_state:<10} {state.sub_state}")
+    print(f"{len(_snapshot)} units in {elapsed:.2f} ms, first active network service: {first_active(NETWORK_SERVICES)}")
+
+
+# =============================================================================
+# Command-line entry point
+# =============================================================================
+if __name__ == "__main__":
+    main()